@@ -1,14 +1,16 @@
 from fastapi import APIRouter
 
 from core.alert_builder import build_alerts
-from core.belief_store import get_latest_belief
 from core.change_detector import detect_belief_change
-from core.portfolio_store import get_entities_with_beliefs, get_previous_belief
+from core.storage import get_storage
+
+from .singleflight import single_flight
 
 router = APIRouter()
 
 
 @router.get("/portfolio/alerts")
+@single_flight("portfolio/alerts")
 def get_portfolio_alerts():
     """Get portfolio alerts for NEXT_ROUND_RAISED event.
     
@@ -17,22 +19,23 @@ def get_portfolio_alerts():
         entity_id, probability, delta, change_type, confidence, reason, as_of
     """
     event_id = "NEXT_ROUND_RAISED"
+    storage = get_storage()
     
     # Get all entities with beliefs
-    entity_ids = get_entities_with_beliefs(event_id)
+    entity_ids = storage.get_entities_with_beliefs(event_id)
     
     changes = []
     beliefs = []
     
     for entity_id in entity_ids:
         # Fetch latest belief
-        current_belief = get_latest_belief(event_id, entity_id)
+        current_belief = storage.get_latest_belief(event_id, entity_id)
         if current_belief is None:
             continue
         
         # Fetch previous belief
-        previous_belief = get_previous_belief(
-            event_id, entity_id, current_belief.belief_id
+        previous_belief = storage.get_previous_belief(
+            event_id, entity_id, current_belief.belief_id, current_belief.as_of
         )
         
         # Detect change
@@ -46,6 +49,7 @@ def get_portfolio_alerts():
                 "delta": change_info["delta"],
                 "change_type": change_info["change_type"],
                 "as_of": current_belief.as_of,
+                "belief_id": current_belief.belief_id,
             })
         
         # Add belief data for enrichment
@@ -54,8 +58,8 @@ def get_portfolio_alerts():
             "confidence": current_belief.confidence,
         })
     
-    # Build alert candidates
-    alert_candidates = build_alerts(changes, beliefs)
+    # Build alert candidates, ranked with trend and volatility state
+    alert_candidates = build_alerts(changes, beliefs, storage.get_trends(event_id))
     
     # Return specified fields
     return [
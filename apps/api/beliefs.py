@@ -1,14 +1,15 @@
+from typing import Optional
+
 from fastapi import APIRouter, HTTPException, Query
 
-from core.belief_store import get_latest_belief, get_belief_history
-from core.proposal_store import get_proposals
+from core.storage import get_storage
 
 router = APIRouter()
 
 
 @router.get("/beliefs/{event_id}")
 def get_belief(event_id: str, entity_id: str = Query(...)):
-    belief = get_latest_belief(event_id, entity_id)
+    belief = get_storage().get_latest_belief(event_id, entity_id)
 
     if belief is None:
         raise HTTPException(status_code=404, detail="Belief not found")
@@ -25,27 +26,45 @@ def get_belief(event_id: str, entity_id: str = Query(...)):
 
 @router.get("/beliefs/{event_id}/history")
 def get_belief_history_endpoint(event_id: str, entity_id: str = Query(...)):
-    history = get_belief_history(event_id, entity_id, limit=20)
+    history = get_storage().get_belief_history(event_id, entity_id, limit=20)
 
     return [
         {
-            "belief_id": b.belief_id,
-            "probability": b.probability,
-            "confidence": b.confidence,
-            "as_of": b.as_of,
+            "belief_id": b["belief_id"],
+            "probability": b["probability"],
+            "confidence": b["confidence"],
+            "as_of": b["as_of"],
         }
         for b in history
     ]
 
 
+@router.get("/beliefs/{event_id}/lineage")
+def get_belief_lineage_endpoint(
+    event_id: str,
+    entity_id: str = Query(...),
+    max_depth: Optional[int] = Query(None, ge=0),
+):
+    lineage = get_storage().get_belief_lineage(event_id, entity_id, max_depth=max_depth)
+
+    if not lineage:
+        raise HTTPException(status_code=404, detail="Belief not found")
+
+    return {
+        "event_id": event_id,
+        "entity_id": entity_id,
+        "lineage": lineage,
+    }
+
+
 @router.get("/beliefs/{event_id}/explain")
 def explain_belief(event_id: str, entity_id: str = Query(...)):
-    belief = get_latest_belief(event_id, entity_id)
+    belief = get_storage().get_latest_belief(event_id, entity_id)
 
     if belief is None:
         raise HTTPException(status_code=404, detail="Belief not found")
 
-    proposals = get_proposals(event_id, entity_id)
+    proposals = get_storage().get_proposals(event_id, entity_id)
 
     if not proposals:
         contributing_agents = []
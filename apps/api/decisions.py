@@ -0,0 +1,94 @@
+import queue
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+
+from core.decision_store import get_decisions_with_outcomes, log_decision, summarize_decision_outcomes
+from core.decisions import Decision, DecisionAction
+from core.storage import get_storage
+
+router = APIRouter()
+
+
+class SuggestionActedUpon(BaseModel):
+    """A suggestion as returned by /portfolio/suggestions."""
+    entity_id: str
+    event_id: str = "NEXT_ROUND_RAISED"
+    suggestion: str
+    reason: Optional[str] = None
+    as_of: datetime
+    belief_id: str
+    change_type: Optional[str] = None
+
+
+class DecisionRequest(BaseModel):
+    suggestion: SuggestionActedUpon
+    action: DecisionAction
+    decided_by: Optional[str] = None
+    notes: Optional[str] = None
+
+
+@router.post("/decisions", status_code=202)
+def create_decision(request: DecisionRequest):
+    """Log a decision taken on a suggestion. Written asynchronously in batches.
+
+    The referenced belief is checked before queueing, since errors in the
+    asynchronous write cannot reach the caller. Returns 503 while the writer
+    already holds its maximum of unwritten decisions (e.g. during a database
+    outage); the client should retry later.
+    """
+    suggestion = request.suggestion
+    belief = get_storage().get_belief(suggestion.belief_id, suggestion.as_of)
+    if belief is None or (belief.event_id, belief.entity_id) != (suggestion.event_id, suggestion.entity_id):
+        raise HTTPException(status_code=422, detail="Unknown belief_id/as_of for this event and entity")
+
+    decision = Decision(
+        decision_id=str(uuid.uuid4()),
+        belief_id=suggestion.belief_id,
+        belief_as_of=suggestion.as_of,
+        event_id=suggestion.event_id,
+        entity_id=suggestion.entity_id,
+        change_type=suggestion.change_type,
+        suggestion=suggestion.suggestion,
+        reason=suggestion.reason,
+        action=request.action,
+        decided_by=request.decided_by,
+        notes=request.notes,
+        decided_at=datetime.utcnow(),
+    )
+    try:
+        log_decision(decision)
+    except queue.Full:
+        raise HTTPException(
+            status_code=503,
+            detail="Decision log is full; retry later",
+            headers={"Retry-After": "5"},
+        )
+
+    return {"decision_id": decision.decision_id, "status": "queued"}
+
+
+@router.get("/decisions")
+def list_decisions(
+    event_id: str = "NEXT_ROUND_RAISED",
+    change_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    horizon_days: int = Query(30, ge=1, le=365),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """Decisions joined to the belief they acted on and the entity's belief afterwards."""
+    return get_decisions_with_outcomes(event_id, change_type, since, horizon_days, limit)
+
+
+@router.get("/decisions/outcomes")
+def decision_outcomes(
+    event_id: str = "NEXT_ROUND_RAISED",
+    change_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    horizon_days: int = Query(30, ge=1, le=365),
+):
+    """Per-action outcome summary, e.g. for decisions taken on significant_drop alerts."""
+    return summarize_decision_outcomes(event_id, change_type, since, horizon_days)
@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
+
+from core.export import EXPORT_TABLES, FORMATS, stream_table
+
+router = APIRouter()
+
+
+@router.get("/export/{table}")
+def export_table_endpoint(
+    table: str,
+    event_id: Optional[str] = None,
+    entity_id: Optional[List[str]] = Query(None),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    after_watermark: Optional[str] = None,
+    format: str = "parquet",
+):
+    """Export a table as a compressed Parquet or Feather file.
+
+    The file is streamed from a server-side cursor to a temporary file, so
+    memory stays constant regardless of table size. Pass the returned
+    X-DII-Watermark header back as after_watermark for an incremental export.
+    Incremental exports re-read DEFAULT_WATERMARK_LAG before the watermark to
+    catch rows that committed late, so rows can repeat across exports;
+    deduplicate them on the column named in X-DII-Key-Column.
+    """
+    if table not in EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown export table: {table}")
+    if format not in FORMATS:
+        raise HTTPException(status_code=422, detail=f"Unknown export format: {format}")
+    if after_watermark is not None:
+        try:
+            datetime.fromisoformat(after_watermark)
+        except ValueError:
+            raise HTTPException(status_code=422, detail=f"Invalid after_watermark: {after_watermark}")
+
+    out_dir = tempfile.mkdtemp(prefix="dii-export-")
+    filename = f"{table}-{uuid.uuid4().hex[:8]}{FORMATS[format]}"
+    path = os.path.join(out_dir, filename)
+    try:
+        rows, watermark, _ = stream_table(
+            table, path, event_id, entity_id, since, until, after_watermark, format
+        )
+    except BaseException:
+        shutil.rmtree(out_dir, ignore_errors=True)
+        raise
+
+    return FileResponse(
+        path,
+        filename=filename,
+        media_type="application/octet-stream",
+        headers={
+            "X-DII-Rows": str(rows),
+            "X-DII-Watermark": watermark or after_watermark or "",
+            "X-DII-Key-Column": EXPORT_TABLES[table]["key_column"],
+        },
+        background=BackgroundTask(shutil.rmtree, out_dir, ignore_errors=True),
+    )
@@ -1,21 +1,100 @@
-from fastapi import FastAPI
-from .ingest import router as ingest_router
-from .beliefs import router as beliefs_router
-from .portfolio import router as portfolio_router
-from .alerts import router as alerts_router
-from .suggestions import router as suggestions_router
-from apps.changes import router as changes_router
-
-app = FastAPI(title="DII API")
-
-
-@app.get("/health")
-def health():
-    return {"status": "ok"}
-
-app.include_router(ingest_router)
-app.include_router(beliefs_router)
-app.include_router(portfolio_router)
-app.include_router(alerts_router)
-app.include_router(suggestions_router)
-app.include_router(changes_router)
\ No newline at end of file
+import importlib
+import os
+from typing import Iterable, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+
+from core.db import current_wal_lsn, get_replica_pool, parse_read_token, pin_replica, read_after
+
+from .roles import ROUTER_GROUPS, resolve_router_groups
+from .singleflight import portfolio_flight
+
+# Read-your-writes: clients echo the LSN from a write response (or "primary")
+# on later reads so they are served by a replica that has replayed it.
+READ_AFTER_HEADER = "X-DII-Read-After"
+WRITE_LSN_HEADER = "X-DII-Write-LSN"
+_WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def create_app(role: Optional[str] = None, groups: Optional[Iterable[str]] = None) -> FastAPI:
+    """Build the API for a deployment role.
+
+    Args:
+        role: Deployment role from APP_ROLES (default: DII_APP_ROLE, else "all")
+        groups: Explicit router groups from ROUTER_GROUPS; overrides role
+
+    Returns:
+        The FastAPI app with only the enabled routers imported and registered
+    """
+    role = role or os.environ.get("DII_APP_ROLE", "all")
+    groups = list(groups) if groups is not None else resolve_router_groups(role)
+
+    app = FastAPI(title="DII API")
+    app.state.role = role
+    app.state.router_groups = groups
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    @app.get("/health/singleflight")
+    def singleflight_stats():
+        """Counters of coalesced portfolio requests per endpoint."""
+        return portfolio_flight.stats()
+
+    @app.get("/health/replicas")
+    def replica_status():
+        """Cached health of the read replicas (empty when reads go to the primary)."""
+        replicas = get_replica_pool()
+        return replicas.status() if replicas is not None else []
+
+    @app.middleware("http")
+    async def read_your_writes(request: Request, call_next):
+        raw_token = request.headers.get(READ_AFTER_HEADER)
+        try:
+            token = parse_read_token(raw_token) if raw_token else None
+        except ValueError as exc:
+            return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+        # One replica per request, so its queries see one replay position
+        with read_after(token), pin_replica():
+            response = await call_next(request)
+
+        # 202 means the write is only queued (e.g. POST /decisions); the LSN
+        # now would not cover it, so no token is handed out
+        if (
+            request.method in _WRITE_METHODS
+            and response.status_code < 400
+            and response.status_code != 202
+            and get_replica_pool() is not None
+        ):
+            response.headers[WRITE_LSN_HEADER] = await run_in_threadpool(current_wal_lsn)
+        return response
+
+    if os.environ.get("DII_STORAGE_BACKEND") == "memory":
+
+        @app.on_event("startup")
+        def load_memory_storage():
+            # Load DII_MEMORY_SNAPSHOT before serving rather than on the first request
+            from core.storage import get_storage
+
+            get_storage()
+
+    if "decisions" in groups:
+
+        @app.on_event("shutdown")
+        def flush_decision_log():
+            from core.decision_store import close_decision_log
+
+            close_decision_log()
+
+    for group in groups:
+        for module_name in ROUTER_GROUPS[group]:
+            app.include_router(importlib.import_module(module_name).router)
+
+    return app
+
+
+app = create_app()
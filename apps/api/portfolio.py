@@ -1,11 +1,15 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 
-from core.belief_store import get_distinct_entity_ids, get_latest_belief, get_previous_belief
+from core.storage import get_storage
+from core.rollups import classify_risk
+
+from .singleflight import single_flight
 
 router = APIRouter()
 
 
 @router.get("/portfolio/overview")
+@single_flight("portfolio/overview")
 def get_portfolio_overview():
     """Get portfolio overview for NEXT_ROUND_RAISED event.
     
@@ -13,20 +17,23 @@ def get_portfolio_overview():
         List of portfolio items with: entity_id, probability, confidence, delta, risk_level, as_of
     """
     event_id = "NEXT_ROUND_RAISED"
+    storage = get_storage()
     
     # Get all distinct entity_ids
-    entity_ids = get_distinct_entity_ids(event_id)
+    entity_ids = storage.get_entities_with_beliefs(event_id)
     
     portfolio_items = []
     
     for entity_id in entity_ids:
         # Fetch latest belief
-        current_belief = get_latest_belief(event_id, entity_id)
+        current_belief = storage.get_latest_belief(event_id, entity_id)
         if current_belief is None:
             continue
         
         # Fetch previous belief
-        previous_belief = get_previous_belief(event_id, entity_id)
+        previous_belief = storage.get_previous_belief(
+            event_id, entity_id, current_belief.belief_id, current_belief.as_of
+        )
         
         # Compute delta
         if previous_belief is not None:
@@ -36,12 +43,7 @@ def get_portfolio_overview():
         
         # Classify risk
         probability = current_belief.probability
-        if probability < 0.4:
-            risk_level = "high_risk"
-        elif probability < 0.7:
-            risk_level = "medium_risk"
-        else:
-            risk_level = "low_risk"
+        risk_level = classify_risk(probability)
         
         portfolio_items.append({
             "entity_id": entity_id,
@@ -54,3 +56,13 @@ def get_portfolio_overview():
     
     return portfolio_items
 
+
+@router.get("/portfolio/summary")
+def get_portfolio_summary_endpoint(recent_days: int = Query(7, ge=1, le=90)):
+    """Get portfolio-level summary for NEXT_ROUND_RAISED event (from pre-aggregated rollups on Postgres).
+    
+    Returns:
+        Dict with entity_count, average_probability, by_risk_level, by_confidence,
+        updated_recently, significant_drops, significant_rises
+    """
+    return get_storage().get_portfolio_summary("NEXT_ROUND_RAISED", recent_days=recent_days)
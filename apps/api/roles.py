@@ -0,0 +1,29 @@
+from typing import List
+
+# Router modules per group. They are imported only when their group is
+# enabled, so e.g. a read-only replica never loads the ingest path
+# (pandas, PDF parsing, multipart) or the numpy-based analytics.
+ROUTER_GROUPS = {
+    "read": ["apps.api.beliefs", "apps.api.portfolio", "apps.api.alerts", "apps.api.suggestions", "apps.changes"],
+    "decisions": ["apps.api.decisions"],
+    "analytics": ["apps.api.simulation", "apps.api.export"],
+    "ingest": ["apps.api.ingest"],
+}
+
+# Deployment roles, selected with DII_APP_ROLE (comma-separated to combine)
+APP_ROLES = {
+    "api": ["read", "decisions"],
+    "analytics": ["read", "analytics"],
+    "ingest": ["ingest"],
+    "all": ["read", "decisions", "analytics", "ingest"],
+}
+
+
+def resolve_router_groups(role: str) -> List[str]:
+    """Router groups enabled for a role such as "api" or "api,ingest"."""
+    groups: List[str] = []
+    for name in (part.strip() for part in role.split(",")):
+        if name not in APP_ROLES:
+            raise ValueError(f"Unknown app role: {name} (expected one of {', '.join(APP_ROLES)})")
+        groups.extend(group for group in APP_ROLES[name] if group not in groups)
+    return groups
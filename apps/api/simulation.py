@@ -0,0 +1,55 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+
+from core.simulation import DEFAULT_SAMPLES, Perturbation, default_agents, simulate_what_if
+from core.storage import get_storage
+
+router = APIRouter()
+
+
+class WhatIfRequest(BaseModel):
+    event_id: str = "NEXT_ROUND_RAISED"
+    entity_ids: Optional[List[str]] = None  # default: whole portfolio
+    perturbations: List[Perturbation]
+    n_samples: int = Field(DEFAULT_SAMPLES, ge=100, le=100000)
+    seed: int = 0
+
+
+@router.post("/simulations/what-if")
+def run_what_if(request: WhatIfRequest):
+    """Simulate belief probability distributions under signal perturbations.
+    
+    Returns:
+        Dict with event_id, n_samples, seed and per-entity results containing
+        baseline_probability, mean, std, percentiles, histogram and sensitivity
+    """
+    storage = get_storage()
+    entity_ids = request.entity_ids
+    if entity_ids is None:
+        entity_ids = storage.get_entities_with_beliefs(request.event_id)
+    
+    agents = default_agents(request.event_id)
+    required_signals = sorted({signal_type for agent in agents for signal_type in agent.required_signals})
+    base_frame = storage.get_signal_frame(entity_ids, required_signals)
+    
+    try:
+        results = simulate_what_if(
+            request.event_id,
+            entity_ids,
+            base_frame,
+            request.perturbations,
+            n_samples=request.n_samples,
+            seed=request.seed,
+            agents=agents,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    
+    return {
+        "event_id": request.event_id,
+        "n_samples": request.n_samples,
+        "seed": request.seed,
+        "results": results,
+    }
@@ -0,0 +1,131 @@
+import asyncio
+import functools
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from core.db import read_token
+
+
+class _Call:
+    """One in-flight computation shared by every caller with the same key."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls into one execution.
+
+    While a call for a key is running, later callers with the same key wait
+    for it and receive its result (or its exception) instead of running the
+    computation again. Nothing is cached: once the call finishes, the next
+    caller starts a new one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def do(self, name: str, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn, or wait for the in-flight run with the same key (threaded handlers)."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            self._count(name, leader)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    async def do_async(self, name: str, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await fn, or the in-flight task with the same key (async handlers)."""
+        with self._lock:
+            task = self._tasks.get(key)
+            leader = task is None
+            if leader:
+                task = asyncio.get_running_loop().create_task(fn())
+                self._tasks[key] = task
+                task.add_done_callback(lambda _: self._forget_task(key, task))
+            self._count(name, leader)
+
+        # shield: one cancelled client request must not cancel the shared task
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters of calls, executions and coalesced calls per name and in total.
+
+        Returns:
+            Dict with "endpoints" (name -> counters) and "total" (counters)
+        """
+        with self._lock:
+            endpoints = {name: dict(values) for name, values in self._counters.items()}
+        return {
+            "endpoints": endpoints,
+            "total": {
+                field: sum(values[field] for values in endpoints.values())
+                for field in ("calls", "executions", "coalesced")
+            },
+        }
+
+    def _forget_task(self, key: Hashable, task: asyncio.Task):
+        with self._lock:
+            if self._tasks.get(key) is task:
+                del self._tasks[key]
+
+    def _count(self, name: str, leader: bool):
+        counters = self._counters.setdefault(name, {"calls": 0, "executions": 0, "coalesced": 0})
+        counters["calls"] += 1
+        counters["executions" if leader else "coalesced"] += 1
+
+
+portfolio_flight = SingleFlight()
+
+
+def single_flight(name: str, group: SingleFlight = portfolio_flight):
+    """Decorate a sync or async handler so identical concurrent requests share one run.
+
+    The key is the name plus the handler's arguments (path and query parameters),
+    so requests only coalesce when they would compute the same response. The
+    active read-your-writes token is part of the key too, so a request that
+    must see a write never shares a result computed without that guarantee.
+    Place it below the router decorator so the router registers the wrapper.
+    """
+
+    def decorator(fn):
+        def make_key(args, kwargs):
+            return (name, read_token(), repr(args), repr(sorted(kwargs.items())))
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                return await group.do_async(name, make_key(args, kwargs), lambda: fn(*args, **kwargs))
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return group.do(name, make_key(args, kwargs), lambda: fn(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,88 @@
+"""Cold-start benchmark for the API app factory.
+
+    python -m apps.api.startup_bench                 # every role
+    python -m apps.api.startup_bench api ingest --top 15
+
+Each role is built in a fresh interpreter under `python -X importtime`. The
+report gives wall time to a ready app, plus the top-level packages that
+cost the most import time.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from apps.api.roles import APP_ROLES
+
+_BUILD_APP = (
+    "import time; start = time.perf_counter(); "
+    "from apps.api.main import create_app; create_app({role!r}); "
+    "print(time.perf_counter() - start)"
+)
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Self import time in microseconds, summed per top-level package."""
+    totals: Dict[str, int] = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|", 2)
+        totals[name.strip().split(".")[0]] += int(self_us)
+    return dict(totals)
+
+
+def measure_role(role: str) -> dict:
+    """Build the app for role in a fresh interpreter and collect timings."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _BUILD_APP.format(role=role)],
+        capture_output=True,
+        text=True,
+        # apps.api.main builds the default app on import, so pin the role for it too
+        env={**os.environ, "DII_APP_ROLE": role},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"App for role {role} failed to start:\n{result.stderr[-2000:]}")
+    by_package = parse_importtime(result.stderr)
+    return {
+        "role": role,
+        "seconds": float(result.stdout.strip().splitlines()[-1]),
+        "import_seconds": sum(by_package.values()) / 1e6,
+        "by_package": by_package,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Measure API cold-start time per deployment role")
+    parser.add_argument("roles", nargs="*", default=list(APP_ROLES), help="Roles to measure (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per role; the median is reported")
+    parser.add_argument("--top", type=int, default=10, help="Most expensive packages listed per role")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args(argv)
+
+    reports = []
+    for role in args.roles:
+        runs = [measure_role(role) for _ in range(args.repeat)]
+        median = sorted(runs, key=lambda run: run["seconds"])[len(runs) // 2]
+        median["seconds_all_runs"] = [run["seconds"] for run in runs]
+        median["seconds"] = statistics.median(median["seconds_all_runs"])
+        reports.append(median)
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+
+    for report in reports:
+        print(f"{report['role']}: {report['seconds'] * 1000:.0f} ms to app ready "
+              f"({report['import_seconds'] * 1000:.0f} ms importing)")
+        top = sorted(report["by_package"].items(), key=lambda item: item[1], reverse=True)[: args.top]
+        for package, self_us in top:
+            print(f"    {package:<24} {self_us / 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
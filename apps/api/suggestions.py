@@ -1,39 +1,42 @@
 from fastapi import APIRouter
 
 from core.alert_builder import build_alerts
-from core.belief_store import get_latest_belief
 from core.change_detector import detect_belief_change
-from core.portfolio_store import get_entities_with_beliefs, get_previous_belief
+from core.storage import get_storage
 from core.suggestion_builder import build_suggestions
 
+from .singleflight import single_flight
+
 router = APIRouter()
 
 
 @router.get("/portfolio/suggestions")
+@single_flight("portfolio/suggestions")
 def get_portfolio_suggestions():
     """Get decision suggestions for portfolio alerts.
     
     Returns:
         List of decision suggestions with fields:
-        entity_id, suggestion, reason, as_of
+        entity_id, suggestion, reason, as_of, belief_id, change_type
     """
     event_id = "NEXT_ROUND_RAISED"
+    storage = get_storage()
     
     # Get all entities with beliefs
-    entity_ids = get_entities_with_beliefs(event_id)
+    entity_ids = storage.get_entities_with_beliefs(event_id)
     
     changes = []
     beliefs = []
     
     for entity_id in entity_ids:
         # Fetch latest belief
-        current_belief = get_latest_belief(event_id, entity_id)
+        current_belief = storage.get_latest_belief(event_id, entity_id)
         if current_belief is None:
             continue
         
         # Fetch previous belief
-        previous_belief = get_previous_belief(
-            event_id, entity_id, current_belief.belief_id
+        previous_belief = storage.get_previous_belief(
+            event_id, entity_id, current_belief.belief_id, current_belief.as_of
         )
         
         # Detect change
@@ -47,6 +50,7 @@ def get_portfolio_suggestions():
                 "delta": change_info["delta"],
                 "change_type": change_info["change_type"],
                 "as_of": current_belief.as_of,
+                "belief_id": current_belief.belief_id,
             })
         
         # Add belief data for enrichment
@@ -55,8 +59,8 @@ def get_portfolio_suggestions():
             "confidence": current_belief.confidence,
         })
     
-    # Build alert candidates
-    alert_candidates = build_alerts(changes, beliefs)
+    # Build alert candidates, ranked with trend and volatility state
+    alert_candidates = build_alerts(changes, beliefs, storage.get_trends(event_id))
     
     # Build decision suggestions from alerts
     decision_suggestions = build_suggestions(alert_candidates)
@@ -68,6 +72,8 @@ def get_portfolio_suggestions():
             "suggestion": suggestion.suggestion,
             "reason": suggestion.reason,
             "as_of": suggestion.as_of,
+            "belief_id": suggestion.belief_id,
+            "change_type": suggestion.change_type,
         }
         for suggestion in decision_suggestions
     ]
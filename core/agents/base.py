@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Dict, List
+
+import numpy as np
 
 from core.proposals import ForecastProposal
 from core.signals import Signal
@@ -23,4 +25,19 @@ class BaseAgent(ABC):
             List of ForecastProposal objects
         """
         pass
-
+    
+    @abstractmethod
+    def score_frame(self, frame: Dict[str, np.ndarray]) -> np.ndarray:
+        """Score a signal frame in one vectorized pass.
+        
+        Must agree with generate_proposals on the proposed probability for
+        the same signal values.
+        
+        Args:
+            frame: Dict of column to float arrays that broadcast to one shape
+                (see core.signals.flag_column for the encoding)
+            
+        Returns:
+            Array of proposed probabilities with the broadcast shape
+        """
+        pass
@@ -0,0 +1,253 @@
+import operator
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.agents.base import BaseAgent
+from core.proposals import ForecastProposal
+from core.signals import Signal, flag_column
+
+NUMERIC_OPS: Dict[str, Callable[[Any, Any], Any]] = {
+    "lt": operator.lt,
+    "le": operator.le,
+    "gt": operator.gt,
+    "ge": operator.ge,
+    "eq": operator.eq,
+}
+FLAG_OPS = {"is_true": True, "is_false": False}
+SPEC_KEYS = {
+    "agent_id",
+    "event_id",
+    "base_probability",
+    "adjustments",
+    "clamp",
+    "rationale_template",
+    "no_adjustment_template",
+    "required_signals",
+}
+ADJUSTMENT_KEYS = {"signal_type", "op", "value", "delta", "reason"}
+
+
+@dataclass(frozen=True)
+class Condition:
+    """A test on the value of one signal type.
+
+    Numeric ops (lt, le, gt, ge, eq) only match int/float values; flag ops
+    (is_true, is_false) only match actual booleans. A missing signal never matches.
+    """
+    signal_type: str
+    op: str
+    value: Optional[float] = None
+
+    def __post_init__(self):
+        if self.op not in NUMERIC_OPS and self.op not in FLAG_OPS:
+            raise ValueError(f"Unknown condition op: {self.op}")
+        if self.op in NUMERIC_OPS and self.value is None:
+            raise ValueError(f"Condition {self.op} on {self.signal_type} needs a value")
+
+
+@dataclass(frozen=True)
+class Adjustment:
+    """Add delta to the probability when the condition matches.
+
+    reason is a template; {value} is replaced with the signal value.
+    """
+    when: Condition
+    delta: float
+    reason: str
+
+
+@dataclass(frozen=True)
+class RuleSpec:
+    """Declarative definition of a rule-based agent."""
+    agent_id: str
+    event_id: str
+    base_probability: float
+    adjustments: Tuple[Adjustment, ...]
+    clamp: Tuple[float, float] = (0.0, 1.0)
+    rationale_template: str = "Base probability {base} adjusted by: {adjustments}. Final probability: {probability:.2f}"
+    no_adjustment_template: str = "Base probability {base} with no adjustments. Final probability: {probability:.2f}"
+    required_signals: Tuple[str, ...] = field(default=())
+
+    def __post_init__(self):
+        signal_types = tuple(dict.fromkeys(a.when.signal_type for a in self.adjustments))
+        if not self.required_signals:
+            object.__setattr__(self, "required_signals", signal_types)
+            return
+        # Only required signals are loaded, so a rule on any other would never match
+        missing = [signal_type for signal_type in signal_types if signal_type not in self.required_signals]
+        if missing:
+            raise ValueError(f"required_signals of {self.agent_id} lacks adjusted signals: {', '.join(missing)}")
+
+
+def rule_spec_from_dict(data: dict) -> RuleSpec:
+    """Build a RuleSpec from plain data, e.g. a parsed YAML or JSON document.
+
+    Expected shape:
+        agent_id, event_id, base_probability,
+        adjustments: [{signal_type, op, value?, delta, reason}, ...],
+        optional clamp: [low, high], rationale_template, no_adjustment_template,
+        required_signals: [signal_type, ...]
+
+    Unknown keys raise ValueError rather than being ignored, so a misspelt
+    field cannot silently change the agent.
+    """
+    _reject_unknown_keys(data, SPEC_KEYS, "rule spec")
+    for item in data["adjustments"]:
+        _reject_unknown_keys(item, ADJUSTMENT_KEYS, "adjustment")
+    adjustments = tuple(
+        Adjustment(
+            when=Condition(item["signal_type"], item["op"], item.get("value")),
+            delta=item["delta"],
+            reason=item["reason"],
+        )
+        for item in data["adjustments"]
+    )
+    optional = {
+        key: data[key]
+        for key in ("rationale_template", "no_adjustment_template")
+        if key in data
+    }
+    if "clamp" in data:
+        optional["clamp"] = tuple(data["clamp"])
+    if "required_signals" in data:
+        if isinstance(data["required_signals"], str):
+            raise ValueError("required_signals must be a list of signal types")
+        optional["required_signals"] = tuple(data["required_signals"])
+    return RuleSpec(
+        agent_id=data["agent_id"],
+        event_id=data["event_id"],
+        base_probability=data["base_probability"],
+        adjustments=adjustments,
+        **optional,
+    )
+
+
+def _reject_unknown_keys(data: dict, allowed: set, kind: str):
+    unknown = sorted(set(data) - allowed)
+    if unknown:
+        raise ValueError(f"Unknown {kind} keys: {', '.join(unknown)}")
+
+
+class CompiledRules:
+    """A RuleSpec compiled once into scalar and vectorized evaluators."""
+
+    def __init__(self, spec: RuleSpec):
+        self.spec = spec
+        self._scalar_tests = [
+            (adjustment, self._scalar_test(adjustment.when)) for adjustment in spec.adjustments
+        ]
+        self._vector_tests = [
+            (self._frame_column(adjustment.when), adjustment.delta, self._vector_test(adjustment.when))
+            for adjustment in spec.adjustments
+        ]
+
+    def evaluate(self, signal_map: Dict[str, Signal]) -> Tuple[float, List[str]]:
+        """Scalar evaluator for one entity, keeping the reason for every adjustment."""
+        probability = self.spec.base_probability
+        reasons = []
+        for adjustment, test in self._scalar_tests:
+            signal = signal_map.get(adjustment.when.signal_type)
+            if signal is not None and test(signal.value):
+                probability += adjustment.delta
+                reasons.append(adjustment.reason.format(value=signal.value))
+        low, high = self.spec.clamp
+        return max(low, min(high, probability)), reasons
+
+    def rationale(self, probability: float, reasons: List[str]) -> str:
+        template = self.spec.rationale_template if reasons else self.spec.no_adjustment_template
+        return template.format(
+            base=self.spec.base_probability,
+            adjustments=", ".join(reasons),
+            probability=probability,
+        )
+
+    def score_frame(self, frame: Dict[str, np.ndarray]) -> np.ndarray:
+        """Vectorized evaluator over a signal frame (see core.signals.flag_column)."""
+        shape = np.broadcast_shapes(*(np.shape(column) for column in frame.values())) if frame else ()
+        probability = np.full(shape, self.spec.base_probability)
+        # NaN (missing or non-numeric) compares False, like the scalar type checks
+        with np.errstate(invalid="ignore"):
+            for column, delta, test in self._vector_tests:
+                if column in frame:
+                    probability += np.where(test(frame[column]), delta, 0.0)
+        low, high = self.spec.clamp
+        return np.clip(probability, low, high)
+
+    @staticmethod
+    def _scalar_test(condition: Condition) -> Callable[[Any], bool]:
+        if condition.op in FLAG_OPS:
+            expected = FLAG_OPS[condition.op]
+            return lambda value: value is expected
+        compare = NUMERIC_OPS[condition.op]
+        threshold = condition.value
+        return lambda value: isinstance(value, (int, float)) and compare(value, threshold)
+
+    @staticmethod
+    def _frame_column(condition: Condition) -> str:
+        # Flag ops read the boolean-only column, so the number 1 is not True
+        return flag_column(condition.signal_type) if condition.op in FLAG_OPS else condition.signal_type
+
+    @staticmethod
+    def _vector_test(condition: Condition) -> Callable[[np.ndarray], np.ndarray]:
+        if condition.op in FLAG_OPS:
+            encoded = 1.0 if FLAG_OPS[condition.op] else 0.0
+            return lambda column: column == encoded
+        compare = NUMERIC_OPS[condition.op]
+        threshold = condition.value
+        return lambda column: compare(column, threshold)
+
+
+class RuleAgent(BaseAgent):
+    """Agent defined by a RuleSpec instead of hand-written rules.
+
+    Subclasses set rule_spec; agent_id, supported_events and required_signals
+    are derived from it and the rules are compiled once at class creation.
+    A spec can also be passed per instance for data-defined agents.
+    """
+
+    rule_spec: RuleSpec
+    _compiled: CompiledRules
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        spec = cls.__dict__.get("rule_spec")
+        if spec is not None:
+            cls._apply_spec(cls, spec)
+
+    def __init__(self, spec: Optional[RuleSpec] = None):
+        if spec is not None:
+            self._apply_spec(self, spec)
+
+    @staticmethod
+    def _apply_spec(target, spec: RuleSpec):
+        target.rule_spec = spec
+        target.agent_id = spec.agent_id
+        target.supported_events = [spec.event_id]
+        target.required_signals = list(spec.required_signals)
+        target._compiled = CompiledRules(spec)
+
+    def generate_proposals(self, signals: List[Signal]) -> List[ForecastProposal]:
+        """Generate one proposal using the scalar (explainable) evaluator."""
+        signal_map = {signal.signal_type: signal for signal in signals}
+        entity_id = signals[0].entity_id if signals else "unknown"
+
+        probability, reasons = self._compiled.evaluate(signal_map)
+
+        return [
+            ForecastProposal(
+                proposal_id=str(uuid.uuid4()),
+                agent_id=self.agent_id,
+                event_id=self.rule_spec.event_id,
+                entity_id=entity_id,
+                proposed_probability=probability,
+                rationale=self._compiled.rationale(probability, reasons),
+                created_at=datetime.utcnow(),
+            )
+        ]
+
+    def score_frame(self, frame: Dict[str, np.ndarray]) -> np.ndarray:
+        return self._compiled.score_frame(frame)
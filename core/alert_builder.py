@@ -1,20 +1,44 @@
-from typing import List
+from typing import Dict, List, Optional
 
 from core.alerts import AlertCandidate
+from core.trends import HIGH_VOLATILITY_THRESHOLD, BeliefTrend, is_sustained_decline
 
 
-def build_alerts(changes: List[dict], beliefs: List[dict]) -> List[AlertCandidate]:
+def build_alerts(
+    changes: List[dict],
+    beliefs: List[dict],
+    trends: Optional[Dict[str, BeliefTrend]] = None,
+) -> List[AlertCandidate]:
     """Build alert candidates from changes and beliefs.
     
     Args:
         changes: List of change dicts from /portfolio/changes endpoint
         beliefs: List of belief dicts with entity_id and confidence
+        trends: Optional dict of entity_id to BeliefTrend. When given, slow
+            multi-step declines raise "sustained_decline" alerts, volatile
+            entities are de-prioritized and ties rank steeper declines first
         
     Returns:
         List of AlertCandidate objects sorted by priority_rank ascending, limited to top 10
     """
     # Create a lookup for beliefs by entity_id
     belief_lookup = {belief["entity_id"]: belief for belief in beliefs}
+    trends = trends or {}
+    
+    # Trend-only alerts for entities whose latest step was not material
+    changes = list(changes)
+    changed_entity_ids = {change["entity_id"] for change in changes}
+    for entity_id, trend in trends.items():
+        if entity_id in changed_entity_ids or not is_sustained_decline(trend):
+            continue
+        changes.append({
+            "entity_id": entity_id,
+            "probability": trend.probability,
+            "delta": trend.recent_probabilities[-1] - trend.recent_probabilities[0],
+            "change_type": "sustained_decline",
+            "as_of": trend.as_of,
+            "belief_id": trend.belief_id,
+        })
     
     alert_candidates = []
     
@@ -25,6 +49,7 @@ def build_alerts(changes: List[dict], beliefs: List[dict]) -> List[AlertCandidat
         # Get confidence from beliefs
         belief = belief_lookup.get(entity_id, {})
         confidence = belief.get("confidence", "low")
+        trend = trends.get(entity_id)
         
         # Assign priority_rank based on rules
         # Lower rank = higher priority
@@ -33,6 +58,7 @@ def build_alerts(changes: List[dict], beliefs: List[dict]) -> List[AlertCandidat
             change["probability"],
             change.get("delta"),
             confidence,
+            trend.volatility if trend is not None else None,
         )
         
         # Assign human-readable reason
@@ -54,30 +80,44 @@ def build_alerts(changes: List[dict], beliefs: List[dict]) -> List[AlertCandidat
                 priority_rank=priority_rank,
                 reason=reason,
                 as_of=change["as_of"],
+                belief_id=change.get("belief_id"),
             )
         )
     
-    # Sort by priority_rank ascending (lower rank = higher priority)
-    alert_candidates.sort(key=lambda x: x.priority_rank)
+    # Sort by priority_rank ascending (lower rank = higher priority),
+    # then by trend slope ascending (steeper decline first)
+    alert_candidates.sort(
+        key=lambda x: (
+            x.priority_rank,
+            trends[x.entity_id].slope if x.entity_id in trends else 0.0,
+        )
+    )
     
     # Limit to top 10
     return alert_candidates[:10]
 
 
 def _calculate_priority_rank(
-    change_type: str, probability: float, delta: float | None, confidence: str
+    change_type: str,
+    probability: float,
+    delta: float | None,
+    confidence: str,
+    volatility: float | None = None,
 ) -> int:
     """Calculate priority rank. Lower rank = higher priority.
     
     Priority rules:
     - significant_drop: highest priority (rank 1-3)
+    - sustained_decline: just below significant_drop (rank 2-4)
     - significant_rise: medium priority (rank 4-6)
     - initial: lowest priority (rank 7-9)
     - Within each type, lower probability = higher priority
     - Higher confidence = higher priority (lower rank)
+    - Highly volatile entities drop one rank so noise does not crowd out real moves
     """
     base_rank = {
         "significant_drop": 1,
+        "sustained_decline": 2,
         "significant_rise": 4,
         "initial": 7,
     }.get(change_type, 10)
@@ -88,7 +128,10 @@ def _calculate_priority_rank(
     # Adjust for confidence (high=0, medium=1, low=2)
     confidence_adjustment = {"high": 0, "medium": 1, "low": 2}.get(confidence, 2)
     
-    return base_rank + probability_adjustment + confidence_adjustment
+    # Adjust for volatility (noisy entities flap between rises and drops)
+    volatility_adjustment = 1 if volatility is not None and volatility > HIGH_VOLATILITY_THRESHOLD else 0
+    
+    return base_rank + probability_adjustment + confidence_adjustment + volatility_adjustment
 
 
 def _generate_reason(
@@ -100,6 +143,9 @@ def _generate_reason(
     if change_type == "significant_drop":
         delta_pct = f"{abs(delta) * 100:.1f}%" if delta is not None else "N/A"
         return f"Significant drop of {delta_pct} in probability to {prob_pct} ({confidence} confidence)"
+    elif change_type == "sustained_decline":
+        delta_pct = f"{abs(delta) * 100:.1f}%" if delta is not None else "N/A"
+        return f"Sustained decline of {delta_pct} over recent snapshots to {prob_pct} ({confidence} confidence)"
     elif change_type == "significant_rise":
         delta_pct = f"{delta * 100:.1f}%" if delta is not None else "N/A"
         return f"Significant rise of {delta_pct} in probability to {prob_pct} ({confidence} confidence)"
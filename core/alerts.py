@@ -15,4 +15,5 @@ class AlertCandidate:
     priority_rank: int
     reason: str
     as_of: datetime
+    belief_id: Optional[str] = None  # belief the alert was raised on
 
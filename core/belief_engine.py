@@ -1,5 +1,7 @@
 from typing import List, Tuple
 
+import numpy as np
+
 from core.proposals import ForecastProposal
 
 
@@ -31,3 +33,21 @@ def aggregate_proposals(proposals: List[ForecastProposal]) -> Tuple[float, str]:
     
     return (average_probability, confidence)
 
+
+def aggregate_probabilities(proposed: np.ndarray) -> Tuple[np.ndarray, str]:
+    """Vectorized aggregate_proposals over stacked agent scores.
+    
+    Args:
+        proposed: Array of shape (n_agents, ...) with one proposed probability per agent
+        
+    Returns:
+        Tuple of (probability, confidence) where:
+        - probability: Mean over the agent axis (0.0 when there are no agents)
+        - confidence: Same proposal-count rule as aggregate_proposals
+    """
+    n_agents = proposed.shape[0]
+    if n_agents == 0:
+        return (np.zeros(proposed.shape[1:]), "low")
+    
+    confidence = "high" if n_agents >= 2 else "medium"
+    return (proposed.mean(axis=0), confidence)
@@ -1,8 +1,14 @@
 import json
-from typing import Optional
+from datetime import datetime
+from typing import Callable, List, Optional
 
 from core.beliefs import BeliefSnapshot
-from core.db import get_connection
+from core.db import get_connection, get_read_connection
+from core.proposal_store import insert_proposal
+from core.proposals import ForecastProposal
+from core.queries import execute_prepared
+from core.rollup_store import apply_belief_to_rollup
+from core.trend_store import apply_belief_to_trend
 
 
 def get_latest_belief(event_id: str, entity_id: str) -> Optional[BeliefSnapshot]:
@@ -15,6 +21,28 @@ def get_latest_belief(event_id: str, entity_id: str) -> Optional[BeliefSnapshot]
     Returns:
         The most recent BeliefSnapshot or None if not found
     """
+    conn = get_read_connection()
+    try:
+        with conn.cursor() as cur:
+            execute_prepared(cur, "latest_belief", (event_id, entity_id))
+            row = cur.fetchone()
+            return _row_to_belief(row) if row is not None else None
+    finally:
+        conn.close()
+
+
+def get_belief(belief_id: str, as_of: datetime) -> Optional[BeliefSnapshot]:
+    """Get one belief snapshot by id, reading from the primary.
+
+    as_of is part of the key and prunes the lookup to one partition.
+
+    Args:
+        belief_id: The belief identifier
+        as_of: The belief's as_of
+
+    Returns:
+        The BeliefSnapshot or None if not found
+    """
     conn = get_connection()
     try:
         with conn.cursor() as cur:
@@ -22,35 +50,34 @@ def get_latest_belief(event_id: str, entity_id: str) -> Optional[BeliefSnapshot]
                 """
                 SELECT belief_id, event_id, entity_id, probability, confidence, confidence_interval, as_of, previous_belief_id
                 FROM belief_snapshots
-                WHERE event_id = %s AND entity_id = %s
-                ORDER BY as_of DESC
-                LIMIT 1
+                WHERE belief_id = %s AND as_of = %s
                 """,
-                (event_id, entity_id),
+                (belief_id, as_of),
             )
             row = cur.fetchone()
-            if row is None:
-                return None
-            
-            # Parse confidence_interval from JSONB if present
-            confidence_interval = None
-            if row[5] is not None:
-                confidence_interval = tuple(row[5]) if isinstance(row[5], list) else row[5]
-            
-            return BeliefSnapshot(
-                belief_id=row[0],
-                event_id=row[1],
-                entity_id=row[2],
-                probability=row[3],
-                confidence=row[4],
-                confidence_interval=confidence_interval,
-                as_of=row[6],
-                previous_belief_id=row[7],
-            )
+            return _row_to_belief(row) if row is not None else None
     finally:
         conn.close()
 
 
+def _row_to_belief(row) -> BeliefSnapshot:
+    # Parse confidence_interval from JSONB if present
+    confidence_interval = None
+    if row[5] is not None:
+        confidence_interval = tuple(row[5]) if isinstance(row[5], list) else row[5]
+
+    return BeliefSnapshot(
+        belief_id=row[0],
+        event_id=row[1],
+        entity_id=row[2],
+        probability=row[3],
+        confidence=row[4],
+        confidence_interval=confidence_interval,
+        as_of=row[6],
+        previous_belief_id=row[7],
+    )
+
+
 def get_belief_history(event_id: str, entity_id: str, limit: int = 20):
     """Get belief history for a given event and entity.
     
@@ -63,19 +90,10 @@ def get_belief_history(event_id: str, entity_id: str, limit: int = 20):
         List of dictionaries with: belief_id, probability, confidence, as_of
         Ordered by as_of ascending (oldest first)
     """
-    conn = get_connection()
+    conn = get_read_connection()
     try:
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT belief_id, probability, confidence, as_of
-                FROM belief_snapshots
-                WHERE event_id = %s AND entity_id = %s
-                ORDER BY as_of ASC
-                LIMIT %s
-                """,
-                (event_id, entity_id, limit),
-            )
+            execute_prepared(cur, "belief_history", (event_id, entity_id, limit))
             rows = cur.fetchall()
             return [
                 {
@@ -90,37 +108,201 @@ def get_belief_history(event_id: str, entity_id: str, limit: int = 20):
         conn.close()
 
 
-def insert_belief_snapshot(belief: BeliefSnapshot):
+def insert_belief_snapshot(belief: BeliefSnapshot, cur=None):
     """Insert a new belief snapshot. Beliefs are immutable - this always creates a new record.
     
+    The entity's trend state and the portfolio rollups are updated in the
+    same transaction.
+    
     Args:
         belief: The BeliefSnapshot to insert
+        cur: Optional open cursor; when given, the insert joins the caller's
+            transaction and the caller commits
+    """
+    if cur is not None:
+        _record_belief(cur, belief)
+        return
+    
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            _record_belief(cur, belief)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def append_belief(
+    belief: BeliefSnapshot,
+    proposals: List[ForecastProposal],
+    fence: Optional[Callable[[], None]] = None,
+) -> BeliefSnapshot:
+    """Write proposals and belief as the new latest belief of its (event, entity).
+
+    A transaction-scoped advisory lock on (event_id, entity_id) makes this the
+    only writer for the entity until commit, so previous_belief_id is the
+    belief that was latest when this one was written.
+
+    Args:
+        belief: The new belief; its previous_belief_id is replaced
+        proposals: Proposals the belief was aggregated from
+        fence: Called under the lock before anything is written; raising aborts the write
+
+    Returns:
+        The BeliefSnapshot as written
     """
     conn = get_connection()
     try:
         with conn.cursor() as cur:
-            # Convert confidence_interval tuple to JSONB if present
-            confidence_interval_json = None
-            if belief.confidence_interval is not None:
-                confidence_interval_json = json.dumps(list(belief.confidence_interval))
-            
             cur.execute(
-                """
-                INSERT INTO belief_snapshots (belief_id, event_id, entity_id, probability, confidence, confidence_interval, as_of, previous_belief_id)
-                VALUES (%s, %s, %s, %s, %s, %s::jsonb, %s, %s)
-                """,
-                (
-                    belief.belief_id,
-                    belief.event_id,
-                    belief.entity_id,
-                    belief.probability,
-                    belief.confidence,
-                    confidence_interval_json,
-                    belief.as_of,
-                    belief.previous_belief_id,
-                ),
+                "SELECT pg_advisory_xact_lock(hashtext(%s), hashtext(%s))",
+                (belief.event_id, belief.entity_id),
             )
+            if fence is not None:
+                fence()
+
+            execute_prepared(cur, "latest_belief", (belief.event_id, belief.entity_id))
+            row = cur.fetchone()
+            for proposal in proposals:
+                insert_proposal(proposal, cur=cur)
+            belief = belief.model_copy(update={"previous_belief_id": row[0] if row is not None else None})
+            _record_belief(cur, belief)
         conn.commit()
+        return belief
+    except BaseException:
+        conn.rollback()
+        raise
     finally:
         conn.close()
 
+
+def _record_belief(cur, belief: BeliefSnapshot):
+    """Insert the snapshot and update the state derived from it."""
+    _insert_belief_snapshot(cur, belief)
+    apply_belief_to_trend(cur, belief)
+    apply_belief_to_rollup(cur, belief)
+
+
+def _insert_belief_snapshot(cur, belief: BeliefSnapshot):
+    """Insert a belief snapshot using the caller's cursor and transaction."""
+    # Convert confidence_interval tuple to JSONB if present
+    confidence_interval_json = None
+    if belief.confidence_interval is not None:
+        confidence_interval_json = json.dumps(list(belief.confidence_interval))
+    
+    cur.execute(
+        """
+        INSERT INTO belief_snapshots (belief_id, event_id, entity_id, probability, confidence, confidence_interval, as_of, previous_belief_id)
+        VALUES (%s, %s, %s, %s, %s, %s::jsonb, %s, %s)
+        """,
+        (
+            belief.belief_id,
+            belief.event_id,
+            belief.entity_id,
+            belief.probability,
+            belief.confidence,
+            confidence_interval_json,
+            belief.as_of,
+            belief.previous_belief_id,
+        ),
+    )
+
+
+def get_belief_lineage(event_id: str, entity_id: str, max_depth: Optional[int] = None):
+    """Walk the previous_belief_id chain back from the latest belief in one query.
+    
+    Each hop is joined to the latest proposal per agent that existed at the
+    hop's as_of, and the probability delta against the hop's predecessor is
+    computed in SQL.
+    
+    Args:
+        event_id: The event identifier
+        entity_id: The entity identifier
+        max_depth: Maximum number of hops to walk back (default: full chain)
+        
+    Returns:
+        List of dictionaries with: belief_id, probability, confidence, as_of,
+        previous_belief_id, depth, delta, proposals
+        Ordered by depth ascending (latest belief first)
+    """
+    conn = get_read_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                WITH RECURSIVE lineage AS (
+                    (
+                        SELECT belief_id, event_id, entity_id, probability, confidence, as_of, previous_belief_id, 0 AS depth
+                        FROM belief_snapshots
+                        WHERE event_id = %s AND entity_id = %s
+                        ORDER BY as_of DESC
+                        LIMIT 1
+                    )
+                    UNION ALL
+                    SELECT p.belief_id, p.event_id, p.entity_id, p.probability, p.confidence, p.as_of, p.previous_belief_id, l.depth + 1
+                    FROM lineage l
+                    JOIN belief_snapshots p
+                      ON p.belief_id = l.previous_belief_id
+                     AND p.event_id = l.event_id
+                     AND p.entity_id = l.entity_id
+                     AND p.as_of < l.as_of
+                    WHERE l.depth < COALESCE(%s::int + 1, 2147483647)
+                ),
+                hops AS (
+                    -- One extra hop is walked so the deepest returned hop still gets a delta
+                    SELECT
+                        lineage.*,
+                        probability - LEAD(probability) OVER (ORDER BY depth) AS delta
+                    FROM lineage
+                )
+                SELECT
+                    l.belief_id,
+                    l.probability,
+                    l.confidence,
+                    l.as_of,
+                    l.previous_belief_id,
+                    l.depth,
+                    l.delta,
+                    COALESCE(hop_proposals.proposals, '[]'::json) AS proposals
+                FROM hops l
+                LEFT JOIN LATERAL (
+                    SELECT json_agg(
+                        json_build_object(
+                            'proposal_id', fp.proposal_id,
+                            'agent_id', fp.agent_id,
+                            'proposed_probability', fp.proposed_probability,
+                            'rationale', fp.rationale,
+                            'created_at', fp.created_at
+                        )
+                        ORDER BY fp.agent_id
+                    ) AS proposals
+                    FROM (
+                        SELECT DISTINCT ON (agent_id) proposal_id, agent_id, proposed_probability, rationale, created_at
+                        FROM forecast_proposals
+                        WHERE event_id = l.event_id
+                          AND entity_id = l.entity_id
+                          AND created_at <= l.as_of
+                        ORDER BY agent_id, created_at DESC
+                    ) fp
+                ) hop_proposals ON TRUE
+                WHERE l.depth <= COALESCE(%s::int, 2147483647)
+                ORDER BY l.depth ASC
+                """,
+                (event_id, entity_id, max_depth, max_depth),
+            )
+            rows = cur.fetchall()
+            return [
+                {
+                    "belief_id": row[0],
+                    "probability": row[1],
+                    "confidence": row[2],
+                    "as_of": row[3],
+                    "previous_belief_id": row[4],
+                    "depth": row[5],
+                    "delta": row[6],
+                    "proposals": row[7],
+                }
+                for row in rows
+            ]
+    finally:
+        conn.close()
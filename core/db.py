@@ -0,0 +1,368 @@
+import contextlib
+import contextvars
+import itertools
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import psycopg2
+import psycopg2.extensions
+
+# Read-your-writes token for the current request/task: None (any healthy
+# replica), a primary WAL LSN the replica must have replayed, or PRIMARY.
+PRIMARY = "primary"
+_read_after: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("dii_read_after", default=None)
+# Replica chosen by the first read inside pin_replica(), as {"dsn": ...}. A
+# mutable holder, so a choice made in a worker thread is seen by the request.
+_pinned_replica: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("dii_pinned_replica", default=None)
+
+_LSN_PATTERN = re.compile(r"^[0-9A-Fa-f]{1,8}/[0-9A-Fa-f]{1,8}$")
+
+DEFAULT_REPLICA_HEALTH_TTL = 5.0
+DEFAULT_REPLICA_CONNECT_TIMEOUT = 2
+DEFAULT_POOL_MAX_IDLE = 10
+
+
+class PreparingConnection(psycopg2.extensions.connection):
+    """psycopg2 connection that remembers the statements prepared on it (see core.queries)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements: Set[str] = set()
+
+
+class PooledConnection:
+    """A pooled connection; close() hands it back to the pool instead of disconnecting."""
+
+    def __init__(self, pool: "ConnectionPool", conn: PreparingConnection):
+        self._pool = pool
+        self._conn = conn
+
+    @property
+    def connection(self) -> PreparingConnection:
+        return self._conn
+
+    def close(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.put(conn)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class ConnectionPool:
+    """Keeps up to max_idle open connections to one server for reuse.
+
+    Never blocks: when no idle connection is available a new one is opened.
+    Returned connections are rolled back; broken ones are dropped. After a
+    fork, connections inherited from the parent are left untouched, since
+    their sockets still belong to the parent process.
+    """
+
+    def __init__(self, connect: Callable[[], PreparingConnection], max_idle: int = DEFAULT_POOL_MAX_IDLE):
+        self._connect = connect
+        self.max_idle = max_idle
+        self._idle: List[PreparingConnection] = []
+        self._inherited: List[PreparingConnection] = []
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def get(self) -> PooledConnection:
+        conn = None
+        with self._lock:
+            self._after_fork()
+            while self._idle and conn is None:
+                conn = self._idle.pop()
+                if conn.closed:
+                    conn = None
+        return PooledConnection(self, conn if conn is not None else self._connect())
+
+    def put(self, conn: PreparingConnection):
+        if conn.closed:
+            return
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            conn.close()
+            return
+        with self._lock:
+            self._after_fork()
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def _after_fork(self):
+        if os.getpid() != self._pid:
+            self._inherited.extend(self._idle)
+            self._idle = []
+            self._pid = os.getpid()
+
+
+_primary_pool: Optional[ConnectionPool] = None
+_primary_pool_lock = threading.Lock()
+
+
+def get_connection():
+    """Connection to the primary. Use for writes and for reads that must see them."""
+    global _primary_pool
+    if _primary_pool is None:
+        with _primary_pool_lock:
+            if _primary_pool is None:
+                _primary_pool = ConnectionPool(_connect_primary, _pool_max_idle())
+    return _primary_pool.get()
+
+
+def _connect_primary() -> PreparingConnection:
+    return psycopg2.connect(
+        host=os.environ.get("DB_HOST", "localhost"),
+        port=int(os.environ.get("DB_PORT", "5432")),
+        dbname=os.environ.get("DB_NAME", "dii_db"),
+        user=os.environ.get("DB_USER", "dii_user"),
+        password=os.environ.get("DB_PASSWORD", ""),
+        connection_factory=PreparingConnection,
+    )
+
+
+def _pool_max_idle() -> int:
+    return int(os.environ.get("DB_POOL_MAX_IDLE", DEFAULT_POOL_MAX_IDLE))
+
+
+def get_read_connection():
+    """Connection for a read-only query: a healthy replica, else the primary.
+
+    Replicas come from DB_REPLICA_DSNS and are used round-robin. Inside
+    read_after(lsn) only replicas that have replayed lsn qualify; inside
+    read_from_primary(), or with no replicas configured, this is get_connection().
+    Inside pin_replica() every read goes to the server the first one used.
+    """
+    token = _read_after.get()
+    pin = _pinned_replica.get()
+    replicas = get_replica_pool()
+    if token == PRIMARY or replicas is None or (pin is not None and pin.get("dsn") == PRIMARY):
+        return get_connection()
+    conn = replicas.connect(min_lsn=token)
+    if conn is not None:
+        return conn
+    if pin is not None:
+        # The primary is never behind a replica, so later reads stay there
+        pin["dsn"] = PRIMARY
+    return get_connection()
+
+
+def current_wal_lsn() -> str:
+    """The primary's current WAL position, usable as a read_after token."""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_current_wal_lsn()::text")
+            return cur.fetchone()[0]
+    finally:
+        conn.close()
+
+
+def parse_read_token(token: str) -> str:
+    """Validate a read-your-writes token ("primary" or an LSN like "0/16B3748")."""
+    token = token.strip()
+    if token.lower() == PRIMARY:
+        return PRIMARY
+    if not _LSN_PATTERN.match(token):
+        raise ValueError(f"Invalid read token: {token!r} (expected an LSN such as 0/16B3748, or 'primary')")
+    return token.upper()
+
+
+@contextlib.contextmanager
+def read_after(token: Optional[str]):
+    """Route reads in this context to replicas that have replayed token (None: no constraint)."""
+    reset = _read_after.set(parse_read_token(token) if token is not None else None)
+    try:
+        yield
+    finally:
+        _read_after.reset(reset)
+
+
+@contextlib.contextmanager
+def read_from_primary():
+    """Route reads in this context to the primary."""
+    reset = _read_after.set(PRIMARY)
+    try:
+        yield
+    finally:
+        _read_after.reset(reset)
+
+
+@contextlib.contextmanager
+def pin_replica():
+    """Serve all replica reads in this context from one replica, chosen by the first read.
+
+    Round-robin per query would let one request read from replicas at
+    different replay positions, so a later query could see older data than
+    an earlier one. If the pinned replica fails, the next healthy one is
+    pinned instead.
+    """
+    reset = _pinned_replica.set({})
+    try:
+        yield
+    finally:
+        _pinned_replica.reset(reset)
+
+
+def read_token() -> Optional[str]:
+    """The read-your-writes token active in this context."""
+    return _read_after.get()
+
+
+class ReplicaPool:
+    """Round-robin over replica DSNs with cached health checks.
+
+    A replica is healthy when it accepts connections and is still in
+    recovery (a promoted replica is no longer following the primary).
+    Health is re-checked at most once per health_ttl seconds per replica;
+    a failed connect marks it unhealthy until the next check.
+    """
+
+    def __init__(
+        self,
+        dsns: List[str],
+        health_ttl: float = DEFAULT_REPLICA_HEALTH_TTL,
+        connect_timeout: int = DEFAULT_REPLICA_CONNECT_TIMEOUT,
+    ):
+        self.dsns = dsns
+        self.health_ttl = health_ttl
+        self.connect_timeout = connect_timeout
+        self._next = itertools.count()
+        self._health: Dict[str, Tuple[bool, float]] = {}
+        self._lock = threading.Lock()
+        self._pools = {
+            dsn: ConnectionPool(
+                lambda dsn=dsn: psycopg2.connect(
+                    dsn, connect_timeout=connect_timeout, connection_factory=PreparingConnection
+                ),
+                _pool_max_idle(),
+            )
+            for dsn in dsns
+        }
+
+    def connect(self, min_lsn: Optional[str] = None):
+        """Connection to the next healthy replica that has replayed min_lsn, or None.
+
+        Inside pin_replica() the pinned replica is tried first, and the one
+        returned becomes the pinned replica.
+        """
+        pin = _pinned_replica.get()
+        if pin is not None and pin.get("dsn") in self._pools:
+            conn = self._connect(pin["dsn"], min_lsn)
+            if conn is not None:
+                return conn
+
+        start = next(self._next)
+        for offset in range(len(self.dsns)):
+            dsn = self.dsns[(start + offset) % len(self.dsns)]
+            conn = self._connect(dsn, min_lsn)
+            if conn is not None:
+                if pin is not None:
+                    pin["dsn"] = dsn
+                return conn
+        return None
+
+    def _connect(self, dsn: str, min_lsn: Optional[str]):
+        if not self.is_healthy(dsn):
+            return None
+        try:
+            conn = self._pools[dsn].get()
+        except psycopg2.OperationalError:
+            self._mark(dsn, False)
+            return None
+        if min_lsn is None or self._has_replayed(conn, min_lsn):
+            return conn
+        conn.close()
+        return None
+
+    def is_healthy(self, dsn: str) -> bool:
+        with self._lock:
+            cached = self._health.get(dsn)
+        if cached is not None and time.monotonic() - cached[1] < self.health_ttl:
+            return cached[0]
+        healthy = self._check(dsn)
+        self._mark(dsn, healthy)
+        return healthy
+
+    def status(self) -> List[dict]:
+        """Cached health per replica, without running checks."""
+        now = time.monotonic()
+        with self._lock:
+            health = dict(self._health)
+        return [
+            {
+                "replica": _redact(dsn),
+                "healthy": health[dsn][0] if dsn in health else None,
+                "checked_seconds_ago": round(now - health[dsn][1], 1) if dsn in health else None,
+            }
+            for dsn in self.dsns
+        ]
+
+    def _check(self, dsn: str) -> bool:
+        try:
+            conn = psycopg2.connect(dsn, connect_timeout=self.connect_timeout)
+        except psycopg2.OperationalError:
+            return False
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_is_in_recovery()")
+                return bool(cur.fetchone()[0])
+        except psycopg2.Error:
+            return False
+        finally:
+            conn.close()
+
+    def _has_replayed(self, conn, lsn: str) -> bool:
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT COALESCE(pg_last_wal_replay_lsn() >= %s::pg_lsn, false)", (lsn,))
+                replayed = cur.fetchone()[0]
+            conn.rollback()
+            return replayed
+        except psycopg2.Error:
+            return False
+
+    def _mark(self, dsn: str, healthy: bool):
+        with self._lock:
+            self._health[dsn] = (healthy, time.monotonic())
+
+
+_replica_pool: Optional[ReplicaPool] = None
+_replica_pool_configured = False
+_replica_pool_lock = threading.Lock()
+
+
+def get_replica_pool() -> Optional[ReplicaPool]:
+    """The process-wide replica pool from DB_REPLICA_DSNS (comma-separated), or None."""
+    global _replica_pool, _replica_pool_configured
+    if not _replica_pool_configured:
+        with _replica_pool_lock:
+            if not _replica_pool_configured:
+                dsns = [dsn.strip() for dsn in os.environ.get("DB_REPLICA_DSNS", "").split(",") if dsn.strip()]
+                if dsns:
+                    _replica_pool = ReplicaPool(
+                        dsns,
+                        health_ttl=float(os.environ.get("DB_REPLICA_HEALTH_TTL", DEFAULT_REPLICA_HEALTH_TTL)),
+                        connect_timeout=int(os.environ.get("DB_REPLICA_CONNECT_TIMEOUT", DEFAULT_REPLICA_CONNECT_TIMEOUT)),
+                    )
+                _replica_pool_configured = True
+    return _replica_pool
+
+
+def configure_replicas(dsns: Optional[List[str]], **pool_options):
+    """Replace the replica pool (None or [] disables replica reads)."""
+    global _replica_pool, _replica_pool_configured
+    with _replica_pool_lock:
+        _replica_pool = ReplicaPool(dsns, **pool_options) if dsns else None
+        _replica_pool_configured = True
+
+
+def _redact(dsn: str) -> str:
+    dsn = re.sub(r"password=\S+", "password=***", dsn)
+    return re.sub(r"(://[^:/@]+):[^@]*@", r"\1:***@", dsn)
@@ -0,0 +1,366 @@
+import logging
+import queue
+import threading
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from core.db import get_connection, get_read_connection
+from core.decisions import Decision
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL_SECONDS = 1.0
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_MAX_PENDING = 10000
+DEFAULT_MAX_FAILED = 1000
+
+
+class DecisionLogWriter:
+    """Buffers decisions and inserts them in batches from a background thread.
+
+    append() only enqueues, so request handlers never wait on the database.
+    The flusher writes whenever batch_size decisions are queued or
+    flush_interval_seconds have passed, at most batch_size rows per insert.
+    A batch that fails is split in halves until the failing rows are
+    isolated, so one bad decision never blocks the others. A row is retried
+    on later cycles and set aside in `failed` (and logged) after max_attempts
+    failures; only the latest max_failed are kept there. While the database
+    is unreachable, rows wait without using up attempts. Inserts are
+    idempotent on decision_id.
+
+    At most max_pending decisions are held (queued or waiting for a retry).
+    Beyond that append() raises queue.Full and counts the rejection, so an
+    outage pushes back on callers instead of growing memory without limit.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval_seconds: float = DEFAULT_FLUSH_INTERVAL_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        max_failed: int = DEFAULT_MAX_FAILED,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_attempts = max_attempts
+        self.max_pending = max_pending
+        self.max_failed = max_failed
+        self.failed: List[Decision] = []
+        self.rejected = 0  # appends refused because max_pending decisions were held
+        self._pending = 0  # queued plus waiting for a retry
+        self._pending_lock = threading.Lock()
+        self._queue: "queue.Queue[Decision]" = queue.Queue(maxsize=max_pending)
+        self._retry: List[Tuple[Decision, int]] = []  # (decision, failed attempts so far)
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="decision-log-writer", daemon=True)
+        self._thread.start()
+
+    def append(self, decision: Decision):
+        """Queue a decision. Raises queue.Full if max_pending decisions are already held."""
+        with self._pending_lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise queue.Full(f"{self._pending} decisions waiting to be written")
+            self._pending += 1
+        self._queue.put_nowait(decision)
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Write everything queued so far. Returns the number of decisions written."""
+        with self._flush_lock:
+            rows, self._retry = self._retry, []
+            while True:
+                try:
+                    rows.append((self._queue.get_nowait(), 0))
+                except queue.Empty:
+                    break
+
+            written: List[str] = []
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                try:
+                    self._write(batch, written)
+                except psycopg2.OperationalError:
+                    logger.exception("Decision log database unavailable; %d decisions wait for the next cycle", len(rows) - start)
+                    # Rows bisection already wrote, retried or set aside are not queued twice
+                    handled = set(written) | {decision.decision_id for decision, _ in self._retry}
+                    handled.update(decision.decision_id for decision in self.failed)
+                    self._retry.extend(row for row in rows[start:] if row[0].decision_id not in handled)
+                    break
+            self._release(len(written))
+            return len(written)
+
+    def pending(self) -> int:
+        """Decisions queued or waiting for a retry."""
+        with self._pending_lock:
+            return self._pending
+
+    def close(self):
+        """Stop the flusher and write whatever is still queued."""
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+        if self._retry:
+            logger.error(
+                "Decision log closed with %d unwritten decisions: %s",
+                len(self._retry),
+                ", ".join(decision.decision_id for decision, _ in self._retry),
+            )
+
+    def _write(self, batch: List[Tuple[Decision, int]], written: List[str]):
+        """Insert a batch, bisecting on failure; appends written ids to written. Re-raises OperationalError."""
+        try:
+            _insert_decisions([decision for decision, _ in batch])
+            written.extend(decision.decision_id for decision, _ in batch)
+        except psycopg2.OperationalError:
+            raise
+        except Exception:
+            if len(batch) > 1:
+                middle = len(batch) // 2
+                self._write(batch[:middle], written)
+                self._write(batch[middle:], written)
+                return
+
+            decision, attempts = batch[0]
+            attempts += 1
+            if attempts >= self.max_attempts:
+                logger.exception("Decision %s failed %d times; setting it aside", decision.decision_id, attempts)
+                self.failed.append(decision)
+                del self.failed[:-self.max_failed]
+                self._release(1)
+            else:
+                logger.warning("Decision %s failed (attempt %d); retrying next cycle", decision.decision_id, attempts)
+                self._retry.append((decision, attempts))
+
+    def _release(self, count: int):
+        with self._pending_lock:
+            self._pending -= count
+
+    def _run(self):
+        while not self._stopped.is_set():
+            # append() wakes the flusher early once a full batch is waiting
+            self._wakeup.wait(self.flush_interval_seconds)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Decision log flush failed; retrying next cycle")
+
+
+_writer: Optional[DecisionLogWriter] = None
+_writer_lock = threading.Lock()
+
+
+def log_decision(decision: Decision):
+    """Queue a decision for batched insertion.
+
+    Raises:
+        queue.Full: If the writer already holds its maximum of unwritten decisions
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = DecisionLogWriter()
+    _writer.append(decision)
+
+
+def close_decision_log():
+    """Flush queued decisions and stop the background writer (call on shutdown)."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.close()
+
+
+def get_decisions_with_outcomes(
+    event_id: str,
+    change_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    horizon_days: int = 30,
+    limit: int = 100,
+):
+    """Get decisions joined to the belief they acted on and what happened next.
+
+    The outcome is the entity's latest belief within horizon_days after the decision.
+    Decisions whose belief snapshot no longer exists are still returned, with
+    belief_compacted set and the belief fields and outcome_delta None.
+
+    Args:
+        event_id: The event identifier
+        change_type: Only decisions on alerts of this change_type (e.g. "significant_drop")
+        since: Only decisions taken at or after this time
+        horizon_days: How far after the decision to look for the outcome belief
+        limit: Maximum number of records to return (default: 100)
+
+    Returns:
+        List of dictionaries with decision fields, belief_probability, belief_as_of,
+        belief_compacted, outcome_belief_id, outcome_probability, outcome_as_of and outcome_delta,
+        newest decision first
+    """
+    conn = get_read_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT
+                    d.decision_id, d.entity_id, d.change_type, d.suggestion, d.action, d.decided_by, d.decided_at,
+                    d.belief_id, b.probability, b.confidence, d.belief_as_of, b.belief_id IS NULL,
+                    o.belief_id, o.probability, o.as_of,
+                    o.probability - b.probability
+                FROM decisions d
+                LEFT JOIN belief_snapshots b
+                  ON b.belief_id = d.belief_id AND b.as_of = d.belief_as_of
+                LEFT JOIN LATERAL (
+                    SELECT belief_id, probability, as_of
+                    FROM belief_snapshots
+                    WHERE event_id = d.event_id
+                      AND entity_id = d.entity_id
+                      AND as_of > d.decided_at
+                      AND as_of <= d.decided_at + make_interval(days => %s)
+                    ORDER BY as_of DESC
+                    LIMIT 1
+                ) o ON TRUE
+                WHERE d.event_id = %s
+                  AND (%s::text IS NULL OR d.change_type = %s)
+                  AND (%s::timestamp IS NULL OR d.decided_at >= %s)
+                ORDER BY d.decided_at DESC
+                LIMIT %s
+                """,
+                (horizon_days, event_id, change_type, change_type, since, since, limit),
+            )
+            return [
+                {
+                    "decision_id": row[0],
+                    "entity_id": row[1],
+                    "change_type": row[2],
+                    "suggestion": row[3],
+                    "action": row[4],
+                    "decided_by": row[5],
+                    "decided_at": row[6],
+                    "belief_id": row[7],
+                    "belief_probability": row[8],
+                    "belief_confidence": row[9],
+                    "belief_as_of": row[10],
+                    "belief_compacted": row[11],
+                    "outcome_belief_id": row[12],
+                    "outcome_probability": row[13],
+                    "outcome_as_of": row[14],
+                    "outcome_delta": row[15],
+                }
+                for row in cur.fetchall()
+            ]
+    finally:
+        conn.close()
+
+
+def summarize_decision_outcomes(
+    event_id: str,
+    change_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    horizon_days: int = 30,
+):
+    """Aggregate decision outcomes per action in one pass.
+
+    Args:
+        event_id: The event identifier
+        change_type: Only decisions on alerts of this change_type
+        since: Only decisions taken at or after this time
+        horizon_days: How far after the decision to look for the outcome belief
+
+    Returns:
+        List of dictionaries with: action, decisions, with_outcome,
+        avg_outcome_delta, improved, worsened
+    """
+    conn = get_read_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT
+                    d.action,
+                    count(*),
+                    count(o.probability),
+                    avg(o.probability - b.probability),
+                    count(*) FILTER (WHERE o.probability > b.probability),
+                    count(*) FILTER (WHERE o.probability < b.probability)
+                FROM decisions d
+                LEFT JOIN belief_snapshots b
+                  ON b.belief_id = d.belief_id AND b.as_of = d.belief_as_of
+                LEFT JOIN LATERAL (
+                    SELECT probability
+                    FROM belief_snapshots
+                    WHERE event_id = d.event_id
+                      AND entity_id = d.entity_id
+                      AND as_of > d.decided_at
+                      AND as_of <= d.decided_at + make_interval(days => %s)
+                    ORDER BY as_of DESC
+                    LIMIT 1
+                ) o ON TRUE
+                WHERE d.event_id = %s
+                  AND (%s::text IS NULL OR d.change_type = %s)
+                  AND (%s::timestamp IS NULL OR d.decided_at >= %s)
+                GROUP BY d.action
+                ORDER BY d.action
+                """,
+                (horizon_days, event_id, change_type, change_type, since, since),
+            )
+            return [
+                {
+                    "action": row[0],
+                    "decisions": row[1],
+                    "with_outcome": row[2],
+                    "avg_outcome_delta": row[3],
+                    "improved": row[4],
+                    "worsened": row[5],
+                }
+                for row in cur.fetchall()
+            ]
+    finally:
+        conn.close()
+
+
+def _insert_decisions(decisions: List[Decision]):
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            execute_values(
+                cur,
+                """
+                INSERT INTO decisions
+                    (decision_id, belief_id, belief_as_of, event_id, entity_id, change_type,
+                     suggestion, reason, action, decided_by, notes, decided_at)
+                VALUES %s
+                ON CONFLICT (decision_id) DO NOTHING
+                """,
+                [
+                    (
+                        d.decision_id,
+                        d.belief_id,
+                        d.belief_as_of,
+                        d.event_id,
+                        d.entity_id,
+                        d.change_type,
+                        d.suggestion,
+                        d.reason,
+                        d.action,
+                        d.decided_by,
+                        d.notes,
+                        d.decided_at,
+                    )
+                    for d in decisions
+                ],
+                page_size=len(decisions),
+            )
+        conn.commit()
+    finally:
+        conn.close()
@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+
+DecisionAction = Literal["accepted", "dismissed", "deferred"]
+
+
+class Decision(BaseModel):
+    decision_id: str
+    belief_id: str
+    belief_as_of: datetime  # as_of of the belief, so joins hit one partition
+    event_id: str
+    entity_id: str
+    change_type: Optional[str] = None  # change_type of the alert acted upon
+    suggestion: str
+    reason: Optional[str] = None
+    action: DecisionAction
+    decided_by: Optional[str] = None
+    notes: Optional[str] = None
+    decided_at: datetime
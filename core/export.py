@@ -0,0 +1,339 @@
+import argparse
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from core.db import get_read_connection
+
+DEFAULT_CHUNK_SIZE = 50000
+# created_at is set when the inserting transaction starts, so a row can
+# commit after rows with a later created_at were already exported.
+# Incremental exports re-read this window below the watermark and drop
+# rows already exported (by key_column).
+DEFAULT_WATERMARK_LAG = timedelta(minutes=5)
+MANIFEST_FILE = "manifest.json"
+FORMATS = {"parquet": ".parquet", "feather": ".feather"}
+
+# Column name and Arrow type per exported table. created_at is the ingestion
+# time of every row (NOT NULL since migration 009) and serves as the
+# incremental watermark; key_column identifies a row across exports.
+EXPORT_TABLES = {
+    "belief_snapshots": {
+        "columns": [
+            ("belief_id", "string"),
+            ("event_id", "string"),
+            ("entity_id", "string"),
+            ("probability", "float64"),
+            ("confidence", "string"),
+            ("confidence_interval", "string"),
+            ("as_of", "timestamp"),
+            ("previous_belief_id", "string"),
+            ("created_at", "timestamp"),
+        ],
+        "time_column": "as_of",
+        "key_column": "belief_id",
+        "has_event_id": True,
+    },
+    "forecast_proposals": {
+        "columns": [
+            ("proposal_id", "string"),
+            ("agent_id", "string"),
+            ("event_id", "string"),
+            ("entity_id", "string"),
+            ("proposed_probability", "float64"),
+            ("rationale", "string"),
+            ("created_at", "timestamp"),
+        ],
+        "time_column": "created_at",
+        "key_column": "proposal_id",
+        "has_event_id": True,
+    },
+    "signals": {
+        "columns": [
+            ("signal_id", "string"),
+            ("entity_id", "string"),
+            ("signal_type", "string"),
+            ("value_num", "float64"),
+            ("value_bool", "bool"),
+            ("value_text", "string"),
+            ("value", "string"),
+            ("timestamp", "timestamp"),
+            ("source", "string"),
+            ("confidence_hint", "float64"),
+            ("created_at", "timestamp"),
+        ],
+        "time_column": "timestamp",
+        "key_column": "signal_id",
+        "has_event_id": False,
+    },
+}
+
+# JSONB columns exported as JSON text
+_JSON_COLUMNS = {"confidence_interval", "value"}
+
+
+def export_table(
+    table: str,
+    out_dir: str,
+    event_id: Optional[str] = None,
+    entity_ids: Optional[List[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    incremental: bool = False,
+    fmt: str = "parquet",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    watermark_lag: timedelta = DEFAULT_WATERMARK_LAG,
+) -> dict:
+    """Stream one table into a compressed columnar file with constant memory.
+
+    Rows are read through a server-side cursor chunk_size at a time and each
+    chunk is appended to the output file as a row group / record batch.
+    The export is recorded in out_dir/manifest.json together with the schema
+    and the table's new watermark (max created_at exported so far). The
+    manifest also keeps the keys of rows exported within watermark_lag of
+    the watermark, so an incremental export can re-read that window for
+    late commits without exporting a row twice.
+
+    Args:
+        table: One of EXPORT_TABLES
+        out_dir: Directory for the output file and manifest
+        event_id: Only rows for this event (ignored for signals)
+        entity_ids: Only rows for these entities
+        since: Only rows with time column >= since
+        until: Only rows with time column < until
+        incremental: Only rows created after the watermark in the manifest
+        fmt: "parquet" or "feather"
+        chunk_size: Rows per fetch and per row group
+        watermark_lag: How far below the watermark incremental exports re-read
+
+    Returns:
+        The manifest entry for this export
+    """
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown export table: {table}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = read_manifest(out_dir)
+    table_manifest = manifest["tables"].setdefault(table, {"watermark": None, "exports": []})
+    after_watermark = table_manifest["watermark"] if incremental else None
+    recent_keys = table_manifest.get("recent_keys", {})
+
+    path = os.path.join(out_dir, f"{table}-{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}{FORMATS[fmt]}")
+    rows, watermark, exported_keys = stream_table(
+        table,
+        path,
+        event_id,
+        entity_ids,
+        since,
+        until,
+        after_watermark,
+        fmt,
+        chunk_size,
+        watermark_lag,
+        exclude_keys=set(recent_keys) if incremental else None,
+    )
+
+    entry = {
+        "file": os.path.basename(path),
+        "format": fmt,
+        "rows": rows,
+        "exported_at": datetime.utcnow().isoformat(),
+        "filters": {
+            "event_id": event_id,
+            "entity_ids": entity_ids,
+            "since": since.isoformat() if since else None,
+            "until": until.isoformat() if until else None,
+            "after_watermark": after_watermark,
+        },
+        "schema": [{"name": name, "type": arrow_type} for name, arrow_type in EXPORT_TABLES[table]["columns"]],
+        "watermark": watermark or after_watermark,
+    }
+    table_manifest["exports"].append(entry)
+    if watermark is not None and (table_manifest["watermark"] is None or watermark > table_manifest["watermark"]):
+        table_manifest["watermark"] = watermark
+    if table_manifest["watermark"] is not None:
+        window_start = datetime.fromisoformat(table_manifest["watermark"]) - watermark_lag
+        table_manifest["recent_keys"] = {
+            key: created_at
+            for key, created_at in {**recent_keys, **exported_keys}.items()
+            if datetime.fromisoformat(created_at) >= window_start
+        }
+    _write_manifest(out_dir, manifest)
+    return entry
+
+
+def stream_table(
+    table: str,
+    path: str,
+    event_id: Optional[str] = None,
+    entity_ids: Optional[List[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    after_watermark: Optional[str] = None,
+    fmt: str = "parquet",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    watermark_lag: timedelta = DEFAULT_WATERMARK_LAG,
+    exclude_keys: Optional[Set[str]] = None,
+):
+    """Write the filtered rows of a table to path.
+
+    With after_watermark, rows created from watermark_lag before it are
+    read, so rows that committed late are not missed; rows whose key is in
+    exclude_keys are skipped.
+
+    Returns:
+        Tuple of (rows written, max created_at as ISO string or None,
+        dict of key to created_at ISO string for rows written within
+        watermark_lag of that max)
+    """
+    import pandas as pd
+
+    pa, pq, ipc = _import_pyarrow()
+
+    spec = EXPORT_TABLES[table]
+    key_column = spec["key_column"]
+    column_names = [name for name, _ in spec["columns"]]
+    schema = pa.schema([(name, _arrow_type(pa, arrow_type)) for name, arrow_type in spec["columns"]])
+    select_list = ", ".join(f"{name}::text" if name in _JSON_COLUMNS else name for name in column_names)
+
+    conditions = []
+    params = []
+    if spec["has_event_id"] and event_id is not None:
+        conditions.append("event_id = %s")
+        params.append(event_id)
+    if entity_ids:
+        conditions.append("entity_id = ANY(%s)")
+        params.append(entity_ids)
+    if since is not None:
+        conditions.append(f"{spec['time_column']} >= %s")
+        params.append(since)
+    if until is not None:
+        conditions.append(f"{spec['time_column']} < %s")
+        params.append(until)
+    if after_watermark is not None:
+        conditions.append("created_at > %s")
+        params.append(datetime.fromisoformat(after_watermark) - watermark_lag)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(path, schema, compression="zstd")
+        write = writer.write_table
+    else:
+        writer = ipc.new_file(path, schema, options=ipc.IpcWriteOptions(compression="zstd"))
+        write = writer.write_table
+
+    rows = 0
+    watermark = None
+    recent: Dict[str, datetime] = {}
+    conn = get_read_connection()
+    try:
+        # Named cursor = server-side cursor; only one chunk is in memory at a time
+        with conn.cursor(name=f"export_{uuid.uuid4().hex}") as cur:
+            cur.itersize = chunk_size
+            cur.execute(f"SELECT {select_list} FROM {table} {where}", params)
+            while True:
+                chunk = cur.fetchmany(chunk_size)
+                if not chunk:
+                    break
+                frame = pd.DataFrame(chunk, columns=column_names)
+                if exclude_keys:
+                    frame = frame[~frame[key_column].isin(exclude_keys)]
+                if frame.empty:
+                    continue
+                write(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+                rows += len(frame)
+                chunk_watermark = frame["created_at"].max()
+                if pd.notna(chunk_watermark) and (watermark is None or chunk_watermark > watermark):
+                    watermark = chunk_watermark
+                if watermark is not None:
+                    window_start = watermark - watermark_lag
+                    in_window = frame[frame["created_at"] >= window_start]
+                    recent.update(zip(in_window[key_column], in_window["created_at"]))
+                    recent = {key: created_at for key, created_at in recent.items() if created_at >= window_start}
+    finally:
+        writer.close()
+        conn.close()
+
+    return (
+        rows,
+        watermark.isoformat() if watermark is not None else None,
+        {key: created_at.isoformat() for key, created_at in recent.items()},
+    )
+
+
+def read_manifest(out_dir: str) -> dict:
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"tables": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_manifest(out_dir: str, manifest: dict):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _arrow_type(pa, arrow_type: str):
+    return {
+        "string": pa.string(),
+        "float64": pa.float64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us"),
+    }[arrow_type]
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("Columnar export requires pyarrow: pip install 'dii[export]'") from exc
+    return pa, pq, ipc
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Export tables to compressed columnar files")
+    parser.add_argument("tables", nargs="*", default=list(EXPORT_TABLES), help="Tables to export (default: all)")
+    parser.add_argument("--out-dir", required=True)
+    parser.add_argument("--event-id", default=None)
+    parser.add_argument("--entity-id", action="append", dest="entity_ids", default=None)
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--until", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--incremental", action="store_true", help="Only rows created after the last watermark")
+    parser.add_argument("--format", dest="fmt", choices=list(FORMATS), default="parquet")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument(
+        "--watermark-lag-seconds",
+        type=float,
+        default=DEFAULT_WATERMARK_LAG.total_seconds(),
+        help="How far below the watermark incremental exports re-read for late commits",
+    )
+    args = parser.parse_args(argv)
+
+    for table in args.tables:
+        entry = export_table(
+            table,
+            args.out_dir,
+            event_id=args.event_id,
+            entity_ids=args.entity_ids,
+            since=args.since,
+            until=args.until,
+            incremental=args.incremental,
+            fmt=args.fmt,
+            chunk_size=args.chunk_size,
+            watermark_lag=timedelta(seconds=args.watermark_lag_seconds),
+        )
+        print(json.dumps({"table": table, "file": entry["file"], "rows": entry["rows"], "watermark": entry["watermark"]}))
+
+
+if __name__ == "__main__":
+    main()
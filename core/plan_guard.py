@@ -0,0 +1,254 @@
+"""Query-plan regression guard for the registered store queries (core.queries).
+
+    python -m core.plan_guard                      # check against db/plan_baseline.json
+    python -m core.plan_guard --write-baseline     # record current costs as the baseline
+
+VACUUMs the seeded tables, seeds a synthetic portfolio inside one
+transaction, ANALYZEs it and EXPLAINs every registered query as a prepared
+statement, with both a custom and a generic plan. The run fails when a plan reads a guarded table with a Seq
+Scan, when its estimated total cost exceeds the baseline by more than
+--threshold, or when a registered query has no recorded baseline cost.
+Everything, including the statistics, is rolled back at the end. Run it
+against a test database that has the migrations applied; the test suite
+runs it when DII_TEST_POSTGRES is set (tests/test_plan_guard.py).
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+from psycopg2.extensions import AsIs
+
+from core.db import get_connection
+from core.queries import QUERIES, prepare
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "..", "db", "plan_baseline.json")
+DEFAULT_THRESHOLD = 1.5
+DEFAULT_ENTITIES = 2000
+DEFAULT_BELIEFS_PER_ENTITY = 10
+# Relations smaller than this are legitimately cheaper to scan than to probe
+MIN_GUARDED_ROWS = 1000
+
+PLAN_MODES = {"custom": "force_custom_plan", "generic": "force_generic_plan"}
+
+SEED_EVENT = "plan_guard_event"
+# Beliefs of other events, so the seeded event is a small share of the
+# table as in production and per-event reads must use the index
+OTHER_EVENTS = 9
+SEED_ENTITY = "plan_guard_ent_000042"
+SIGNAL_TYPES = ["runway_months", "burn_rate", "hiring_signal", "funding_news"]
+
+# Parameters for EXECUTE, pointing at seeded rows (bel_0 is seeded at now())
+SAMPLE_PARAMS = {
+    "latest_belief": (SEED_EVENT, SEED_ENTITY),
+    "belief_history": (SEED_EVENT, SEED_ENTITY, 20),
+    "previous_belief": (SEED_EVENT, SEED_ENTITY, f"{SEED_ENTITY}_bel_0", AsIs("now()::timestamp")),
+    "entities_with_beliefs": (SEED_EVENT,),
+    "proposals": (SEED_EVENT, SEED_ENTITY),
+    "latest_signals": ([SEED_ENTITY, "plan_guard_ent_000043"], SIGNAL_TYPES[:2]),
+}
+
+
+def seed(cur, entities: int, beliefs_per_entity: int):
+    """Insert a synthetic portfolio: beliefs and their trend state, two agents' proposals and signals per entity.
+
+    Beliefs are also seeded for OTHER_EVENTS other events; belief ids of
+    SEED_EVENT are plan_guard_ent_NNNNNN_bel_B.
+    """
+    cur.execute(
+        """
+        INSERT INTO belief_snapshots (belief_id, event_id, entity_id, probability, confidence, as_of)
+        SELECT
+            format('plan_guard_ent_%%s_bel_%%s%%s', lpad(e::text, 6, '0'), b, CASE WHEN v = 0 THEN '' ELSE '_' || v END),
+            CASE WHEN v = 0 THEN %s ELSE format('plan_guard_event_%%s', v) END,
+            format('plan_guard_ent_%%s', lpad(e::text, 6, '0')),
+            random(),
+            'medium',
+            now() - make_interval(days => b)
+        FROM generate_series(1, %s) AS e, generate_series(0, %s - 1) AS b, generate_series(0, %s) AS v
+        """,
+        (SEED_EVENT, entities, beliefs_per_entity, OTHER_EVENTS),
+    )
+    # Trend state of the latest belief (bel_0), as kept by every belief write
+    cur.execute(
+        """
+        INSERT INTO belief_trends (
+            event_id, entity_id, belief_id, probability, ewma, ewm_variance, slope,
+            recent_probabilities, snapshot_count, as_of
+        )
+        SELECT
+            CASE WHEN v = 0 THEN %s ELSE format('plan_guard_event_%%s', v) END,
+            format('plan_guard_ent_%%s', lpad(e::text, 6, '0')),
+            format('plan_guard_ent_%%s_bel_0%%s', lpad(e::text, 6, '0'), CASE WHEN v = 0 THEN '' ELSE '_' || v END),
+            0.5, 0.5, 0.0, 0.0, '[]', %s, now()
+        FROM generate_series(1, %s) AS e, generate_series(0, %s) AS v
+        """,
+        (SEED_EVENT, beliefs_per_entity, entities, OTHER_EVENTS),
+    )
+    cur.execute(
+        """
+        INSERT INTO forecast_proposals (proposal_id, agent_id, event_id, entity_id, proposed_probability, rationale, created_at)
+        SELECT
+            format('plan_guard_ent_%%s_prop_%%s_%%s', lpad(e::text, 6, '0'), a, b),
+            format('plan_guard_agent_%%s', a),
+            %s,
+            format('plan_guard_ent_%%s', lpad(e::text, 6, '0')),
+            random(),
+            'plan guard',
+            now() - make_interval(days => b)
+        FROM generate_series(1, %s) AS e, generate_series(1, 2) AS a, generate_series(0, %s - 1) AS b
+        """,
+        (SEED_EVENT, entities, beliefs_per_entity),
+    )
+    cur.execute(
+        """
+        INSERT INTO signals (signal_id, entity_id, signal_type, value, timestamp, source)
+        SELECT
+            format('plan_guard_ent_%%s_sig_%%s_%%s', lpad(e::text, 6, '0'), t.signal_type, b),
+            format('plan_guard_ent_%%s', lpad(e::text, 6, '0')),
+            t.signal_type,
+            to_jsonb(round((random() * 24)::numeric, 1)),
+            now() - make_interval(days => b),
+            'plan_guard'
+        FROM generate_series(1, %s) AS e, unnest(%s::text[]) AS t(signal_type), generate_series(0, %s - 1) AS b
+        """,
+        (entities, SIGNAL_TYPES, beliefs_per_entity),
+    )
+    cur.execute("ANALYZE belief_snapshots, belief_trends, forecast_proposals, signals")
+
+
+def explain(cur, name: str, mode: str) -> dict:
+    """EXPLAIN (FORMAT JSON) the prepared statement under a plan cache mode."""
+    params = SAMPLE_PARAMS[name]
+    prepare(cur, name)
+    cur.execute(f"SET LOCAL plan_cache_mode = {PLAN_MODES[mode]}")
+    placeholders = ", ".join(["%s"] * len(params))
+    cur.execute(f"EXPLAIN (FORMAT JSON) EXECUTE {name} ({placeholders})", params)
+    plan = cur.fetchone()[0]
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+
+
+def seq_scans(plan: dict, tables: List[str]) -> List[str]:
+    """Relations of guarded tables (or their partitions) read by a Seq Scan anywhere in the plan."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        relation = plan.get("Relation Name", "")
+        if any(relation == table or relation.startswith(f"{table}_") for table in tables):
+            found.append(relation)
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child, tables))
+    return found
+
+
+def check_plans(
+    baseline: Optional[Dict[str, Dict[str, float]]] = None,
+    threshold: float = DEFAULT_THRESHOLD,
+    entities: int = DEFAULT_ENTITIES,
+    beliefs_per_entity: int = DEFAULT_BELIEFS_PER_ENTITY,
+) -> dict:
+    """Seed, EXPLAIN every registered query, roll back.
+
+    Args:
+        baseline: Dict of query name to {mode: total cost} from a previous run
+        threshold: Allowed ratio of current to baseline cost
+        entities: Seeded entities
+        beliefs_per_entity: Seeded beliefs, proposals per agent and signals per type per entity
+
+    Returns:
+        Dict with costs ({name: {mode: total cost}}) and failures (list of messages)
+    """
+    missing = sorted(set(QUERIES) - set(SAMPLE_PARAMS))
+    if missing:
+        return {"costs": {}, "failures": [f"No sample parameters for registered queries: {', '.join(missing)}"]}
+
+    costs: Dict[str, Dict[str, float]] = {}
+    failures: List[str] = []
+    conn = get_connection()
+    try:
+        _vacuum(conn)
+        with conn.cursor() as cur:
+            seed(cur, entities, beliefs_per_entity)
+            for name, query in QUERIES.items():
+                costs[name] = {}
+                for mode in PLAN_MODES:
+                    plan = explain(cur, name, mode)
+                    cost = plan["Total Cost"]
+                    costs[name][mode] = cost
+
+                    for relation in _populated(cur, seq_scans(plan, list(query.tables))):
+                        failures.append(f"{name} ({mode} plan): Seq Scan on {relation}")
+
+                    if baseline is None:
+                        continue
+                    baseline_cost = baseline.get(name, {}).get(mode)
+                    if baseline_cost is None:
+                        failures.append(f"{name} ({mode} plan): no baseline cost; record it with --write-baseline")
+                    elif cost > baseline_cost * threshold:
+                        failures.append(
+                            f"{name} ({mode} plan): cost {cost:.1f} exceeds baseline {baseline_cost:.1f} x {threshold}"
+                        )
+    finally:
+        conn.rollback()
+        # Plans prepared against the seeded statistics must not be reused
+        with conn.cursor() as cur:
+            cur.execute("DEALLOCATE ALL")
+        conn.connection.prepared_statements.clear()
+        conn.close()
+
+    return {"costs": costs, "failures": failures}
+
+
+def _vacuum(conn):
+    """VACUUM the seeded tables; dead rows from earlier runs' rolled-back seeds would inflate the costs."""
+    raw = conn.connection
+    raw.rollback()
+    raw.autocommit = True
+    try:
+        with raw.cursor() as cur:
+            cur.execute("VACUUM belief_snapshots, belief_trends, forecast_proposals, signals")
+    finally:
+        raw.autocommit = False
+
+
+def _populated(cur, relations: List[str]) -> List[str]:
+    """Relations with at least MIN_GUARDED_ROWS rows; scanning an empty or tiny partition is not a regression."""
+    if not relations:
+        return []
+    cur.execute("SELECT relname FROM pg_class WHERE relname = ANY(%s) AND reltuples >= %s", (relations, MIN_GUARDED_ROWS))
+    populated = {row[0] for row in cur.fetchall()}
+    return [relation for relation in relations if relation in populated]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Fail when a registered store query's plan regresses")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline costs JSON")
+    parser.add_argument("--write-baseline", action="store_true", help="Record the current costs as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--entities", type=int, default=DEFAULT_ENTITIES)
+    parser.add_argument("--beliefs-per-entity", type=int, default=DEFAULT_BELIEFS_PER_ENTITY)
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if not args.write_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    result = check_plans(baseline, args.threshold, args.entities, args.beliefs_per_entity)
+    for name, modes in result["costs"].items():
+        print(f"{name:<24} " + "  ".join(f"{mode}={cost:.1f}" for mode, cost in modes.items()))
+    for failure in result["failures"]:
+        print(f"FAIL {failure}")
+
+    if args.write_baseline and not result["failures"]:
+        with open(args.baseline, "w") as f:
+            json.dump(result["costs"], f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+
+    if result["failures"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
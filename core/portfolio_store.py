@@ -1,7 +1,9 @@
+from datetime import datetime
 from typing import List, Optional
 
 from core.beliefs import BeliefSnapshot
-from core.db import get_connection
+from core.db import get_read_connection
+from core.queries import execute_prepared
 
 
 def get_entities_with_beliefs(event_id: str) -> List[str]:
@@ -13,55 +15,38 @@ def get_entities_with_beliefs(event_id: str) -> List[str]:
     Returns:
         List of distinct entity_id strings
     """
-    conn = get_connection()
+    conn = get_read_connection()
     try:
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT DISTINCT entity_id
-                FROM belief_snapshots
-                WHERE event_id = %s
-                ORDER BY entity_id
-                """,
-                (event_id,),
-            )
+            execute_prepared(cur, "entities_with_beliefs", (event_id,))
             rows = cur.fetchall()
             return [row[0] for row in rows]
     finally:
         conn.close()
 
 
-def get_previous_belief(event_id: str, entity_id: str, current_belief_id: str) -> Optional[BeliefSnapshot]:
+def get_previous_belief(
+    event_id: str,
+    entity_id: str,
+    current_belief_id: str,
+    current_as_of: datetime,
+) -> Optional[BeliefSnapshot]:
     """Get the previous belief snapshot before the current one.
     
     Args:
         event_id: The event identifier
         entity_id: The entity identifier
         current_belief_id: The belief_id of the current belief
+        current_as_of: The as_of of the current belief, so partitions are pruned
         
     Returns:
         The previous BeliefSnapshot or None if not found
     """
-    conn = get_connection()
+    conn = get_read_connection()
     try:
         with conn.cursor() as cur:
             # Single query using subquery to get previous belief
-            cur.execute(
-                """
-                SELECT bs.belief_id, bs.event_id, bs.entity_id, bs.probability, bs.confidence, bs.confidence_interval, bs.as_of, bs.previous_belief_id
-                FROM belief_snapshots bs
-                WHERE bs.event_id = %s 
-                  AND bs.entity_id = %s 
-                  AND bs.as_of < (
-                      SELECT as_of 
-                      FROM belief_snapshots 
-                      WHERE belief_id = %s
-                  )
-                ORDER BY bs.as_of DESC
-                LIMIT 1
-                """,
-                (event_id, entity_id, current_belief_id),
-            )
+            execute_prepared(cur, "previous_belief", (event_id, entity_id, current_belief_id, current_as_of))
             row = cur.fetchone()
             if row is None:
                 return None
@@ -1,44 +1,46 @@
-from core.db import get_connection
+from core.db import get_connection, get_read_connection
+from core.queries import execute_prepared
 from core.proposals import ForecastProposal
 
 
-def insert_proposal(proposal: ForecastProposal):
+def insert_proposal(proposal: ForecastProposal, cur=None):
+    if cur is not None:
+        _insert_proposal(cur, proposal)
+        return
+    
     conn = get_connection()
     try:
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO forecast_proposals (proposal_id, agent_id, event_id, entity_id, proposed_probability, rationale, created_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """,
-                (
-                    proposal.proposal_id,
-                    proposal.agent_id,
-                    proposal.event_id,
-                    proposal.entity_id,
-                    proposal.proposed_probability,
-                    proposal.rationale,
-                    proposal.created_at,
-                ),
-            )
+            _insert_proposal(cur, proposal)
         conn.commit()
     finally:
         conn.close()
 
 
+def _insert_proposal(cur, proposal: ForecastProposal):
+    """Insert a forecast proposal using the caller's cursor and transaction."""
+    cur.execute(
+        """
+        INSERT INTO forecast_proposals (proposal_id, agent_id, event_id, entity_id, proposed_probability, rationale, created_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """,
+        (
+            proposal.proposal_id,
+            proposal.agent_id,
+            proposal.event_id,
+            proposal.entity_id,
+            proposal.proposed_probability,
+            proposal.rationale,
+            proposal.created_at,
+        ),
+    )
+
+
 def get_proposals(event_id: str, entity_id: str):
-    conn = get_connection()
+    conn = get_read_connection()
     try:
         with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT proposal_id, agent_id, event_id, entity_id, proposed_probability, rationale, created_at
-                FROM forecast_proposals
-                WHERE event_id = %s AND entity_id = %s
-                ORDER BY created_at DESC
-                """,
-                (event_id, entity_id),
-            )
+            execute_prepared(cur, "proposals", (event_id, entity_id))
             rows = cur.fetchall()
             return [
                 ForecastProposal(
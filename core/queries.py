@@ -0,0 +1,164 @@
+"""Hot store queries, registered once and run as server-side prepared statements.
+
+Each query is PREPAREd the first time it runs on a pooled connection (see
+core.db.PreparingConnection) and EXECUTEd from then on, so Postgres parses
+and plans the text once per connection instead of once per call.
+core.plan_guard EXPLAINs every registered query to catch plan regressions.
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, Sequence, Tuple
+
+_PLACEHOLDER = re.compile(r"\$(\d+)")
+
+
+@dataclass(frozen=True)
+class Query:
+    name: str
+    sql: str  # $1..$n placeholders
+    param_types: Tuple[str, ...]
+    tables: Tuple[str, ...]  # tables that must be read through an index
+
+    def pyformat(self, params: Sequence) -> Tuple[str, list]:
+        """The query as %s-style SQL with params in placeholder order, for unprepared execution."""
+        order = [int(n) - 1 for n in _PLACEHOLDER.findall(self.sql)]
+        sql = _PLACEHOLDER.sub("%s", self.sql.replace("%", "%%"))
+        return sql, [params[i] for i in order]
+
+
+QUERIES: Dict[str, Query] = {}
+
+
+def register(name: str, sql: str, param_types: Sequence[str], tables: Sequence[str]) -> Query:
+    if name in QUERIES:
+        raise ValueError(f"Query already registered: {name}")
+    query = Query(name=name, sql=sql, param_types=tuple(param_types), tables=tuple(tables))
+    QUERIES[name] = query
+    return query
+
+
+def prepare(cur, name: str):
+    """PREPARE a registered query on the cursor's connection, once per connection."""
+    query = QUERIES[name]
+    prepared = cur.connection.prepared_statements
+    if name not in prepared:
+        cur.execute(f"PREPARE {name} ({', '.join(query.param_types)}) AS {query.sql}")
+        prepared.add(name)
+
+
+def execute_prepared(cur, name: str, params: Sequence = ()):
+    """Run a registered query with params, as a prepared statement when the connection supports it."""
+    query = QUERIES[name]
+    if not hasattr(cur.connection, "prepared_statements"):
+        cur.execute(*query.pyformat(params))
+        return
+    prepare(cur, name)
+    if params:
+        cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", tuple(params))
+    else:
+        cur.execute(f"EXECUTE {name}")
+
+
+LATEST_BELIEF = register(
+    "latest_belief",
+    """
+    SELECT belief_id, event_id, entity_id, probability, confidence, confidence_interval, as_of, previous_belief_id
+    FROM belief_snapshots
+    WHERE event_id = $1 AND entity_id = $2
+      -- The trend state holds the latest as_of, so only partitions from its
+      -- month on are scanned (pruned at run time); no trend row scans all
+      AND as_of >= COALESCE(
+          (SELECT as_of FROM belief_trends WHERE event_id = $1 AND entity_id = $2),
+          '-infinity'
+      )
+    ORDER BY as_of DESC
+    LIMIT 1
+    """,
+    ["text", "text"],
+    ["belief_snapshots"],
+)
+
+BELIEF_HISTORY = register(
+    "belief_history",
+    """
+    SELECT belief_id, probability, confidence, as_of
+    FROM belief_snapshots
+    WHERE event_id = $1 AND entity_id = $2
+    ORDER BY as_of ASC
+    LIMIT $3
+    """,
+    ["text", "text", "int"],
+    ["belief_snapshots"],
+)
+
+PREVIOUS_BELIEF = register(
+    "previous_belief",
+    """
+    SELECT bs.belief_id, bs.event_id, bs.entity_id, bs.probability, bs.confidence, bs.confidence_interval, bs.as_of, bs.previous_belief_id
+    FROM belief_snapshots bs
+    WHERE bs.event_id = $1
+      AND bs.entity_id = $2
+      AND bs.as_of < $4
+      -- Primary key lookup, pruned to the current belief's partition
+      AND EXISTS (
+          SELECT 1
+          FROM belief_snapshots
+          WHERE belief_id = $3 AND as_of = $4
+      )
+    ORDER BY bs.as_of DESC
+    LIMIT 1
+    """,
+    ["text", "text", "text", "timestamp"],
+    ["belief_snapshots"],
+)
+
+ENTITIES_WITH_BELIEFS = register(
+    "entities_with_beliefs",
+    """
+    -- Skip scan: one index probe per entity instead of reading every
+    -- snapshot of the event
+    WITH RECURSIVE entities (entity_id) AS (
+        SELECT min(entity_id) FROM belief_snapshots WHERE event_id = $1
+        UNION ALL
+        SELECT (
+            SELECT min(bs.entity_id)
+            FROM belief_snapshots bs
+            WHERE bs.event_id = $1 AND bs.entity_id > entities.entity_id
+        )
+        FROM entities
+        WHERE entities.entity_id IS NOT NULL
+    )
+    SELECT entity_id
+    FROM entities
+    WHERE entity_id IS NOT NULL
+    ORDER BY entity_id
+    """,
+    ["text"],
+    ["belief_snapshots"],
+)
+
+PROPOSALS = register(
+    "proposals",
+    """
+    SELECT proposal_id, agent_id, event_id, entity_id, proposed_probability, rationale, created_at
+    FROM forecast_proposals
+    WHERE event_id = $1 AND entity_id = $2
+    ORDER BY created_at DESC
+    """,
+    ["text", "text"],
+    ["forecast_proposals"],
+)
+
+LATEST_SIGNALS = register(
+    "latest_signals",
+    """
+    SELECT DISTINCT ON (entity_id, signal_type)
+        signal_id, entity_id, signal_type, timestamp, source, confidence_hint, value_num, value_bool, value_text, value
+    FROM signals
+    WHERE entity_id = ANY($1)
+      AND ($2::text[] IS NULL OR signal_type = ANY($2))
+    ORDER BY entity_id, signal_type, timestamp DESC
+    """,
+    ["text[]", "text[]"],
+    ["signals"],
+)
@@ -0,0 +1,472 @@
+import argparse
+import functools
+import json
+import multiprocessing
+import os
+import socket
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from core.agents.base import BaseAgent
+from core.belief_engine import aggregate_proposals
+from core.beliefs import BeliefSnapshot
+from core.db import current_wal_lsn, get_connection, read_from_primary
+from core.replay import load_agents
+from core.storage import StorageBackend, get_storage
+from core.storage.memory import MemoryStorage
+
+DEFAULT_SHARD_COUNT = 16
+DEFAULT_LEASE_SECONDS = 120
+DEFAULT_REFRESH_INTERVAL_SECONDS = 3600
+RENEW_EVERY_ENTITIES = 25
+
+
+class LeaseLost(Exception):
+    """Raised when a worker no longer owns the shard it is writing for."""
+
+
+def make_owner_id() -> str:
+    """Unique lease owner id for this worker process."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def ensure_shards(event_id: str, shard_count: int = DEFAULT_SHARD_COUNT):
+    """Create the lease rows for an event's shards if they do not exist yet.
+
+    Raises ValueError if the event is already split into a different number
+    of shards: the two layouts would put one entity in two shards, each
+    with its own lease holder. Change the count with reshard().
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO refresh_leases (event_id, shard_id, shard_count)
+                SELECT %s, shard_id, %s
+                FROM generate_series(0, %s - 1) AS shard_id
+                ON CONFLICT (event_id, shard_id) DO NOTHING
+                """,
+                (event_id, shard_count, shard_count),
+            )
+            cur.execute(
+                """
+                SELECT DISTINCT shard_count
+                FROM refresh_leases
+                WHERE event_id = %s AND shard_count <> %s
+                """,
+                (event_id, shard_count),
+            )
+            other_counts = [row[0] for row in cur.fetchall()]
+        if other_counts:
+            conn.rollback()
+            raise ValueError(
+                f"{event_id} is split into {other_counts[0]} shards, not {shard_count}; "
+                "change it with reshard() (python -m core.refresh_scheduler --reshard)"
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def reshard(event_id: str, shard_count: int):
+    """Replace an event's shard layout with shard_count shards.
+
+    Refuses while any shard is leased, since its owner is still refreshing
+    entities under the old layout. The new shards carry over the oldest
+    last_refreshed_at, so no entity waits longer than one refresh interval.
+    Workers still configured with the old count fail in ensure_shards.
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT shard_id, leased_until > now(), last_refreshed_at
+                FROM refresh_leases
+                WHERE event_id = %s
+                FOR UPDATE
+                """,
+                (event_id,),
+            )
+            rows = cur.fetchall()
+            leased = [row[0] for row in rows if row[1]]
+            if leased:
+                raise ValueError(f"Shards {leased} of {event_id} are leased; reshard once they are released")
+            last_refreshed = [row[2] for row in rows]
+            oldest = None if None in last_refreshed else min(last_refreshed, default=None)
+
+            cur.execute("DELETE FROM refresh_leases WHERE event_id = %s", (event_id,))
+            cur.execute(
+                """
+                INSERT INTO refresh_leases (event_id, shard_id, shard_count, last_refreshed_at)
+                SELECT %s, shard_id, %s, %s
+                FROM generate_series(0, %s - 1) AS shard_id
+                """,
+                (event_id, shard_count, oldest, shard_count),
+            )
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def claim_shards(
+    event_id: str,
+    owner: str,
+    max_shards: int = 1,
+    lease_seconds: int = DEFAULT_LEASE_SECONDS,
+    refresh_interval_seconds: int = DEFAULT_REFRESH_INTERVAL_SECONDS,
+) -> List[tuple]:
+    """Lease up to max_shards shards that are unowned (or expired) and due for refresh.
+
+    Rows being claimed by another worker are skipped (FOR UPDATE SKIP LOCKED),
+    so concurrent workers never block each other or claim the same shard.
+
+    Returns:
+        List of (shard_id, shard_count) tuples now leased to owner
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE refresh_leases l
+                SET owner = %s, leased_until = now() + make_interval(secs => %s)
+                FROM (
+                    SELECT event_id, shard_id
+                    FROM refresh_leases
+                    WHERE event_id = %s
+                      AND (leased_until IS NULL OR leased_until < now())
+                      AND (last_refreshed_at IS NULL OR last_refreshed_at < now() - make_interval(secs => %s))
+                    ORDER BY last_refreshed_at NULLS FIRST, shard_id
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                ) due
+                WHERE l.event_id = due.event_id AND l.shard_id = due.shard_id
+                RETURNING l.shard_id, l.shard_count
+                """,
+                (owner, lease_seconds, event_id, refresh_interval_seconds, max_shards),
+            )
+            shards = [(row[0], row[1]) for row in cur.fetchall()]
+        conn.commit()
+        return shards
+    finally:
+        conn.close()
+
+
+def renew_lease(event_id: str, shard_id: int, owner: str, lease_seconds: int = DEFAULT_LEASE_SECONDS):
+    """Extend a lease. Raises LeaseLost if owner no longer holds it."""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE refresh_leases
+                SET leased_until = now() + make_interval(secs => %s)
+                WHERE event_id = %s AND shard_id = %s AND owner = %s AND leased_until > now()
+                """,
+                (lease_seconds, event_id, shard_id, owner),
+            )
+            renewed = cur.rowcount == 1
+        conn.commit()
+    finally:
+        conn.close()
+    if not renewed:
+        raise LeaseLost(f"Lease on {event_id} shard {shard_id} lost by {owner}")
+
+
+def release_lease(event_id: str, shard_id: int, owner: str, refreshed: bool):
+    """Give a lease back, recording the refresh time when the shard completed."""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE refresh_leases
+                SET owner = NULL,
+                    leased_until = NULL,
+                    last_refreshed_at = CASE WHEN %s THEN now() ELSE last_refreshed_at END
+                WHERE event_id = %s AND shard_id = %s AND owner = %s
+                """,
+                (refreshed, event_id, shard_id, owner),
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def get_shard_entity_ids(shard_id: int, shard_count: int) -> List[str]:
+    """Entities with signals that hash into the shard.
+
+    Reads signal_entities (one row per entity) rather than the signals. Its
+    shard_hash comes from hashtext, which is stable across processes and
+    replicas, so every worker agrees on the entity-to-shard mapping.
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT entity_id
+                FROM signal_entities
+                WHERE mod(shard_hash, %s) = %s
+                ORDER BY entity_id
+                """,
+                (shard_count, shard_id),
+            )
+            return [row[0] for row in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+def check_lease(event_id: str, shard_id: int, owner: str):
+    """Raise LeaseLost unless owner holds an unexpired lease on the shard."""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT 1
+                FROM refresh_leases
+                WHERE event_id = %s AND shard_id = %s AND owner = %s AND leased_until > now()
+                """,
+                (event_id, shard_id, owner),
+            )
+            held = cur.fetchone() is not None
+    finally:
+        conn.close()
+    if not held:
+        raise LeaseLost(f"Lease on {event_id} shard {shard_id} lost by {owner}")
+
+
+def refresh_entity(
+    event_id: str,
+    entity_id: str,
+    agents: List[BaseAgent],
+    storage: Optional[StorageBackend] = None,
+    fence: Optional[Callable[[], None]] = None,
+) -> Optional[BeliefSnapshot]:
+    """Run the agents for one entity and write proposals and a new belief.
+
+    The write goes through StorageBackend.append_belief, which admits one
+    writer per (event_id, entity_id) at a time, so previous_belief_id always
+    points at the belief that was latest when the new one was written.
+
+    Args:
+        event_id: The event identifier
+        entity_id: The entity identifier
+        agents: Agents to run
+        storage: Storage backend (default: get_storage())
+        fence: Checked before the write, e.g. that the shard lease is still held
+
+    Returns:
+        The written BeliefSnapshot, or None if the entity has no signals
+    """
+    storage = storage or get_storage()
+    required_signals = sorted({signal_type for agent in agents for signal_type in agent.required_signals})
+    # Replicas may not have replayed the latest ingested signals yet
+    with read_from_primary():
+        signals = storage.get_latest_signals([entity_id], required_signals).get(entity_id, [])
+    if not signals:
+        return None
+
+    proposals = [
+        proposal
+        for agent in agents
+        for proposal in agent.generate_proposals(signals)
+        if proposal.event_id == event_id
+    ]
+    if not proposals:
+        return None
+    probability, confidence = aggregate_proposals(proposals)
+
+    belief = BeliefSnapshot(
+        belief_id=str(uuid.uuid4()),
+        event_id=event_id,
+        entity_id=entity_id,
+        probability=probability,
+        confidence=confidence,
+        as_of=datetime.utcnow(),
+    )
+    return storage.append_belief(belief, proposals, fence)
+
+
+def refresh_entities(
+    event_id: str,
+    agents: List[BaseAgent],
+    entity_ids: Optional[List[str]] = None,
+    storage: Optional[StorageBackend] = None,
+) -> dict:
+    """Refresh entities in this process, without leases.
+
+    For a single worker or the memory backend; concurrent workers on Postgres
+    use run_refresh_cycle.
+
+    Args:
+        event_id: The event identifier
+        agents: Agents to run
+        entity_ids: Entities to refresh (default: every entity with signals)
+        storage: Storage backend (default: get_storage())
+
+    Returns:
+        Dict with the entities considered and beliefs written
+    """
+    storage = storage or get_storage()
+    if entity_ids is None:
+        entity_ids = storage.get_entities_with_signals()
+    beliefs_written = sum(
+        refresh_entity(event_id, entity_id, agents, storage) is not None for entity_id in entity_ids
+    )
+    return {"entity_count": len(entity_ids), "beliefs_written": beliefs_written}
+
+
+def run_refresh_cycle(
+    event_id: str,
+    agents: List[BaseAgent],
+    owner: str,
+    shard_count: int = DEFAULT_SHARD_COUNT,
+    max_shards: int = 1,
+    lease_seconds: int = DEFAULT_LEASE_SECONDS,
+    refresh_interval_seconds: int = DEFAULT_REFRESH_INTERVAL_SECONDS,
+) -> dict:
+    """Claim due shards, refresh every entity in them and release the leases.
+
+    The leases live in Postgres; beliefs are written through get_storage().
+    Each write is fenced by check_lease, so a worker whose lease expired
+    mid-shard stops writing.
+
+    Returns:
+        Dict with the shards refreshed, shards lost, beliefs written and
+        write_lsn: the primary WAL position after the writes (a read-after
+        token for reads that must see them), None if nothing was written
+    """
+    ensure_shards(event_id, shard_count)
+    storage = get_storage()
+    refreshed_shards = []
+    lost_shards = []
+    beliefs_written = 0
+
+    for shard_id, leased_shard_count in claim_shards(
+        event_id, owner, max_shards, lease_seconds, refresh_interval_seconds
+    ):
+        completed = False
+        try:
+            for index, entity_id in enumerate(get_shard_entity_ids(shard_id, leased_shard_count)):
+                if index and index % RENEW_EVERY_ENTITIES == 0:
+                    renew_lease(event_id, shard_id, owner, lease_seconds)
+                fence = functools.partial(check_lease, event_id, shard_id, owner)
+                if refresh_entity(event_id, entity_id, agents, storage, fence) is not None:
+                    beliefs_written += 1
+            completed = True
+            refreshed_shards.append(shard_id)
+        except LeaseLost:
+            lost_shards.append(shard_id)
+        finally:
+            release_lease(event_id, shard_id, owner, refreshed=completed)
+
+    return {
+        "owner": owner,
+        "refreshed_shards": refreshed_shards,
+        "lost_shards": lost_shards,
+        "beliefs_written": beliefs_written,
+        "write_lsn": current_wal_lsn() if beliefs_written else None,
+    }
+
+
+def run_worker(
+    event_id: str,
+    agent_paths: List[str],
+    shard_count: int = DEFAULT_SHARD_COUNT,
+    max_shards: int = 1,
+    lease_seconds: int = DEFAULT_LEASE_SECONDS,
+    refresh_interval_seconds: int = DEFAULT_REFRESH_INTERVAL_SECONDS,
+    poll_seconds: float = 5.0,
+    once: bool = False,
+):
+    """Worker loop: keep claiming and refreshing due shards until stopped."""
+    agents = load_agents(agent_paths)
+    owner = make_owner_id()
+    while True:
+        result = run_refresh_cycle(
+            event_id, agents, owner, shard_count, max_shards, lease_seconds, refresh_interval_seconds
+        )
+        print(json.dumps(result), flush=True)
+        if once and not result["refreshed_shards"] and not result["lost_shards"]:
+            return
+        if not result["refreshed_shards"]:
+            time.sleep(poll_seconds)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Distributed belief refresh worker")
+    parser.add_argument("--event-id", default="NEXT_ROUND_RAISED")
+    parser.add_argument(
+        "--agent",
+        action="append",
+        dest="agents",
+        default=None,
+        help="Agent as module:ClassName (repeatable)",
+    )
+    parser.add_argument("--shard-count", type=int, default=DEFAULT_SHARD_COUNT)
+    parser.add_argument("--max-shards", type=int, default=1, help="Shards claimed per cycle")
+    parser.add_argument("--lease-seconds", type=int, default=DEFAULT_LEASE_SECONDS)
+    parser.add_argument("--refresh-interval-seconds", type=int, default=DEFAULT_REFRESH_INTERVAL_SECONDS)
+    parser.add_argument("--processes", type=int, default=1, help="Local worker processes to start")
+    parser.add_argument("--once", action="store_true", help="Exit when no shard is due")
+    parser.add_argument(
+        "--local",
+        action="store_true",
+        help="Refresh every entity once in this process, without leases (any DII_STORAGE_BACKEND)",
+    )
+    parser.add_argument("--save", default=None, help="With --local on the memory backend, write a snapshot here")
+    parser.add_argument("--reshard", action="store_true", help="Split the event into --shard-count shards and exit")
+    args = parser.parse_args(argv)
+    agent_paths = args.agents or ["core.agents.capital_markets:CapitalMarketsAgent"]
+
+    if args.reshard:
+        reshard(args.event_id, args.shard_count)
+        return
+
+    if args.local:
+        storage = get_storage()
+        if args.save and not isinstance(storage, MemoryStorage):
+            parser.error("--save needs DII_STORAGE_BACKEND=memory")
+        print(json.dumps(refresh_entities(args.event_id, load_agents(agent_paths), storage=storage)), flush=True)
+        if args.save:
+            storage.save(args.save)
+        return
+    if args.save:
+        parser.error("--save needs --local")
+    if args.processes > 1 and not get_storage().shared:
+        parser.error("worker processes need a shared storage backend (DII_STORAGE_BACKEND=postgres)")
+
+    worker_args = (
+        args.event_id,
+        agent_paths,
+        args.shard_count,
+        args.max_shards,
+        args.lease_seconds,
+        args.refresh_interval_seconds,
+    )
+    worker_kwargs = {"once": args.once}
+    if args.processes == 1:
+        run_worker(*worker_args, **worker_kwargs)
+        return
+
+    processes = [
+        multiprocessing.Process(target=run_worker, args=worker_args, kwargs=worker_kwargs)
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
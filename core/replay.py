@@ -0,0 +1,199 @@
+import argparse
+import importlib
+import json
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import groupby
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from core.agents.base import BaseAgent
+from core.belief_engine import aggregate_proposals
+from core.beliefs import BeliefSnapshot
+from core.signals import Signal
+from core.storage import StorageBackend, get_storage
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def load_agents(agent_paths: List[str]) -> List[BaseAgent]:
+    """Instantiate agents from "module:ClassName" paths."""
+    agents = []
+    for path in agent_paths:
+        module_name, class_name = path.split(":")
+        agents.append(getattr(importlib.import_module(module_name), class_name)())
+    return agents
+
+
+def agent_version(agents: List[BaseAgent]) -> str:
+    """Version tag for a set of agents, e.g. "capital_markets_agent_v1"."""
+    return "+".join(sorted(agent.agent_id for agent in agents))
+
+
+def replay(
+    agents: List[BaseAgent],
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    entity_ids: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    storage: Optional[StorageBackend] = None,
+) -> dict:
+    """Recompute belief history from signals under the given agents.
+
+    Signals are streamed per entity in timestamp order. After each distinct
+    signal timestamp in [since, until) the entity's signal state as it stood
+    then is run through the agents and aggregate_proposals, and the result is
+    written as shadow beliefs tagged with the replay_id and agent version.
+    Signals before since still build up the initial state. Entities are
+    split across worker processes when the storage backend is shared.
+
+    Args:
+        agents: Agents to run (e.g. from load_agents)
+        since: Start of the replayed window (default: first signal)
+        until: End of the replayed window, exclusive (default: no limit)
+        entity_ids: Entities to replay (default: every entity with signals)
+        workers: Number of worker processes (default: CPU count; 1 for an unshared backend)
+        chunk_size: Shadow beliefs written per batch
+        storage: Storage backend (default: get_storage())
+
+    Returns:
+        Dict with replay_id, agent_version, entity_count, snapshot_count
+    """
+    storage = storage or get_storage()
+    version = agent_version(agents)
+    replay_id = str(uuid.uuid4())
+
+    if entity_ids is None:
+        entity_ids = storage.get_entities_with_signals(until)
+    storage.start_replay(replay_id, version, since, until, len(entity_ids))
+
+    # Worker processes only see the writes of a shared backend
+    workers = (workers or os.cpu_count() or 1) if storage.shared else 1
+    workers = max(1, min(workers, len(entity_ids) or 1))
+    shards = [entity_ids[i::workers] for i in range(workers)]
+    tasks = [(storage, replay_id, version, agents, shard, since, until, chunk_size) for shard in shards if shard]
+
+    if workers == 1:
+        snapshot_count = sum(_replay_shard(*task) for task in tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            snapshot_count = sum(pool.map(_replay_shard, *zip(*tasks)))
+
+    storage.finish_replay(replay_id, snapshot_count)
+    return {
+        "replay_id": replay_id,
+        "agent_version": version,
+        "entity_count": len(entity_ids),
+        "snapshot_count": snapshot_count,
+    }
+
+
+def diff_replay(replay_id: str, event_id: str, storage: Optional[StorageBackend] = None) -> List[dict]:
+    """Compare a replay's shadow beliefs with production beliefs per entity.
+
+    Every shadow snapshot is paired with the production belief that was
+    current at the same as_of.
+
+    Args:
+        replay_id: The replay identifier
+        event_id: The event identifier
+        storage: Storage backend (default: get_storage())
+
+    Returns:
+        List of dicts with entity_id, shadow_snapshots, compared_snapshots,
+        mean_abs_delta, max_abs_delta, shadow_probability and
+        production_probability (latest of each), largest max_abs_delta first
+    """
+    return (storage or get_storage()).diff_replay(replay_id, event_id)
+
+
+def _replay_shard(
+    storage: StorageBackend,
+    replay_id: str,
+    version: str,
+    agents: List[BaseAgent],
+    entity_ids: List[str],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    chunk_size: int,
+) -> int:
+    """Replay one shard of entities, in a worker process or inline. Returns snapshots written."""
+    written = 0
+    pending: List[BeliefSnapshot] = []
+    for _, entity_signals in groupby(storage.iter_signal_history(entity_ids, until), key=lambda s: s.entity_id):
+        pending.extend(_replay_entity(agents, entity_signals, since))
+        if len(pending) >= chunk_size:
+            storage.insert_shadow_beliefs(replay_id, version, pending)
+            written += len(pending)
+            pending = []
+    storage.insert_shadow_beliefs(replay_id, version, pending)
+    return written + len(pending)
+
+
+def _replay_entity(agents: List[BaseAgent], signals: Iterable[Signal], since: Optional[datetime]) -> Iterator[BeliefSnapshot]:
+    """Replay the time-ordered signals of one entity.
+
+    The signal state is re-evaluated once per distinct timestamp, and
+    beliefs are chained per event through previous_belief_id.
+    """
+    state: Dict[str, Signal] = {}
+    previous_belief_ids: Dict[str, str] = {}
+    for timestamp, timestamp_signals in groupby(signals, key=lambda s: s.timestamp):
+        for signal in timestamp_signals:
+            state[signal.signal_type] = signal
+            entity_id = signal.entity_id
+        if since is not None and timestamp < since:
+            continue
+
+        for event_id, probability, confidence in _evaluate(agents, list(state.values())):
+            belief = BeliefSnapshot(
+                belief_id=str(uuid.uuid4()),
+                event_id=event_id,
+                entity_id=entity_id,
+                probability=probability,
+                confidence=confidence,
+                as_of=timestamp,
+                previous_belief_id=previous_belief_ids.get(event_id),
+            )
+            yield belief
+            previous_belief_ids[event_id] = belief.belief_id
+
+
+def _evaluate(agents: List[BaseAgent], signals: List[Signal]):
+    """Run agents over one signal state and aggregate per event."""
+    proposals_by_event = {}
+    for agent in agents:
+        for proposal in agent.generate_proposals(signals):
+            proposals_by_event.setdefault(proposal.event_id, []).append(proposal)
+    for event_id, proposals in proposals_by_event.items():
+        probability, confidence = aggregate_proposals(proposals)
+        yield event_id, probability, confidence
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Replay signal history under a set of agents")
+    parser.add_argument(
+        "--agent",
+        action="append",
+        dest="agents",
+        default=None,
+        help="Agent as module:ClassName (repeatable)",
+    )
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--until", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--diff-event", default=None, help="Print a diff against production for this event")
+    args = parser.parse_args(argv)
+
+    agents = load_agents(args.agents or ["core.agents.capital_markets:CapitalMarketsAgent"])
+    result = replay(agents, args.since, args.until, workers=args.workers, chunk_size=args.chunk_size)
+    if args.diff_event:
+        result["diff"] = diff_replay(result["replay_id"], args.diff_event)
+    print(json.dumps(result, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+from datetime import datetime
+from typing import List, Optional
+
+from psycopg2.extras import execute_values
+
+from core.beliefs import BeliefSnapshot
+from core.db import get_connection
+
+
+def start_replay(
+    replay_id: str, agent_version: str, since: Optional[datetime], until: Optional[datetime], entity_count: int
+):
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO replay_runs (replay_id, agent_version, since, until, entity_count)
+                VALUES (%s, %s, %s, %s, %s)
+                """,
+                (replay_id, agent_version, since, until, entity_count),
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def finish_replay(replay_id: str, snapshot_count: int):
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE replay_runs
+                SET snapshot_count = %s, finished_at = now()
+                WHERE replay_id = %s
+                """,
+                (snapshot_count, replay_id),
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def insert_shadow_beliefs(replay_id: str, agent_version: str, beliefs: List[BeliefSnapshot]):
+    """Insert replayed beliefs into shadow_belief_snapshots in one round trip per page."""
+    if not beliefs:
+        return
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            execute_values(
+                cur,
+                """
+                INSERT INTO shadow_belief_snapshots
+                    (replay_id, agent_version, belief_id, event_id, entity_id, probability, confidence, as_of, previous_belief_id)
+                VALUES %s
+                """,
+                [
+                    (
+                        replay_id,
+                        agent_version,
+                        belief.belief_id,
+                        belief.event_id,
+                        belief.entity_id,
+                        belief.probability,
+                        belief.confidence,
+                        belief.as_of,
+                        belief.previous_belief_id,
+                    )
+                    for belief in beliefs
+                ],
+                page_size=len(beliefs),
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def diff_replay(replay_id: str, event_id: str) -> List[dict]:
+    """Compare a replay's shadow beliefs with production beliefs per entity.
+
+    Every shadow snapshot is paired with the production belief that was
+    current at the same as_of.
+
+    Args:
+        replay_id: The replay identifier
+        event_id: The event identifier
+
+    Returns:
+        List of dicts with entity_id, shadow_snapshots, compared_snapshots,
+        mean_abs_delta, max_abs_delta, shadow_probability and
+        production_probability (latest of each), largest max_abs_delta first
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT
+                    s.entity_id,
+                    count(*) AS shadow_snapshots,
+                    count(p.probability) AS compared_snapshots,
+                    avg(abs(s.probability - p.probability)) AS mean_abs_delta,
+                    max(abs(s.probability - p.probability)) AS max_abs_delta,
+                    (array_agg(s.probability ORDER BY s.as_of DESC))[1] AS shadow_probability,
+                    (
+                        SELECT b.probability
+                        FROM belief_snapshots b
+                        WHERE b.event_id = s.event_id AND b.entity_id = s.entity_id
+                        ORDER BY b.as_of DESC
+                        LIMIT 1
+                    ) AS production_probability
+                FROM shadow_belief_snapshots s
+                LEFT JOIN LATERAL (
+                    SELECT b.probability
+                    FROM belief_snapshots b
+                    WHERE b.event_id = s.event_id
+                      AND b.entity_id = s.entity_id
+                      AND b.as_of <= s.as_of
+                    ORDER BY b.as_of DESC
+                    LIMIT 1
+                ) p ON TRUE
+                WHERE s.replay_id = %s AND s.event_id = %s
+                GROUP BY s.event_id, s.entity_id
+                ORDER BY max_abs_delta DESC NULLS LAST, s.entity_id
+                """,
+                (replay_id, event_id),
+            )
+            return [
+                {
+                    "entity_id": row[0],
+                    "shadow_snapshots": row[1],
+                    "compared_snapshots": row[2],
+                    "mean_abs_delta": row[3],
+                    "max_abs_delta": row[4],
+                    "shadow_probability": row[5],
+                    "production_probability": row[6],
+                }
+                for row in cur.fetchall()
+            ]
+    finally:
+        conn.close()
@@ -0,0 +1,338 @@
+import argparse
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from core.db import get_connection
+
+DEFAULT_RETENTION_DAYS = 90
+DEFAULT_MONTHS_AHEAD = 3
+PARTITIONED_TABLES = ["belief_snapshots", "forecast_proposals"]
+
+
+def ensure_partitions(months_ahead: int = DEFAULT_MONTHS_AHEAD) -> List[str]:
+    """Create monthly partitions from the current month up to months_ahead.
+
+    Partitions must exist before rows for that month arrive, otherwise the rows
+    land in the DEFAULT partition and later partition creation for that month
+    fails. Run this on a schedule (e.g. daily) well ahead of month boundaries.
+
+    Args:
+        months_ahead: Number of future months to create partitions for
+
+    Returns:
+        List of partition names (existing or newly created)
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT ensure_monthly_partition(t.parent, m::date)
+                FROM unnest(%s::text[]) AS t(parent),
+                     generate_series(
+                         date_trunc('month', now()),
+                         date_trunc('month', now()) + make_interval(months => %s),
+                         interval '1 month'
+                     ) AS m
+                ORDER BY 1
+                """,
+                (PARTITIONED_TABLES, months_ahead),
+            )
+            partitions = [row[0] for row in cur.fetchall()]
+        conn.commit()
+        return partitions
+    finally:
+        conn.close()
+
+
+def planned_partitions(months_ahead: int = DEFAULT_MONTHS_AHEAD) -> List[dict]:
+    """The partitions ensure_partitions would ensure, without creating any.
+
+    Args:
+        months_ahead: Number of future months to check
+
+    Returns:
+        List of dicts with: partition, exists
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT name, to_regclass(name) IS NOT NULL
+                FROM (
+                    SELECT format('%%s_%%s', t.parent, to_char(m, 'YYYY_MM')) AS name
+                    FROM unnest(%s::text[]) AS t(parent),
+                         generate_series(
+                             date_trunc('month', now()),
+                             date_trunc('month', now()) + make_interval(months => %s),
+                             interval '1 month'
+                         ) AS m
+                ) planned
+                ORDER BY 1
+                """,
+                (PARTITIONED_TABLES, months_ahead),
+            )
+            return [{"partition": row[0], "exists": row[1]} for row in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+def compact_belief_snapshots(
+    older_than_days: int = DEFAULT_RETENTION_DAYS,
+    event_id: Optional[str] = None,
+    dry_run: bool = True,
+) -> dict:
+    """Downsample belief history older than the retention window to last-of-day.
+
+    For every (event_id, entity_id, day) before the cutoff only the latest
+    snapshot of that day is kept. Surviving snapshots whose previous_belief_id
+    points at a removed snapshot are re-linked to their nearest surviving
+    ancestor, so previous_belief_id chains stay valid. Snapshots a logged
+    decision refers to are always kept.
+
+    Args:
+        older_than_days: Snapshots older than this many days are compacted
+        event_id: Restrict compaction to one event (default: all events)
+        dry_run: If True, only report what would be removed and roll back
+
+    Returns:
+        Report dict with cutoff, rows, relinked, estimated_bytes and a
+        per-partition breakdown
+    """
+    cutoff = _cutoff(older_than_days)
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                CREATE TEMP TABLE compaction_doomed ON COMMIT DROP AS
+                SELECT belief_id, as_of
+                FROM (
+                    SELECT
+                        belief_id,
+                        as_of,
+                        ROW_NUMBER() OVER (
+                            PARTITION BY event_id, entity_id, date_trunc('day', as_of)
+                            ORDER BY as_of DESC, belief_id DESC
+                        ) AS rn
+                    FROM belief_snapshots
+                    WHERE as_of < %s
+                      AND (%s::text IS NULL OR event_id = %s)
+                ) ranked
+                WHERE rn > 1
+                  -- Decision outcomes join back to the exact snapshot acted upon
+                  AND NOT EXISTS (
+                      SELECT 1 FROM decisions d
+                      WHERE d.belief_id = ranked.belief_id AND d.belief_as_of = ranked.as_of
+                  )
+                """,
+                (cutoff, event_id, event_id),
+            )
+            cur.execute("CREATE INDEX ON compaction_doomed (belief_id, as_of)")
+            cur.execute("ANALYZE compaction_doomed")
+
+            report = _reclaim_report(cur, "belief_snapshots", "belief_id", "as_of", cutoff)
+            report["relinked"] = 0
+
+            if not dry_run:
+                # Re-link before deleting so every survivor points at a survivor
+                cur.execute(
+                    """
+                    UPDATE belief_snapshots b
+                    SET previous_belief_id = (
+                        SELECT p.belief_id
+                        FROM belief_snapshots p
+                        WHERE p.event_id = b.event_id
+                          AND p.entity_id = b.entity_id
+                          AND p.as_of < b.as_of
+                          AND NOT EXISTS (
+                              SELECT 1 FROM compaction_doomed d
+                              WHERE d.belief_id = p.belief_id AND d.as_of = p.as_of
+                          )
+                        ORDER BY p.as_of DESC
+                        LIMIT 1
+                    )
+                    WHERE b.previous_belief_id IN (SELECT belief_id FROM compaction_doomed)
+                      AND NOT EXISTS (
+                          SELECT 1 FROM compaction_doomed d
+                          WHERE d.belief_id = b.belief_id AND d.as_of = b.as_of
+                      )
+                    """
+                )
+                report["relinked"] = cur.rowcount
+
+                cur.execute(
+                    """
+                    DELETE FROM belief_snapshots b
+                    USING compaction_doomed d
+                    WHERE b.belief_id = d.belief_id
+                      AND b.as_of = d.as_of
+                      AND b.as_of < %s
+                    """,
+                    (cutoff,),
+                )
+                report["rows"] = cur.rowcount
+
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+        return report
+    finally:
+        conn.close()
+
+
+def compact_forecast_proposals(
+    older_than_days: int = DEFAULT_RETENTION_DAYS,
+    event_id: Optional[str] = None,
+    dry_run: bool = True,
+) -> dict:
+    """Downsample proposal history older than the retention window to last-of-day.
+
+    For every (agent_id, event_id, entity_id, day) before the cutoff only the
+    latest proposal of that day is kept.
+
+    Args:
+        older_than_days: Proposals older than this many days are compacted
+        event_id: Restrict compaction to one event (default: all events)
+        dry_run: If True, only report what would be removed and roll back
+
+    Returns:
+        Report dict with cutoff, rows, estimated_bytes and a per-partition breakdown
+    """
+    cutoff = _cutoff(older_than_days)
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                CREATE TEMP TABLE compaction_doomed ON COMMIT DROP AS
+                SELECT proposal_id, created_at
+                FROM (
+                    SELECT
+                        proposal_id,
+                        created_at,
+                        ROW_NUMBER() OVER (
+                            PARTITION BY agent_id, event_id, entity_id, date_trunc('day', created_at)
+                            ORDER BY created_at DESC, proposal_id DESC
+                        ) AS rn
+                    FROM forecast_proposals
+                    WHERE created_at < %s
+                      AND (%s::text IS NULL OR event_id = %s)
+                ) ranked
+                WHERE rn > 1
+                """,
+                (cutoff, event_id, event_id),
+            )
+            cur.execute("CREATE INDEX ON compaction_doomed (proposal_id, created_at)")
+            cur.execute("ANALYZE compaction_doomed")
+
+            report = _reclaim_report(cur, "forecast_proposals", "proposal_id", "created_at", cutoff)
+
+            if not dry_run:
+                cur.execute(
+                    """
+                    DELETE FROM forecast_proposals f
+                    USING compaction_doomed d
+                    WHERE f.proposal_id = d.proposal_id
+                      AND f.created_at = d.created_at
+                      AND f.created_at < %s
+                    """,
+                    (cutoff,),
+                )
+                report["rows"] = cur.rowcount
+
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+        return report
+    finally:
+        conn.close()
+
+
+def _cutoff(older_than_days: int) -> datetime:
+    """Cutoff truncated to midnight so no day is split across the boundary."""
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    return cutoff.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _reclaim_report(cur, table: str, id_column: str, time_column: str, cutoff: datetime) -> dict:
+    """Report doomed rows and estimated reclaimable bytes per partition.
+
+    tuple_bytes is the exact on-disk size of the doomed heap tuples.
+    estimated_bytes scales the partition's total size (heap, TOAST and indexes)
+    by the doomed row fraction. Space is reclaimed by VACUUM after the delete.
+    Table and column names come from this module only, never from callers.
+    """
+    cur.execute(
+        f"""
+        SELECT
+            s.tableoid::regclass::text,
+            s.doomed_rows,
+            s.tuple_bytes,
+            CASE
+                WHEN c.reltuples > 0
+                    THEN (pg_total_relation_size(c.oid) * s.doomed_rows / c.reltuples)::bigint
+                ELSE s.tuple_bytes
+            END
+        FROM (
+            SELECT t.tableoid, count(*) AS doomed_rows, sum(pg_column_size(t.*))::bigint AS tuple_bytes
+            FROM {table} t
+            JOIN compaction_doomed d
+              ON d.{id_column} = t.{id_column} AND d.{time_column} = t.{time_column}
+            WHERE t.{time_column} < %s
+            GROUP BY t.tableoid
+        ) s
+        JOIN pg_class c ON c.oid = s.tableoid
+        ORDER BY 1
+        """,
+        (cutoff,),
+    )
+    partitions = [
+        {
+            "partition": row[0],
+            "rows": row[1],
+            "tuple_bytes": row[2],
+            "estimated_bytes": row[3],
+        }
+        for row in cur.fetchall()
+    ]
+    return {
+        "table": table,
+        "cutoff": cutoff.isoformat(),
+        "rows": sum(p["rows"] for p in partitions),
+        "estimated_bytes": sum(p["estimated_bytes"] for p in partitions),
+        "partitions": partitions,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Partition maintenance and history compaction")
+    parser.add_argument("--older-than-days", type=int, default=DEFAULT_RETENTION_DAYS)
+    parser.add_argument("--event-id", default=None)
+    parser.add_argument("--months-ahead", type=int, default=DEFAULT_MONTHS_AHEAD)
+    parser.add_argument(
+        "--execute",
+        action="store_true",
+        help="Create partitions and delete rows (default is a dry run that only reports what would change)",
+    )
+    args = parser.parse_args(argv)
+
+    result = {
+        "partitions": ensure_partitions(args.months_ahead) if args.execute else planned_partitions(args.months_ahead),
+        "belief_snapshots": compact_belief_snapshots(
+            args.older_than_days, args.event_id, dry_run=not args.execute
+        ),
+        "forecast_proposals": compact_forecast_proposals(
+            args.older_than_days, args.event_id, dry_run=not args.execute
+        ),
+        "dry_run": not args.execute,
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+from datetime import datetime
+from typing import Optional
+
+from psycopg2.extras import execute_values
+
+from core.beliefs import BeliefSnapshot
+from core.db import get_connection, get_read_connection
+from core.rollups import (
+    HIGH_RISK_BELOW,
+    MEDIUM_RISK_BELOW,
+    MOVER_THRESHOLD,
+    classify_move,
+    classify_risk,
+    recent_since,
+    summarize_rollups,
+)
+
+
+def apply_belief_to_rollup(cur, belief: BeliefSnapshot) -> bool:
+    """Move the entity's contribution from its previous current belief to the new one.
+
+    Runs inside the transaction that inserted the belief. Beliefs that are not
+    the entity's latest (historical or out-of-order inserts) are skipped;
+    rebuild_rollups repairs the table after such writes.
+
+    Args:
+        cur: Open cursor of the transaction that inserted the belief
+        belief: The inserted BeliefSnapshot
+
+    Returns:
+        True if the rollup was updated
+    """
+    cur.execute(
+        """
+        SELECT belief_id, probability, confidence, as_of
+        FROM belief_snapshots
+        WHERE event_id = %s AND entity_id = %s
+        ORDER BY as_of DESC
+        LIMIT 3
+        """,
+        (belief.event_id, belief.entity_id),
+    )
+    rows = cur.fetchall()
+    if not rows or rows[0][0] != belief.belief_id:
+        return False
+
+    previous = rows[1] if len(rows) > 1 else None
+    before_previous = rows[2] if len(rows) > 2 else None
+
+    if previous is not None:
+        previous_delta = previous[1] - before_previous[1] if before_previous is not None else None
+        _add_to_rollup(cur, belief.event_id, previous[1], previous[2], previous[3], previous_delta, sign=-1)
+
+    delta = belief.probability - previous[1] if previous is not None else None
+    _add_to_rollup(cur, belief.event_id, belief.probability, belief.confidence, belief.as_of, delta, sign=1)
+    return True
+
+
+def get_portfolio_summary(event_id: str, recent_days: int = 7) -> dict:
+    """Summarize the current portfolio from the rollup table.
+
+    Reads one row per (risk_level, confidence, day) instead of every entity.
+
+    Args:
+        event_id: The event identifier
+        recent_days: Window for "updated" and "movers" counts (default: 7)
+
+    Returns:
+        Dict with entity_count, average_probability, by_risk_level,
+        by_confidence, and recent counts of updated entities, drops and rises
+    """
+    since = recent_since(recent_days)
+    conn = get_read_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT
+                    risk_level,
+                    confidence,
+                    sum(entity_count),
+                    sum(probability_sum),
+                    COALESCE(sum(entity_count) FILTER (WHERE day >= %s), 0),
+                    COALESCE(sum(drop_count) FILTER (WHERE day >= %s), 0),
+                    COALESCE(sum(rise_count) FILTER (WHERE day >= %s), 0)
+                FROM portfolio_rollups
+                WHERE event_id = %s
+                GROUP BY risk_level, confidence
+                HAVING sum(entity_count) > 0
+                """,
+                (since, since, since, event_id),
+            )
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    return summarize_rollups(event_id, recent_days, rows)
+
+
+def rebuild_rollups(event_id: Optional[str] = None) -> int:
+    """Recompute the rollup table from belief_snapshots.
+
+    Args:
+        event_id: Restrict the rebuild to one event (default: all events)
+
+    Returns:
+        Number of rollup rows written
+    """
+    import numpy as np
+    import pandas as pd
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT event_id, entity_id, probability, confidence, as_of, rn
+                FROM (
+                    SELECT
+                        event_id, entity_id, probability, confidence, as_of,
+                        ROW_NUMBER() OVER (PARTITION BY event_id, entity_id ORDER BY as_of DESC) AS rn
+                    FROM belief_snapshots
+                    WHERE %s::text IS NULL OR event_id = %s
+                ) ranked
+                WHERE rn <= 2
+                """,
+                (event_id, event_id),
+            )
+            latest = pd.DataFrame(
+                cur.fetchall(),
+                columns=["event_id", "entity_id", "probability", "confidence", "as_of", "rn"],
+            )
+
+            rows = []
+            if not latest.empty:
+                keys = ["event_id", "entity_id"]
+                current = latest[latest["rn"] == 1].set_index(keys)
+                previous = latest[latest["rn"] == 2].set_index(keys)["probability"]
+                current["delta"] = current["probability"] - previous.reindex(current.index)
+                current["risk_level"] = np.select(
+                    [current["probability"] < HIGH_RISK_BELOW, current["probability"] < MEDIUM_RISK_BELOW],
+                    ["high_risk", "medium_risk"],
+                    default="low_risk",
+                )
+                current["day"] = pd.to_datetime(current["as_of"]).dt.date
+                current["is_drop"] = (current["delta"] <= -MOVER_THRESHOLD).astype(int)
+                current["is_rise"] = (current["delta"] >= MOVER_THRESHOLD).astype(int)
+
+                rollup = (
+                    current.reset_index()
+                    .groupby(["event_id", "risk_level", "confidence", "day"])
+                    .agg(
+                        entity_count=("entity_id", "size"),
+                        probability_sum=("probability", "sum"),
+                        delta_sum=("delta", "sum"),
+                        drop_count=("is_drop", "sum"),
+                        rise_count=("is_rise", "sum"),
+                    )
+                    .reset_index()
+                )
+                rows = [
+                    (
+                        row.event_id,
+                        row.risk_level,
+                        row.confidence,
+                        row.day,
+                        int(row.entity_count),
+                        float(row.probability_sum),
+                        float(row.delta_sum),
+                        int(row.drop_count),
+                        int(row.rise_count),
+                    )
+                    for row in rollup.itertuples(index=False)
+                ]
+
+            cur.execute(
+                "DELETE FROM portfolio_rollups WHERE %s::text IS NULL OR event_id = %s",
+                (event_id, event_id),
+            )
+            execute_values(
+                cur,
+                """
+                INSERT INTO portfolio_rollups
+                    (event_id, risk_level, confidence, day, entity_count, probability_sum, delta_sum, drop_count, rise_count)
+                VALUES %s
+                """,
+                rows,
+            )
+        conn.commit()
+        return len(rows)
+    finally:
+        conn.close()
+
+
+def _add_to_rollup(
+    cur,
+    event_id: str,
+    probability: float,
+    confidence: str,
+    as_of: datetime,
+    delta: Optional[float],
+    sign: int,
+):
+    move = classify_move(delta)
+    cur.execute(
+        """
+        INSERT INTO portfolio_rollups AS r
+            (event_id, risk_level, confidence, day, entity_count, probability_sum, delta_sum, drop_count, rise_count)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (event_id, risk_level, confidence, day) DO UPDATE SET
+            entity_count = r.entity_count + EXCLUDED.entity_count,
+            probability_sum = r.probability_sum + EXCLUDED.probability_sum,
+            delta_sum = r.delta_sum + EXCLUDED.delta_sum,
+            drop_count = r.drop_count + EXCLUDED.drop_count,
+            rise_count = r.rise_count + EXCLUDED.rise_count
+        """,
+        (
+            event_id,
+            classify_risk(probability),
+            confidence,
+            as_of.date(),
+            sign,
+            sign * probability,
+            sign * (delta or 0.0),
+            sign if move == "drop" else 0,
+            sign if move == "rise" else 0,
+        ),
+    )
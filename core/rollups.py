@@ -0,0 +1,84 @@
+from datetime import date, datetime, timedelta
+from typing import Iterable, Tuple
+
+HIGH_RISK_BELOW = 0.4
+MEDIUM_RISK_BELOW = 0.7
+RISK_LEVELS = ["high_risk", "medium_risk", "low_risk"]
+
+# Belief-to-belief change that counts an entity as a mover
+MOVER_THRESHOLD = 0.1
+
+
+def classify_risk(probability: float) -> str:
+    """Classify a belief probability into a portfolio risk level."""
+    if probability < HIGH_RISK_BELOW:
+        return "high_risk"
+    elif probability < MEDIUM_RISK_BELOW:
+        return "medium_risk"
+    else:
+        return "low_risk"
+
+
+def classify_move(delta: float | None) -> str | None:
+    """Classify a probability change as "drop", "rise" or None (not a mover)."""
+    if delta is None:
+        return None
+    if delta <= -MOVER_THRESHOLD:
+        return "drop"
+    if delta >= MOVER_THRESHOLD:
+        return "rise"
+    return None
+
+
+def recent_since(recent_days: int) -> date:
+    """First day counted as recent by a portfolio summary (days are UTC)."""
+    return datetime.utcnow().date() - timedelta(days=recent_days)
+
+
+def summarize_rollups(event_id: str, recent_days: int, rows: Iterable[Tuple]) -> dict:
+    """Build the portfolio summary from rollup rows.
+
+    Args:
+        event_id: The event identifier
+        recent_days: Window the recent counts were taken over
+        rows: Tuples of (risk_level, confidence, entity_count, probability_sum,
+            recent entity_count, recent drop_count, recent rise_count)
+
+    Returns:
+        Dict with entity_count, average_probability, by_risk_level,
+        by_confidence, and recent counts of updated entities, drops and rises
+    """
+    by_risk_level = {level: {"entity_count": 0, "probability_sum": 0.0} for level in RISK_LEVELS}
+    by_confidence = {}
+    updated = drops = rises = 0
+    for risk_level, confidence, count, probability_sum, recent_count, drop_count, rise_count in rows:
+        by_risk_level.setdefault(risk_level, {"entity_count": 0, "probability_sum": 0.0})
+        by_risk_level[risk_level]["entity_count"] += count
+        by_risk_level[risk_level]["probability_sum"] += probability_sum
+        by_confidence[confidence] = by_confidence.get(confidence, 0) + count
+        updated += recent_count
+        drops += drop_count
+        rises += rise_count
+
+    entity_count = sum(bucket["entity_count"] for bucket in by_risk_level.values())
+    probability_sum = sum(bucket["probability_sum"] for bucket in by_risk_level.values())
+
+    return {
+        "event_id": event_id,
+        "entity_count": entity_count,
+        "average_probability": probability_sum / entity_count if entity_count else None,
+        "by_risk_level": {
+            level: {
+                "entity_count": bucket["entity_count"],
+                "average_probability": (
+                    bucket["probability_sum"] / bucket["entity_count"] if bucket["entity_count"] else None
+                ),
+            }
+            for level, bucket in by_risk_level.items()
+        },
+        "by_confidence": by_confidence,
+        "recent_days": recent_days,
+        "updated_recently": updated,
+        "significant_drops": drops,
+        "significant_rises": rises,
+    }
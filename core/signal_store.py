@@ -0,0 +1,296 @@
+import json
+import uuid
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+from core.db import get_connection, get_read_connection
+from core.queries import execute_prepared
+from core.signals import Signal, flag_column
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Typed columns first; value only holds composite (non-scalar) JSON
+SIGNAL_VALUE_COLUMNS = "value_num, value_bool, value_text, value"
+# Column order read by _row_to_signal
+SIGNAL_COLUMNS = f"signal_id, entity_id, signal_type, timestamp, source, confidence_hint, {SIGNAL_VALUE_COLUMNS}"
+DEFAULT_HISTORY_CHUNK_SIZE = 5000
+
+
+def signal_value(value_num: Optional[float], value_bool: Optional[bool], value_text: Optional[str], value: Any) -> Any:
+    """Native Python value of a signal row from its typed columns."""
+    if value_num is not None:
+        return value_num
+    if value_bool is not None:
+        return value_bool
+    if value_text is not None:
+        return value_text
+    return value
+
+
+def insert_signal(signal: Signal):
+    """Insert a signal. Scalar values are split into the typed columns by the table trigger.
+
+    Args:
+        signal: The Signal to insert
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO signals (signal_id, entity_id, signal_type, value, timestamp, source, confidence_hint)
+                VALUES (%s, %s, %s, %s::jsonb, %s, %s, %s)
+                """,
+                (
+                    signal.signal_id,
+                    signal.entity_id,
+                    signal.signal_type,
+                    json.dumps(signal.value),
+                    signal.timestamp,
+                    signal.source,
+                    signal.confidence_hint,
+                ),
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def get_latest_signals(entity_ids: List[str], signal_types: Optional[List[str]] = None) -> Dict[str, List[Signal]]:
+    """Get the most recent signal of each type for a set of entities in one query.
+
+    Args:
+        entity_ids: The entity identifiers
+        signal_types: Restrict to these signal types (default: all types)
+
+    Returns:
+        Dict mapping entity_id to its latest Signal per signal_type.
+        Entities without signals are absent.
+    """
+    conn = get_read_connection()
+    try:
+        with conn.cursor() as cur:
+            execute_prepared(cur, "latest_signals", (entity_ids, signal_types))
+            signals_by_entity: Dict[str, List[Signal]] = {}
+            for row in cur.fetchall():
+                signals_by_entity.setdefault(row[1], []).append(_row_to_signal(row))
+            return signals_by_entity
+    finally:
+        conn.close()
+
+
+def _row_to_signal(row) -> Signal:
+    return Signal(
+        signal_id=row[0],
+        entity_id=row[1],
+        signal_type=row[2],
+        value=signal_value(*row[6:10]),
+        timestamp=row[3],
+        source=row[4],
+        confidence_hint=row[5],
+    )
+
+
+def get_entities_with_signals(until: Optional[datetime] = None) -> List[str]:
+    """Sorted ids of entities with a signal before until (default: any signal).
+
+    Reads signal_entities, which the signals insert trigger keeps.
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT entity_id
+                FROM signal_entities
+                WHERE %s::timestamp IS NULL OR first_signal_at < %s
+                ORDER BY entity_id
+                """,
+                (until, until),
+            )
+            return [row[0] for row in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+def iter_signal_history(
+    entity_ids: List[str],
+    until: Optional[datetime] = None,
+    chunk_size: int = DEFAULT_HISTORY_CHUNK_SIZE,
+) -> Iterator[Signal]:
+    """Stream the signals of a set of entities from the primary.
+
+    Args:
+        entity_ids: The entity identifiers
+        until: Only signals before this time (default: no limit)
+        chunk_size: Rows fetched per round trip
+
+    Yields:
+        Signals ordered by entity_id, timestamp, signal_id
+    """
+    conn = get_connection()
+    try:
+        # Named cursor = server-side cursor, fetched chunk_size rows at a time
+        with conn.cursor(name=f"signal_history_{uuid.uuid4().hex}") as cur:
+            cur.itersize = chunk_size
+            cur.execute(
+                f"""
+                SELECT {SIGNAL_COLUMNS}
+                FROM signals
+                WHERE entity_id = ANY(%s)
+                  AND (%s::timestamp IS NULL OR timestamp < %s)
+                ORDER BY entity_id, timestamp, signal_id
+                """,
+                (entity_ids, until, until),
+            )
+            for row in cur:
+                yield _row_to_signal(row)
+    finally:
+        conn.close()
+
+
+def get_signal_frame(entity_ids: List[str], signal_types: List[str]) -> Dict[str, "np.ndarray"]:
+    """Latest numeric/boolean value per entity and signal type as native arrays.
+
+    Reads only the typed columns, so no JSON is decoded and no Signal objects
+    are built.
+
+    Args:
+        entity_ids: Row order of the frame
+        signal_types: Signal types to include as columns
+
+    Returns:
+        Dict mapping signal_type and flag_column(signal_type) to float64
+        arrays of len(entity_ids) (see core.signals.flag_column for the encoding)
+    """
+    import numpy as np
+
+    columns = list(signal_types) + [flag_column(signal_type) for signal_type in signal_types]
+    frame = {column: np.full(len(entity_ids), np.nan) for column in columns}
+    rows = {entity_id: index for index, entity_id in enumerate(entity_ids)}
+
+    conn = get_read_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT DISTINCT ON (entity_id, signal_type)
+                    entity_id, signal_type, value_num, value_bool
+                FROM signals
+                WHERE entity_id = ANY(%s) AND signal_type = ANY(%s)
+                ORDER BY entity_id, signal_type, timestamp DESC
+                """,
+                (entity_ids, signal_types),
+            )
+            for entity_id, signal_type, value_num, value_bool in cur.fetchall():
+                if value_num is not None:
+                    frame[signal_type][rows[entity_id]] = value_num
+                elif value_bool is not None:
+                    frame[signal_type][rows[entity_id]] = 1.0 if value_bool else 0.0
+                    frame[flag_column(signal_type)][rows[entity_id]] = 1.0 if value_bool else 0.0
+            return frame
+    finally:
+        conn.close()
+
+
+def find_entities_by_numeric_signal(
+    signal_type: str,
+    lt: Optional[float] = None,
+    gte: Optional[float] = None,
+) -> List[dict]:
+    """Entities whose latest numeric signal of a type falls in [gte, lt).
+
+    Candidates come from an index range scan on value_num; the "is latest"
+    check is an index probe per candidate.
+
+    Args:
+        signal_type: The signal type, e.g. "runway_months"
+        lt: Exclusive upper bound (default: none)
+        gte: Inclusive lower bound (default: none)
+
+    Returns:
+        List of dictionaries with: entity_id, value, timestamp, ordered by value ascending
+    """
+    conn = get_read_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT s.entity_id, s.value_num, s.timestamp
+                FROM signals s
+                WHERE s.signal_type = %s
+                  AND s.value_num IS NOT NULL
+                  AND (%s::double precision IS NULL OR s.value_num < %s)
+                  AND (%s::double precision IS NULL OR s.value_num >= %s)
+                  AND NOT EXISTS (
+                      SELECT 1
+                      FROM signals n
+                      WHERE n.entity_id = s.entity_id
+                        AND n.signal_type = s.signal_type
+                        AND n.timestamp > s.timestamp
+                  )
+                ORDER BY s.value_num, s.entity_id
+                """,
+                (signal_type, lt, lt, gte, gte),
+            )
+            return [
+                {
+                    "entity_id": row[0],
+                    "value": row[1],
+                    "timestamp": row[2],
+                }
+                for row in cur.fetchall()
+            ]
+    finally:
+        conn.close()
+
+
+def backfill_typed_values(chunk_size: int = 10000) -> int:
+    """Split scalar JSONB values of existing signals into the typed columns.
+
+    Rewrites value in signal_id order, one committed chunk at a time, so the
+    split trigger does the conversion and locks are held only briefly.
+
+    Args:
+        chunk_size: Rows converted per transaction
+
+    Returns:
+        Number of rows converted
+    """
+    converted = 0
+    last_signal_id = ""
+    conn = get_connection()
+    try:
+        while True:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    WITH chunk AS (
+                        SELECT signal_id
+                        FROM signals
+                        WHERE signal_id > %s
+                          AND value IS NOT NULL
+                          AND jsonb_typeof(value) IN ('number', 'boolean', 'string')
+                        ORDER BY signal_id
+                        LIMIT %s
+                    ), updated AS (
+                        UPDATE signals s
+                        SET value = s.value
+                        FROM chunk
+                        WHERE s.signal_id = chunk.signal_id
+                        RETURNING s.signal_id
+                    )
+                    -- max() in SQL uses the column's collation, like the ORDER BY above
+                    SELECT count(*), max(signal_id) FROM updated
+                    """,
+                    (last_signal_id, chunk_size),
+                )
+                count, chunk_last_signal_id = cur.fetchone()
+            conn.commit()
+            if not count:
+                return converted
+            converted += count
+            last_signal_id = chunk_last_signal_id
+    finally:
+        conn.close()
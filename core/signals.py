@@ -10,6 +10,18 @@ class Signal(BaseModel):
     signal_type: str
     value: Any
     timestamp: datetime
-    source: str
+    source: Optional[str] = None
     confidence_hint: Optional[float] = Field(None, ge=0, le=1)
 
+
+def flag_column(signal_type: str) -> str:
+    """Signal frame column with the boolean values of a signal type.
+
+    A signal frame (core.signal_store.get_signal_frame) maps columns to
+    float64 arrays. Column signal_type holds numbers, and booleans as
+    1.0 / 0.0 since numeric comparisons treat them as ints; flag_column
+    holds 1.0 / 0.0 for booleans only, so a flag rule never matches the
+    number 1. Missing and text values are NaN in both.
+    """
+    return f"{signal_type}:flag"
+
@@ -0,0 +1,216 @@
+import zlib
+from typing import Dict, List, Literal, Optional
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from core.agents.base import BaseAgent
+from core.agents.capital_markets import CapitalMarketsAgent
+from core.belief_engine import aggregate_probabilities
+from core.signals import flag_column
+
+DEFAULT_SAMPLES = 20000
+PERCENTILES = [5, 25, 50, 75, 95]
+HISTOGRAM_BINS = 10
+# Exact decimal edges; np.linspace(0, 1, 11) has 0.30000000000000004 etc.
+HISTOGRAM_EDGES = [i / HISTOGRAM_BINS for i in range(HISTOGRAM_BINS + 1)]
+# Upper bound on entities x samples per simulation, and per scored batch
+MAX_SCENARIOS = 20_000_000
+MAX_BATCH_SCENARIOS = 1_000_000
+
+
+class Perturbation(BaseModel):
+    """Distribution to sample one signal from.
+
+    normal / uniform sample a number that is added to the current value
+    (mode="shift") or replaces it (mode="absolute"). bernoulli replaces a
+    boolean signal with True with probability p.
+    """
+    signal_type: str
+    distribution: Literal["normal", "uniform", "bernoulli"]
+    mode: Literal["shift", "absolute"] = "shift"
+    mean: float = 0.0
+    std: float = Field(0.0, ge=0)
+    low: float = 0.0
+    high: float = 0.0
+    p: float = Field(0.5, ge=0, le=1)
+
+
+def default_agents(event_id: str) -> List[BaseAgent]:
+    """Agents with vectorized scoring that support the event."""
+    return [agent for agent in [CapitalMarketsAgent()] if event_id in agent.supported_events]
+
+
+def simulate_what_if(
+    event_id: str,
+    entity_ids: List[str],
+    base_frame: Dict[str, np.ndarray],
+    perturbations: List[Perturbation],
+    n_samples: int = DEFAULT_SAMPLES,
+    seed: int = 0,
+    agents: Optional[List[BaseAgent]] = None,
+) -> List[dict]:
+    """Monte Carlo what-if of belief probability under signal perturbations.
+
+    Each entity's current signals are perturbed n_samples times, scored through
+    every agent's score_frame and aggregated like aggregate_proposals. Entities
+    are scored together in (entities, n_samples) batches of at most
+    MAX_BATCH_SCENARIOS values.
+    Sensitivity of a signal is the mean absolute probability change when only
+    that signal is perturbed. Each entity draws from its own stream derived from
+    (seed, entity_id), so results do not depend on which other entities are
+    simulated alongside it.
+
+    Args:
+        event_id: The event identifier
+        entity_ids: Entities to simulate
+        base_frame: Current signal frame aligned with entity_ids, with a column
+            for every signal the agents require (see core.signal_store.get_signal_frame)
+        perturbations: One Perturbation per signal type to vary
+        n_samples: Number of scenarios per entity
+        seed: Seed for reproducible sampling
+        agents: Agents to score with (default: agents supporting event_id)
+
+    Returns:
+        List of dicts per entity with baseline_probability, mean, std,
+        percentiles, histogram and sensitivity (ranked, highest first)
+
+    Raises:
+        ValueError: If entities x n_samples exceeds MAX_SCENARIOS, no agent
+            supports the event, or the frame lacks a required column
+    """
+    if len(entity_ids) * n_samples > MAX_SCENARIOS:
+        raise ValueError(
+            f"{len(entity_ids)} entities x {n_samples} samples exceeds {MAX_SCENARIOS} scenarios; "
+            "lower n_samples or simulate fewer entities"
+        )
+    agents = agents if agents is not None else default_agents(event_id)
+    if not agents:
+        raise ValueError(f"No agents with vectorized scoring support {event_id}")
+    signal_types = sorted({signal_type for agent in agents for signal_type in agent.required_signals})
+
+    unknown = sorted({p.signal_type for p in perturbations} - set(signal_types))
+    if unknown:
+        raise ValueError(f"Perturbed signals not used by any agent for {event_id}: {', '.join(unknown)}")
+
+    columns = signal_types + [flag_column(signal_type) for signal_type in signal_types]
+    missing = [column for column in columns if column not in base_frame]
+    if missing:
+        raise ValueError(f"Signal frame is missing columns: {', '.join(missing)}")
+
+    baseline = _score(agents, base_frame)
+
+    results = []
+    batch_size = max(1, MAX_BATCH_SCENARIOS // n_samples)
+    for start in range(0, len(entity_ids), batch_size):
+        rows = slice(start, start + batch_size)
+        results.extend(
+            _simulate_batch(
+                agents,
+                entity_ids[rows],
+                {column: base_frame[column][rows] for column in columns},
+                baseline[rows],
+                perturbations,
+                n_samples,
+                seed,
+            )
+        )
+    return results
+
+
+def _simulate_batch(
+    agents: List[BaseAgent],
+    entity_ids: List[str],
+    base_frame: Dict[str, np.ndarray],
+    baseline: np.ndarray,
+    perturbations: List[Perturbation],
+    n_samples: int,
+    seed: int,
+) -> List[dict]:
+    """Simulate a batch of entities as one (entities, n_samples) frame."""
+    shape = (len(entity_ids), n_samples)
+    # Unperturbed columns are (entities, 1) and broadcast across the samples
+    held = {column: values[:, None] for column, values in base_frame.items()}
+
+    samples = {p.signal_type: np.empty(shape) for p in perturbations}
+    for row, entity_id in enumerate(entity_ids):
+        rng = np.random.default_rng([seed, zlib.crc32(entity_id.encode())])
+        for p in perturbations:
+            samples[p.signal_type][row] = _sample(p, base_frame[p.signal_type][row], n_samples, rng)
+    draws = {p.signal_type: _perturbed_columns(p, samples[p.signal_type]) for p in perturbations}
+
+    scenario_frame = dict(held)
+    for perturbed in draws.values():
+        scenario_frame.update(perturbed)
+    # Without perturbations the score has the held columns' (entities, 1) shape
+    probabilities = np.broadcast_to(_score(agents, scenario_frame), shape)
+
+    sensitivity = [[] for _ in entity_ids]
+    for signal_type, perturbed in draws.items():
+        # One-at-a-time: vary this signal only, hold the rest at baseline
+        delta = _score(agents, {**held, **perturbed}) - baseline[:, None]
+        for row, (mean_abs_delta, mean_delta) in enumerate(zip(np.abs(delta).mean(axis=1), delta.mean(axis=1))):
+            sensitivity[row].append({
+                "signal_type": signal_type,
+                "mean_abs_delta": float(mean_abs_delta),
+                "mean_delta": float(mean_delta),
+            })
+
+    means = probabilities.mean(axis=1)
+    stds = probabilities.std(axis=1)
+    percentiles = np.percentile(probabilities, PERCENTILES, axis=1)
+    frequencies = _histograms(probabilities) / n_samples
+
+    results = []
+    for row, entity_id in enumerate(entity_ids):
+        sensitivity[row].sort(key=lambda s: s["mean_abs_delta"], reverse=True)
+        results.append({
+            "entity_id": entity_id,
+            "baseline_probability": float(baseline[row]),
+            "mean": float(means[row]),
+            "std": float(stds[row]),
+            "percentiles": {f"p{q}": float(v) for q, v in zip(PERCENTILES, percentiles[:, row])},
+            "histogram": {
+                "bin_edges": list(HISTOGRAM_EDGES),
+                "frequencies": frequencies[row].tolist(),
+            },
+            "sensitivity": sensitivity[row],
+        })
+    return results
+
+
+def _histograms(probabilities: np.ndarray) -> np.ndarray:
+    """Per-row counts over HISTOGRAM_EDGES; bins are [low, high), the last one closed.
+
+    Bins come from the scaled value rounded to 9 decimals, so 0.6 (or a sum
+    like 0.45 + 0.15) lands in the 0.6-0.7 bin instead of the one below.
+    """
+    bins = np.floor(np.round(probabilities * HISTOGRAM_BINS, 9)).astype(int)
+    bins = np.clip(bins, 0, HISTOGRAM_BINS - 1)
+    offsets = np.arange(len(probabilities))[:, None] * HISTOGRAM_BINS
+    counts = np.bincount((bins + offsets).ravel(), minlength=len(probabilities) * HISTOGRAM_BINS)
+    return counts.reshape(len(probabilities), HISTOGRAM_BINS)
+
+
+def _score(agents: List[BaseAgent], frame: Dict[str, np.ndarray]) -> np.ndarray:
+    probability, _ = aggregate_probabilities(np.stack([agent.score_frame(frame) for agent in agents]))
+    return probability
+
+
+def _perturbed_columns(perturbation: Perturbation, values: np.ndarray) -> Dict[str, np.ndarray]:
+    """Frame columns for sampled values: bernoulli draws are booleans, the others numbers."""
+    flags = values if perturbation.distribution == "bernoulli" else np.full(values.shape, np.nan)
+    return {perturbation.signal_type: values, flag_column(perturbation.signal_type): flags}
+
+
+def _sample(perturbation: Perturbation, base_value: float, n_samples: int, rng: np.random.Generator) -> np.ndarray:
+    if perturbation.distribution == "bernoulli":
+        return (rng.random(n_samples) < perturbation.p).astype(float)
+
+    if perturbation.distribution == "normal":
+        values = rng.normal(perturbation.mean, perturbation.std, n_samples)
+    else:
+        values = rng.uniform(perturbation.low, perturbation.high, n_samples)
+
+    # Shifting a missing signal keeps it missing
+    return values if perturbation.mode == "absolute" else base_value + values
@@ -0,0 +1,58 @@
+import os
+import threading
+from typing import Optional
+
+from core.storage.base import StorageBackend
+
+STORAGE_BACKENDS = ("postgres", "memory")
+
+_storage: Optional[StorageBackend] = None
+_storage_lock = threading.Lock()
+
+
+def create_storage(backend: str, memory_snapshot: Optional[str] = None) -> StorageBackend:
+    """Create a storage backend by name ("postgres" or "memory").
+
+    memory_snapshot is a JSON Lines file the memory backend is seeded from
+    (see MemoryStorage.load).
+    """
+    # Imported lazily so the memory backend never needs psycopg2 or a database
+    if backend == "postgres":
+        if memory_snapshot:
+            raise ValueError("memory_snapshot only applies to the memory backend")
+        from core.storage.postgres import PostgresStorage
+
+        return PostgresStorage()
+    if backend == "memory":
+        from core.storage.memory import MemoryStorage
+
+        storage = MemoryStorage()
+        if memory_snapshot:
+            storage.load(memory_snapshot)
+        return storage
+    raise ValueError(f"Unknown storage backend: {backend} (expected one of {', '.join(STORAGE_BACKENDS)})")
+
+
+def get_storage() -> StorageBackend:
+    """Process-wide storage backend selected by DII_STORAGE_BACKEND (default: postgres).
+
+    The memory backend is seeded from DII_MEMORY_SNAPSHOT when it is set.
+    """
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                backend = os.environ.get("DII_STORAGE_BACKEND", "postgres")
+                snapshot = os.environ.get("DII_MEMORY_SNAPSHOT") if backend == "memory" else None
+                _storage = create_storage(backend, snapshot)
+    return _storage
+
+
+def set_storage(storage: Optional[StorageBackend]):
+    """Replace the process-wide backend, e.g. with a pre-loaded MemoryStorage. None resets it."""
+    global _storage
+    with _storage_lock:
+        _storage = storage
+
+
+__all__ = ["STORAGE_BACKENDS", "StorageBackend", "create_storage", "get_storage", "set_storage"]
@@ -0,0 +1,143 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional
+
+from core.beliefs import BeliefSnapshot
+from core.proposals import ForecastProposal
+from core.signals import Signal
+from core.trends import BeliefTrend
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class StorageBackend(ABC):
+    """Storage operations used by the pipeline and the read API.
+
+    Every backend must give the same answers: latest is the snapshot with the
+    greatest as_of, previous is the latest one strictly before the current
+    belief's as_of, history is the oldest `limit` snapshots in ascending as_of,
+    proposals are newest first and entity ids are distinct and sorted.
+    core.storage.conformance checks these rules against a backend.
+    """
+
+    # Whether other processes see this backend's writes (worker pools need it)
+    shared = True
+
+    @abstractmethod
+    def get_latest_belief(self, event_id: str, entity_id: str) -> Optional[BeliefSnapshot]:
+        pass
+
+    @abstractmethod
+    def get_belief(self, belief_id: str, as_of: datetime) -> Optional[BeliefSnapshot]:
+        """The snapshot with exactly this belief_id and as_of, read from the authoritative copy."""
+        pass
+
+    @abstractmethod
+    def get_previous_belief(
+        self, event_id: str, entity_id: str, current_belief_id: str, current_as_of: datetime
+    ) -> Optional[BeliefSnapshot]:
+        """The latest snapshot before the current one; None if (current_belief_id, current_as_of) does not exist."""
+        pass
+
+    @abstractmethod
+    def get_belief_history(self, event_id: str, entity_id: str, limit: int = 20) -> List[dict]:
+        """List of dicts with: belief_id, probability, confidence, as_of."""
+        pass
+
+    @abstractmethod
+    def get_belief_lineage(self, event_id: str, entity_id: str, max_depth: Optional[int] = None) -> List[dict]:
+        """previous_belief_id chain back from the latest belief, latest first.
+
+        Dicts with: belief_id, probability, confidence, as_of, previous_belief_id,
+        depth, delta (against the hop's predecessor) and proposals (latest per
+        agent created at or before the hop's as_of, by agent_id).
+        """
+        pass
+
+    @abstractmethod
+    def insert_belief_snapshot(self, belief: BeliefSnapshot):
+        """Insert a belief and update its derived trend state."""
+        pass
+
+    @abstractmethod
+    def append_belief(
+        self,
+        belief: BeliefSnapshot,
+        proposals: List[ForecastProposal],
+        fence: Optional[Callable[[], None]] = None,
+    ) -> BeliefSnapshot:
+        """Write proposals and belief as the new latest belief of its (event, entity).
+
+        One writer per (event, entity) at a time: previous_belief_id is set
+        to the latest belief at write time. fence runs once that writer slot
+        is held and before anything is written; an exception from it aborts
+        the write. Returns the belief as written.
+        """
+        pass
+
+    @abstractmethod
+    def get_entities_with_beliefs(self, event_id: str) -> List[str]:
+        pass
+
+    @abstractmethod
+    def get_trends(self, event_id: str) -> Dict[str, BeliefTrend]:
+        pass
+
+    @abstractmethod
+    def get_portfolio_summary(self, event_id: str, recent_days: int = 7) -> dict:
+        """Summary of the entities' latest beliefs, shaped by core.rollups.summarize_rollups."""
+        pass
+
+    @abstractmethod
+    def insert_proposal(self, proposal: ForecastProposal):
+        pass
+
+    @abstractmethod
+    def get_proposals(self, event_id: str, entity_id: str) -> List[ForecastProposal]:
+        pass
+
+    @abstractmethod
+    def insert_signal(self, signal: Signal):
+        pass
+
+    @abstractmethod
+    def get_latest_signals(self, entity_ids: List[str], signal_types: Optional[List[str]] = None) -> Dict[str, List[Signal]]:
+        """Dict of entity_id to its latest Signal per signal_type."""
+        pass
+
+    @abstractmethod
+    def get_entities_with_signals(self, until: Optional[datetime] = None) -> List[str]:
+        """Sorted ids of entities with a signal before until (default: any signal)."""
+        pass
+
+    @abstractmethod
+    def iter_signal_history(self, entity_ids: List[str], until: Optional[datetime] = None) -> Iterator[Signal]:
+        """Signals of the entities before until, ordered by entity_id, timestamp, signal_id."""
+        pass
+
+    @abstractmethod
+    def get_signal_frame(self, entity_ids: List[str], signal_types: List[str]) -> Dict[str, "np.ndarray"]:
+        """Latest values as float arrays aligned with entity_ids (see core.signals.flag_column)."""
+        pass
+
+    @abstractmethod
+    def start_replay(
+        self, replay_id: str, agent_version: str, since: Optional[datetime], until: Optional[datetime], entity_count: int
+    ):
+        """Record a replay run (see core.replay)."""
+        pass
+
+    @abstractmethod
+    def finish_replay(self, replay_id: str, snapshot_count: int):
+        pass
+
+    @abstractmethod
+    def insert_shadow_beliefs(self, replay_id: str, agent_version: str, beliefs: List[BeliefSnapshot]):
+        """Insert replayed beliefs; they are never read as production beliefs."""
+        pass
+
+    @abstractmethod
+    def diff_replay(self, replay_id: str, event_id: str) -> List[dict]:
+        """Per-entity comparison of a replay's shadow beliefs with production (see core.replay.diff_replay)."""
+        pass
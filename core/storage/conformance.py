@@ -0,0 +1,427 @@
+"""Conformance checks every StorageBackend must pass.
+
+    python -m core.storage.conformance memory
+    python -m core.storage.conformance postgres   # writes rows; use a scratch database
+
+Each check writes under a fresh event/entity id, so runs never see each other's data.
+"""
+import argparse
+import sys
+import time
+import math
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+
+from core.beliefs import BeliefSnapshot
+from core.proposals import ForecastProposal
+from core.signals import Signal, flag_column
+from core.storage import STORAGE_BACKENDS, create_storage
+from core.storage.base import StorageBackend
+
+T0 = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def _id(prefix: str) -> str:
+    return f"{prefix}_{uuid.uuid4().hex[:12]}"
+
+
+def _belief(
+    event_id: str,
+    entity_id: str,
+    probability: float,
+    hours: int,
+    previous: Optional[BeliefSnapshot] = None,
+    t0: datetime = T0,
+) -> BeliefSnapshot:
+    return BeliefSnapshot(
+        belief_id=_id("bel"),
+        event_id=event_id,
+        entity_id=entity_id,
+        probability=probability,
+        confidence="medium",
+        as_of=t0 + timedelta(hours=hours),
+        previous_belief_id=previous.belief_id if previous is not None else None,
+    )
+
+
+def check_empty_reads(storage: StorageBackend):
+    event_id, entity_id = _id("evt"), _id("ent")
+    assert storage.get_latest_belief(event_id, entity_id) is None
+    assert storage.get_previous_belief(event_id, entity_id, _id("bel"), T0) is None
+    assert storage.get_belief(_id("bel"), T0) is None
+    assert storage.get_belief_history(event_id, entity_id) == []
+    assert storage.get_entities_with_beliefs(event_id) == []
+    assert storage.get_trends(event_id) == {}
+    assert storage.get_proposals(event_id, entity_id) == []
+    assert storage.get_latest_signals([entity_id]) == {}
+    assert storage.get_belief_lineage(event_id, entity_id) == []
+    assert storage.get_portfolio_summary(event_id)["entity_count"] == 0
+
+
+def check_latest_previous_history(storage: StorageBackend):
+    event_id, entity_id = _id("evt"), _id("ent")
+    # Inserted out of as_of order on purpose
+    b2 = _belief(event_id, entity_id, 0.5, 2)
+    b0 = _belief(event_id, entity_id, 0.7, 0)
+    b3 = _belief(event_id, entity_id, 0.4, 3)
+    b1 = _belief(event_id, entity_id, 0.6, 1)
+    for belief in (b2, b0, b3, b1):
+        storage.insert_belief_snapshot(belief)
+
+    latest = storage.get_latest_belief(event_id, entity_id)
+    assert latest is not None and latest.belief_id == b3.belief_id, latest
+    assert storage.get_previous_belief(event_id, entity_id, b3.belief_id, b3.as_of).belief_id == b2.belief_id
+    assert storage.get_previous_belief(event_id, entity_id, b1.belief_id, b1.as_of).belief_id == b0.belief_id
+    assert storage.get_previous_belief(event_id, entity_id, b0.belief_id, b0.as_of) is None
+    # The as_of must be the current belief's own
+    assert storage.get_previous_belief(event_id, entity_id, b3.belief_id, b2.as_of) is None
+
+    assert storage.get_belief(b1.belief_id, b1.as_of).belief_id == b1.belief_id
+    assert storage.get_belief(b1.belief_id, b2.as_of) is None
+
+    history = storage.get_belief_history(event_id, entity_id)
+    assert [h["belief_id"] for h in history] == [b0.belief_id, b1.belief_id, b2.belief_id, b3.belief_id]
+    assert set(history[0]) == {"belief_id", "probability", "confidence", "as_of"}
+    # limit keeps the oldest rows
+    assert [h["belief_id"] for h in storage.get_belief_history(event_id, entity_id, limit=2)] == [
+        b0.belief_id,
+        b1.belief_id,
+    ]
+
+
+def check_entities(storage: StorageBackend):
+    event_id = _id("evt")
+    entity_ids = sorted(_id("ent") for _ in range(3))
+    for hours, entity_id in enumerate(reversed(entity_ids + entity_ids)):
+        storage.insert_belief_snapshot(_belief(event_id, entity_id, 0.5, hours))
+    storage.insert_belief_snapshot(_belief(_id("evt"), _id("ent"), 0.5, 0))
+    assert storage.get_entities_with_beliefs(event_id) == entity_ids
+
+
+def check_trends(storage: StorageBackend):
+    event_id, entity_id = _id("evt"), _id("ent")
+    for hours, probability in enumerate([0.8, 0.7, 0.6]):
+        storage.insert_belief_snapshot(_belief(event_id, entity_id, probability, hours))
+    # An older belief arriving late does not move the trend
+    storage.insert_belief_snapshot(_belief(event_id, entity_id, 0.1, -1))
+
+    trend = storage.get_trends(event_id)[entity_id]
+    assert trend.as_of == T0 + timedelta(hours=2), trend
+    assert abs(trend.probability - 0.6) < 1e-9, trend
+
+
+def check_lineage(storage: StorageBackend):
+    event_id, entity_id = _id("evt"), _id("ent")
+    b0 = _belief(event_id, entity_id, 0.5, 0)
+    b1 = _belief(event_id, entity_id, 0.6, 1, previous=b0)
+    b2 = _belief(event_id, entity_id, 0.4, 2, previous=b1)
+    for belief in (b0, b1, b2):
+        storage.insert_belief_snapshot(belief)
+
+    def proposal(agent_id, minutes):
+        p = ForecastProposal(
+            proposal_id=_id("prop"),
+            agent_id=agent_id,
+            event_id=event_id,
+            entity_id=entity_id,
+            proposed_probability=0.5,
+            rationale="lineage",
+            created_at=T0 + timedelta(minutes=minutes),
+        )
+        storage.insert_proposal(p)
+        return p.proposal_id
+
+    a_early, b_mid, a_late = proposal("agent_a", -1), proposal("agent_b", 30), proposal("agent_a", 90)
+
+    lineage = storage.get_belief_lineage(event_id, entity_id)
+    assert [hop["belief_id"] for hop in lineage] == [b2.belief_id, b1.belief_id, b0.belief_id]
+    assert [hop["depth"] for hop in lineage] == [0, 1, 2]
+    assert [None if hop["delta"] is None else round(hop["delta"], 6) for hop in lineage] == [-0.2, 0.1, None]
+    assert [[p["proposal_id"] for p in hop["proposals"]] for hop in lineage] == [
+        [a_late, b_mid],
+        [a_early, b_mid],
+        [a_early],
+    ]
+
+    # The deepest returned hop still has its delta
+    shallow = storage.get_belief_lineage(event_id, entity_id, max_depth=1)
+    assert [hop["belief_id"] for hop in shallow] == [b2.belief_id, b1.belief_id]
+    assert round(shallow[-1]["delta"], 6) == 0.1
+
+
+def check_portfolio_summary(storage: StorageBackend):
+    event_id = _id("evt")
+    now = datetime.utcnow().replace(microsecond=0)
+    # Recent drop, old high-risk belief, old rise
+    dropped, old, risen = _id("ent"), _id("ent"), _id("ent")
+    first = _belief(event_id, dropped, 0.8, -3, t0=now)
+    storage.insert_belief_snapshot(first)
+    storage.insert_belief_snapshot(_belief(event_id, dropped, 0.5, -2, previous=first, t0=now))
+    storage.insert_belief_snapshot(_belief(event_id, old, 0.3, 0))
+    first = _belief(event_id, risen, 0.6, 0)
+    storage.insert_belief_snapshot(first)
+    storage.insert_belief_snapshot(_belief(event_id, risen, 0.75, 1, previous=first))
+
+    summary = storage.get_portfolio_summary(event_id, recent_days=7)
+    assert summary["entity_count"] == 3
+    assert abs(summary["average_probability"] - (0.5 + 0.3 + 0.75) / 3) < 1e-9
+    assert {level: bucket["entity_count"] for level, bucket in summary["by_risk_level"].items()} == {
+        "high_risk": 1,
+        "medium_risk": 1,
+        "low_risk": 1,
+    }
+    assert summary["by_confidence"] == {"medium": 3}
+    assert (summary["updated_recently"], summary["significant_drops"], summary["significant_rises"]) == (1, 1, 0)
+
+
+def check_proposals(storage: StorageBackend):
+    event_id, entity_id = _id("evt"), _id("ent")
+    proposals = [
+        ForecastProposal(
+            proposal_id=_id("prop"),
+            agent_id=f"agent_{i}",
+            event_id=event_id,
+            entity_id=entity_id,
+            proposed_probability=0.5,
+            rationale=f"rationale {i}",
+            created_at=T0 + timedelta(minutes=i),
+        )
+        for i in range(3)
+    ]
+    for proposal in (proposals[1], proposals[2], proposals[0]):
+        storage.insert_proposal(proposal)
+    assert [p.proposal_id for p in storage.get_proposals(event_id, entity_id)] == [
+        p.proposal_id for p in reversed(proposals)
+    ]
+
+
+def check_latest_signals(storage: StorageBackend):
+    entity_a, entity_b, entity_none = _id("ent"), _id("ent"), _id("ent")
+
+    def signal(entity_id, signal_type, value, hours):
+        return Signal(
+            signal_id=_id("sig"),
+            entity_id=entity_id,
+            signal_type=signal_type,
+            value=value,
+            timestamp=T0 + timedelta(hours=hours),
+            source="conformance",
+        )
+
+    for s in (
+        signal(entity_a, "runway_months", 12.0, 1),
+        signal(entity_a, "runway_months", 6.0, 2),
+        signal(entity_a, "runway_months", 9.0, 0),
+        signal(entity_a, "hiring_freeze", True, 0),
+        signal(entity_b, "runway_months", 3.0, 0),
+    ):
+        storage.insert_signal(s)
+
+    latest = storage.get_latest_signals([entity_a, entity_b, entity_none])
+    assert set(latest) == {entity_a, entity_b}, latest
+    values_a = {s.signal_type: s.value for s in latest[entity_a]}
+    assert values_a == {"runway_months": 6.0, "hiring_freeze": True}, values_a
+
+    only_runway = storage.get_latest_signals([entity_a], ["runway_months"])
+    assert [s.signal_type for s in only_runway[entity_a]] == ["runway_months"]
+
+    storage.insert_signal(signal(entity_b, "hiring_freeze", 1, 0))
+    frame = storage.get_signal_frame([entity_none, entity_a, entity_b], ["runway_months", "hiring_freeze"])
+    assert set(frame) == {"runway_months", "hiring_freeze", flag_column("runway_months"), flag_column("hiring_freeze")}
+    assert frame["runway_months"].tolist()[1:] == [6.0, 3.0]
+    assert frame["hiring_freeze"].tolist()[1:] == [1.0, 1.0]
+    # True is a flag, the number 1 is not
+    assert frame[flag_column("hiring_freeze")][1] == 1.0
+    assert all(math.isnan(frame[column][0]) for column in frame)
+    assert math.isnan(frame[flag_column("hiring_freeze")][2])
+
+
+def check_append_belief(storage: StorageBackend):
+    event_id, entity_id = _id("evt"), _id("ent")
+
+    def proposal(minutes):
+        return ForecastProposal(
+            proposal_id=_id("prop"),
+            agent_id="agent_a",
+            event_id=event_id,
+            entity_id=entity_id,
+            proposed_probability=0.5,
+            rationale="append",
+            created_at=T0 + timedelta(minutes=minutes),
+        )
+
+    first = storage.append_belief(_belief(event_id, entity_id, 0.5, 0), [proposal(0)])
+    assert first.previous_belief_id is None
+    # The caller's previous_belief_id is replaced by the latest belief's
+    second = storage.append_belief(_belief(event_id, entity_id, 0.6, 1, previous=first), [proposal(60)])
+    third = _belief(event_id, entity_id, 0.7, 2)
+    assert storage.append_belief(third, []).previous_belief_id == second.belief_id
+    assert second.previous_belief_id == first.belief_id
+    assert storage.get_latest_belief(event_id, entity_id).belief_id == third.belief_id
+    assert len(storage.get_proposals(event_id, entity_id)) == 2
+
+    class Fenced(Exception):
+        pass
+
+    def fence():
+        raise Fenced()
+
+    try:
+        storage.append_belief(_belief(event_id, entity_id, 0.8, 3), [proposal(180)], fence)
+        raise AssertionError("fence did not abort the write")
+    except Fenced:
+        pass
+    assert storage.get_latest_belief(event_id, entity_id).belief_id == third.belief_id
+    assert len(storage.get_proposals(event_id, entity_id)) == 2
+
+
+def check_signal_history(storage: StorageBackend):
+    entity_a, entity_b = sorted(_id("ent") for _ in range(2))
+
+    def signal(entity_id, signal_id, signal_type, hours):
+        return Signal(
+            signal_id=signal_id,
+            entity_id=entity_id,
+            signal_type=signal_type,
+            value=float(hours),
+            timestamp=T0 + timedelta(hours=hours),
+            source="conformance",
+        )
+
+    for s in (
+        signal(entity_b, f"{entity_b}_s1", "runway_months", 1),
+        signal(entity_a, f"{entity_a}_s2", "runway_months", 2),
+        signal(entity_a, f"{entity_a}_s1b", "burn_rate", 1),
+        signal(entity_a, f"{entity_a}_s1a", "runway_months", 1),
+        signal(entity_b, f"{entity_b}_s5", "burn_rate", 5),
+    ):
+        storage.insert_signal(s)
+
+    entities = storage.get_entities_with_signals()
+    assert [e for e in entities if e in (entity_a, entity_b)] == [entity_a, entity_b]
+    assert entities == sorted(entities)
+    assert entity_b not in storage.get_entities_with_signals(until=T0 + timedelta(hours=1))
+
+    history = list(storage.iter_signal_history([entity_b, entity_a]))
+    assert [s.signal_id for s in history] == [
+        f"{entity_a}_s1a",
+        f"{entity_a}_s1b",
+        f"{entity_a}_s2",
+        f"{entity_b}_s1",
+        f"{entity_b}_s5",
+    ]
+    assert history[0].value == 1.0
+    until = [s.signal_id for s in storage.iter_signal_history([entity_a, entity_b], until=T0 + timedelta(hours=2))]
+    assert until == [f"{entity_a}_s1a", f"{entity_a}_s1b", f"{entity_b}_s1"]
+
+
+def check_replay_diff(storage: StorageBackend):
+    event_id, compared, uncompared = _id("evt"), _id("ent"), _id("ent")
+    replay_id = str(uuid.uuid4())
+    storage.insert_belief_snapshot(_belief(event_id, compared, 0.5, 1))
+    storage.insert_belief_snapshot(_belief(event_id, compared, 0.7, 3))
+
+    storage.start_replay(replay_id, "conformance_v1", None, None, 2)
+    storage.insert_shadow_beliefs(
+        replay_id,
+        "conformance_v1",
+        [
+            # Before any production belief, so not compared
+            _belief(event_id, compared, 0.2, 0),
+            _belief(event_id, compared, 0.4, 2),
+            _belief(event_id, compared, 0.6, 3),
+            _belief(event_id, uncompared, 0.3, 0),
+            _belief(_id("evt"), compared, 0.9, 0),
+        ],
+    )
+    storage.finish_replay(replay_id, 5)
+
+    diff = storage.diff_replay(replay_id, event_id)
+    assert [row["entity_id"] for row in diff] == [compared, uncompared]
+    row = diff[0]
+    assert (row["shadow_snapshots"], row["compared_snapshots"]) == (3, 2)
+    assert abs(row["mean_abs_delta"] - 0.1) < 1e-9 and abs(row["max_abs_delta"] - 0.1) < 1e-9
+    assert (row["shadow_probability"], row["production_probability"]) == (0.6, 0.7)
+    assert (diff[1]["compared_snapshots"], diff[1]["max_abs_delta"], diff[1]["production_probability"]) == (0, None, None)
+
+
+CHECKS: List[Callable[[StorageBackend], None]] = [
+    check_empty_reads,
+    check_latest_previous_history,
+    check_entities,
+    check_trends,
+    check_lineage,
+    check_portfolio_summary,
+    check_proposals,
+    check_latest_signals,
+    check_append_belief,
+    check_signal_history,
+    check_replay_diff,
+]
+
+
+def run_conformance(storage: StorageBackend) -> List[Tuple[str, Optional[str]]]:
+    """Run all checks against a backend.
+
+    Returns:
+        List of (check name, None if passed else the failure message)
+    """
+    results = []
+    for check in CHECKS:
+        try:
+            check(storage)
+            results.append((check.__name__, None))
+        except Exception as exc:
+            results.append((check.__name__, f"{type(exc).__name__}: {exc}"))
+    return results
+
+
+def bench_portfolio_reads(storage: StorageBackend, entities: int = 1000, beliefs_per_entity: int = 10) -> dict:
+    """Time the portfolio read path (latest + previous) over a freshly seeded event.
+
+    Seeds entities ent_00000.. with beliefs at hours 0..beliefs_per_entity-1,
+    so only run this against the memory backend or a scratch database.
+
+    Returns:
+        Dict with event_id, entity_count and seconds_per_entity
+    """
+    event_id = _id("evt")
+    for e in range(entities):
+        entity_id = f"ent_{e:05d}"
+        for hours in range(beliefs_per_entity):
+            storage.insert_belief_snapshot(_belief(event_id, entity_id, 0.5, hours))
+
+    start = time.perf_counter()
+    entity_ids = storage.get_entities_with_beliefs(event_id)
+    for entity_id in entity_ids:
+        current = storage.get_latest_belief(event_id, entity_id)
+        storage.get_previous_belief(event_id, entity_id, current.belief_id, current.as_of)
+    return {
+        "event_id": event_id,
+        "entity_count": len(entity_ids),
+        "seconds_per_entity": (time.perf_counter() - start) / len(entity_ids),
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run the storage backend conformance checks")
+    parser.add_argument("backend", choices=STORAGE_BACKENDS)
+    parser.add_argument("--bench", action="store_true", help="Also time the portfolio read path")
+    args = parser.parse_args(argv)
+
+    storage = create_storage(args.backend)
+    results = run_conformance(storage)
+    for name, failure in results:
+        print(f"{'FAIL' if failure else 'ok  '} {name}{': ' + failure if failure else ''}")
+
+    if args.bench:
+        bench = bench_portfolio_reads(storage)
+        print(f"portfolio read: {bench['seconds_per_entity'] * 1e6:.1f} us per entity")
+
+    if any(failure for _, failure in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
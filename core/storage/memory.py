@@ -0,0 +1,328 @@
+import bisect
+import json
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple
+
+from core.beliefs import BeliefSnapshot
+from core.proposals import ForecastProposal
+from core.signals import Signal, flag_column
+from core.storage.base import StorageBackend
+from core.rollups import classify_move, classify_risk, recent_since, summarize_rollups
+from core.trends import BeliefTrend, update_trend
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class MemoryStorage(StorageBackend):
+    """In-process StorageBackend for tests, benchmarks and small deployments.
+
+    Histories are kept as lists sorted by time per (event, entity), so latest
+    is the last element and previous is one bisect away. The portfolio
+    summary is computed from the latest beliefs on each call. Nothing is
+    persisted unless save() is called; load() seeds a store from such a
+    snapshot (core.storage.get_storage loads DII_MEMORY_SNAPSHOT).
+    """
+
+    shared = False
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._beliefs: Dict[Tuple[str, str], List[BeliefSnapshot]] = defaultdict(list)
+        self._belief_index: Dict[str, BeliefSnapshot] = {}
+        self._entities: Dict[str, List[str]] = defaultdict(list)
+        self._trends: Dict[str, Dict[str, BeliefTrend]] = defaultdict(dict)
+        self._proposals: Dict[Tuple[str, str], List[ForecastProposal]] = defaultdict(list)
+        self._signals: Dict[str, Dict[str, List[Signal]]] = defaultdict(lambda: defaultdict(list))
+        self._replays: Dict[str, dict] = {}
+        self._shadow_beliefs: Dict[str, List[BeliefSnapshot]] = defaultdict(list)
+
+    def load(self, path: str):
+        """Insert the records of a JSON Lines snapshot written by save().
+
+        One JSON object per line: "kind" ("signal", "proposal" or "belief")
+        plus the fields of that model. Beliefs are inserted in as_of order,
+        so the trend state comes out as if they had been written live.
+        """
+        models = {"signal": Signal, "proposal": ForecastProposal, "belief": BeliefSnapshot}
+        beliefs = []
+        with open(path) as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                kind = record.pop("kind", None)
+                if kind not in models:
+                    raise ValueError(f"{path}:{line_number}: unknown record kind {kind!r}")
+                model = models[kind](**record)
+                if kind == "belief":
+                    beliefs.append(model)
+                elif kind == "proposal":
+                    self.insert_proposal(model)
+                else:
+                    self.insert_signal(model)
+        for belief in sorted(beliefs, key=lambda b: b.as_of):
+            self.insert_belief_snapshot(belief)
+
+    def save(self, path: str):
+        """Write every signal, proposal and belief to a JSON Lines snapshot (see load)."""
+        with self._lock:
+            records = [
+                ("signal", signal)
+                for by_type in self._signals.values()
+                for history in by_type.values()
+                for signal in history
+            ]
+            records += [("proposal", proposal) for proposals in self._proposals.values() for proposal in proposals]
+            records += [("belief", belief) for belief in sorted(self._belief_index.values(), key=lambda b: b.as_of)]
+        with open(path, "w") as f:
+            for kind, model in records:
+                f.write(json.dumps({"kind": kind, **model.model_dump(mode="json")}) + "\n")
+
+    def get_latest_belief(self, event_id: str, entity_id: str) -> Optional[BeliefSnapshot]:
+        history = self._beliefs.get((event_id, entity_id))
+        return history[-1] if history else None
+
+    def get_belief(self, belief_id: str, as_of: datetime) -> Optional[BeliefSnapshot]:
+        belief = self._belief_index.get(belief_id)
+        return belief if belief is not None and belief.as_of == as_of else None
+
+    def get_previous_belief(
+        self, event_id: str, entity_id: str, current_belief_id: str, current_as_of: datetime
+    ) -> Optional[BeliefSnapshot]:
+        current = self.get_belief(current_belief_id, current_as_of)
+        history = self._beliefs.get((event_id, entity_id))
+        if current is None or not history:
+            return None
+        index = bisect.bisect_left(history, current.as_of, key=lambda b: b.as_of)
+        return history[index - 1] if index > 0 else None
+
+    def get_belief_history(self, event_id: str, entity_id: str, limit: int = 20) -> List[dict]:
+        history = self._beliefs.get((event_id, entity_id), [])
+        return [
+            {
+                "belief_id": b.belief_id,
+                "probability": b.probability,
+                "confidence": b.confidence,
+                "as_of": b.as_of,
+            }
+            for b in history[:limit]
+        ]
+
+    def get_belief_lineage(self, event_id: str, entity_id: str, max_depth: Optional[int] = None) -> List[dict]:
+        history = self._beliefs.get((event_id, entity_id))
+        if not history:
+            return []
+        # One extra hop is walked so the deepest returned hop still gets a delta
+        hops = [history[-1]]
+        while max_depth is None or len(hops) <= max_depth + 1:
+            previous = self._belief_index.get(hops[-1].previous_belief_id)
+            if (
+                previous is None
+                or (previous.event_id, previous.entity_id) != (event_id, entity_id)
+                or previous.as_of >= hops[-1].as_of
+            ):
+                break
+            hops.append(previous)
+
+        proposals = self._proposals.get((event_id, entity_id), [])
+        lineage = []
+        for depth, belief in enumerate(hops[: None if max_depth is None else max_depth + 1]):
+            latest_per_agent = {}
+            for proposal in reversed(proposals[: bisect.bisect_right(proposals, belief.as_of, key=lambda p: p.created_at)]):
+                latest_per_agent.setdefault(proposal.agent_id, proposal)
+            lineage.append({
+                "belief_id": belief.belief_id,
+                "probability": belief.probability,
+                "confidence": belief.confidence,
+                "as_of": belief.as_of,
+                "previous_belief_id": belief.previous_belief_id,
+                "depth": depth,
+                "delta": belief.probability - hops[depth + 1].probability if depth + 1 < len(hops) else None,
+                "proposals": [
+                    {
+                        "proposal_id": p.proposal_id,
+                        "agent_id": p.agent_id,
+                        "proposed_probability": p.proposed_probability,
+                        "rationale": p.rationale,
+                        "created_at": p.created_at,
+                    }
+                    for _, p in sorted(latest_per_agent.items())
+                ],
+            })
+        return lineage
+
+    def insert_belief_snapshot(self, belief: BeliefSnapshot):
+        with self._lock:
+            history = self._beliefs[(belief.event_id, belief.entity_id)]
+            if not history:
+                bisect.insort(self._entities[belief.event_id], belief.entity_id)
+            bisect.insort_right(history, belief, key=lambda b: b.as_of)
+            self._belief_index[belief.belief_id] = belief
+
+            # Same rule as the Postgres trend state: older beliefs do not move it
+            trend = self._trends[belief.event_id].get(belief.entity_id)
+            if trend is None or belief.as_of >= trend.as_of:
+                self._trends[belief.event_id][belief.entity_id] = update_trend(trend, belief)
+
+    def append_belief(
+        self,
+        belief: BeliefSnapshot,
+        proposals: List[ForecastProposal],
+        fence: Optional[Callable[[], None]] = None,
+    ) -> BeliefSnapshot:
+        with self._lock:
+            if fence is not None:
+                fence()
+            latest = self.get_latest_belief(belief.event_id, belief.entity_id)
+            for proposal in proposals:
+                self.insert_proposal(proposal)
+            belief = belief.model_copy(update={"previous_belief_id": latest.belief_id if latest is not None else None})
+            self.insert_belief_snapshot(belief)
+            return belief
+
+    def get_entities_with_beliefs(self, event_id: str) -> List[str]:
+        return list(self._entities.get(event_id, []))
+
+    def get_trends(self, event_id: str) -> Dict[str, BeliefTrend]:
+        return dict(self._trends.get(event_id, {}))
+
+    def get_portfolio_summary(self, event_id: str, recent_days: int = 7) -> dict:
+        since = recent_since(recent_days)
+        rows = []
+        for entity_id in self._entities.get(event_id, []):
+            history = self._beliefs[(event_id, entity_id)]
+            current = history[-1]
+            delta = current.probability - history[-2].probability if len(history) > 1 else None
+            recent = current.as_of.date() >= since
+            move = classify_move(delta) if recent else None
+            rows.append((
+                classify_risk(current.probability),
+                current.confidence,
+                1,
+                current.probability,
+                int(recent),
+                int(move == "drop"),
+                int(move == "rise"),
+            ))
+        return summarize_rollups(event_id, recent_days, rows)
+
+    def insert_proposal(self, proposal: ForecastProposal):
+        with self._lock:
+            bisect.insort_right(
+                self._proposals[(proposal.event_id, proposal.entity_id)],
+                proposal,
+                key=lambda p: p.created_at,
+            )
+
+    def get_proposals(self, event_id: str, entity_id: str) -> List[ForecastProposal]:
+        return list(reversed(self._proposals.get((event_id, entity_id), [])))
+
+    def insert_signal(self, signal: Signal):
+        with self._lock:
+            bisect.insort_right(
+                self._signals[signal.entity_id][signal.signal_type],
+                signal,
+                key=lambda s: s.timestamp,
+            )
+
+    def get_latest_signals(self, entity_ids: List[str], signal_types: Optional[List[str]] = None) -> Dict[str, List[Signal]]:
+        signals_by_entity = {}
+        for entity_id in entity_ids:
+            by_type = self._signals.get(entity_id)
+            if not by_type:
+                continue
+            latest = [
+                history[-1]
+                for signal_type, history in sorted(by_type.items())
+                if history and (signal_types is None or signal_type in signal_types)
+            ]
+            if latest:
+                signals_by_entity[entity_id] = latest
+        return signals_by_entity
+
+    def get_entities_with_signals(self, until: Optional[datetime] = None) -> List[str]:
+        # Histories are sorted, so the first signal is the earliest
+        return sorted(
+            entity_id
+            for entity_id, by_type in self._signals.items()
+            if any(history and (until is None or history[0].timestamp < until) for history in by_type.values())
+        )
+
+    def iter_signal_history(self, entity_ids: List[str], until: Optional[datetime] = None) -> Iterator[Signal]:
+        for entity_id in sorted(set(entity_ids)):
+            signals = [
+                signal
+                for history in self._signals.get(entity_id, {}).values()
+                for signal in history
+                if until is None or signal.timestamp < until
+            ]
+            yield from sorted(signals, key=lambda s: (s.timestamp, s.signal_id))
+
+    def get_signal_frame(self, entity_ids: List[str], signal_types: List[str]) -> Dict[str, "np.ndarray"]:
+        import numpy as np
+
+        columns = list(signal_types) + [flag_column(signal_type) for signal_type in signal_types]
+        frame = {column: np.full(len(entity_ids), np.nan) for column in columns}
+        for row, entity_id in enumerate(entity_ids):
+            by_type = self._signals.get(entity_id, {})
+            for signal_type in signal_types:
+                history = by_type.get(signal_type)
+                if not history:
+                    continue
+                value = history[-1].value
+                if isinstance(value, bool):
+                    frame[signal_type][row] = frame[flag_column(signal_type)][row] = 1.0 if value else 0.0
+                elif isinstance(value, (int, float)):
+                    frame[signal_type][row] = value
+        return frame
+
+    def start_replay(
+        self, replay_id: str, agent_version: str, since: Optional[datetime], until: Optional[datetime], entity_count: int
+    ):
+        with self._lock:
+            self._replays[replay_id] = {
+                "agent_version": agent_version,
+                "since": since,
+                "until": until,
+                "entity_count": entity_count,
+                "snapshot_count": None,
+                "finished_at": None,
+            }
+
+    def finish_replay(self, replay_id: str, snapshot_count: int):
+        with self._lock:
+            self._replays[replay_id].update(snapshot_count=snapshot_count, finished_at=datetime.utcnow())
+
+    def insert_shadow_beliefs(self, replay_id: str, agent_version: str, beliefs: List[BeliefSnapshot]):
+        with self._lock:
+            self._shadow_beliefs[replay_id].extend(beliefs)
+
+    def diff_replay(self, replay_id: str, event_id: str) -> List[dict]:
+        shadows_by_entity: Dict[str, List[BeliefSnapshot]] = defaultdict(list)
+        for belief in self._shadow_beliefs.get(replay_id, []):
+            if belief.event_id == event_id:
+                shadows_by_entity[belief.entity_id].append(belief)
+
+        rows = []
+        for entity_id, shadows in shadows_by_entity.items():
+            history = self._beliefs.get((event_id, entity_id), [])
+            deltas = []
+            for shadow in shadows:
+                # Production belief current at the shadow's as_of
+                index = bisect.bisect_right(history, shadow.as_of, key=lambda b: b.as_of)
+                if index:
+                    deltas.append(abs(shadow.probability - history[index - 1].probability))
+            rows.append({
+                "entity_id": entity_id,
+                "shadow_snapshots": len(shadows),
+                "compared_snapshots": len(deltas),
+                "mean_abs_delta": sum(deltas) / len(deltas) if deltas else None,
+                "max_abs_delta": max(deltas) if deltas else None,
+                "shadow_probability": max(shadows, key=lambda b: b.as_of).probability,
+                "production_probability": history[-1].probability if history else None,
+            })
+        rows.sort(key=lambda row: (row["max_abs_delta"] is None, -(row["max_abs_delta"] or 0.0), row["entity_id"]))
+        return rows
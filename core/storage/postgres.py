@@ -0,0 +1,88 @@
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional
+
+from core import belief_store, portfolio_store, proposal_store, replay_store, rollup_store, signal_store, trend_store
+from core.beliefs import BeliefSnapshot
+from core.proposals import ForecastProposal
+from core.signals import Signal
+from core.storage.base import StorageBackend
+from core.trends import BeliefTrend
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class PostgresStorage(StorageBackend):
+    """StorageBackend over the Postgres store modules."""
+
+    def get_latest_belief(self, event_id: str, entity_id: str) -> Optional[BeliefSnapshot]:
+        return belief_store.get_latest_belief(event_id, entity_id)
+
+    def get_belief(self, belief_id: str, as_of: datetime) -> Optional[BeliefSnapshot]:
+        return belief_store.get_belief(belief_id, as_of)
+
+    def get_previous_belief(
+        self, event_id: str, entity_id: str, current_belief_id: str, current_as_of: datetime
+    ) -> Optional[BeliefSnapshot]:
+        return portfolio_store.get_previous_belief(event_id, entity_id, current_belief_id, current_as_of)
+
+    def get_belief_history(self, event_id: str, entity_id: str, limit: int = 20) -> List[dict]:
+        return belief_store.get_belief_history(event_id, entity_id, limit)
+
+    def get_belief_lineage(self, event_id: str, entity_id: str, max_depth: Optional[int] = None) -> List[dict]:
+        return belief_store.get_belief_lineage(event_id, entity_id, max_depth)
+
+    def insert_belief_snapshot(self, belief: BeliefSnapshot):
+        belief_store.insert_belief_snapshot(belief)
+
+    def append_belief(
+        self,
+        belief: BeliefSnapshot,
+        proposals: List[ForecastProposal],
+        fence: Optional[Callable[[], None]] = None,
+    ) -> BeliefSnapshot:
+        return belief_store.append_belief(belief, proposals, fence)
+
+    def get_entities_with_beliefs(self, event_id: str) -> List[str]:
+        return portfolio_store.get_entities_with_beliefs(event_id)
+
+    def get_trends(self, event_id: str) -> Dict[str, BeliefTrend]:
+        return trend_store.get_trends(event_id)
+
+    def get_portfolio_summary(self, event_id: str, recent_days: int = 7) -> dict:
+        return rollup_store.get_portfolio_summary(event_id, recent_days)
+
+    def insert_proposal(self, proposal: ForecastProposal):
+        proposal_store.insert_proposal(proposal)
+
+    def get_proposals(self, event_id: str, entity_id: str) -> List[ForecastProposal]:
+        return proposal_store.get_proposals(event_id, entity_id)
+
+    def insert_signal(self, signal: Signal):
+        signal_store.insert_signal(signal)
+
+    def get_latest_signals(self, entity_ids: List[str], signal_types: Optional[List[str]] = None) -> Dict[str, List[Signal]]:
+        return signal_store.get_latest_signals(entity_ids, signal_types)
+
+    def get_entities_with_signals(self, until: Optional[datetime] = None) -> List[str]:
+        return signal_store.get_entities_with_signals(until)
+
+    def iter_signal_history(self, entity_ids: List[str], until: Optional[datetime] = None) -> Iterator[Signal]:
+        return signal_store.iter_signal_history(entity_ids, until)
+
+    def get_signal_frame(self, entity_ids: List[str], signal_types: List[str]) -> Dict[str, "np.ndarray"]:
+        return signal_store.get_signal_frame(entity_ids, signal_types)
+
+    def start_replay(
+        self, replay_id: str, agent_version: str, since: Optional[datetime], until: Optional[datetime], entity_count: int
+    ):
+        replay_store.start_replay(replay_id, agent_version, since, until, entity_count)
+
+    def finish_replay(self, replay_id: str, snapshot_count: int):
+        replay_store.finish_replay(replay_id, snapshot_count)
+
+    def insert_shadow_beliefs(self, replay_id: str, agent_version: str, beliefs: List[BeliefSnapshot]):
+        replay_store.insert_shadow_beliefs(replay_id, agent_version, beliefs)
+
+    def diff_replay(self, replay_id: str, event_id: str) -> List[dict]:
+        return replay_store.diff_replay(replay_id, event_id)
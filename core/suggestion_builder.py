@@ -19,6 +19,9 @@ def build_suggestions(alerts: List[AlertCandidate]) -> List[DecisionSuggestion]:
     for alert in alerts:
         # Generate 2-3 suggestions based on alert properties
         alert_suggestions = _generate_suggestions_for_alert(alert)
+        for suggestion in alert_suggestions:
+            suggestion.belief_id = alert.belief_id
+            suggestion.change_type = alert.change_type
         suggestions.extend(alert_suggestions)
     
     return suggestions
@@ -60,6 +63,26 @@ def _generate_suggestions_for_alert(alert: AlertCandidate) -> List[DecisionSugge
                 )
             )
     
+    elif alert.change_type == "sustained_decline":
+        suggestions.append(
+            DecisionSuggestion(
+                entity_id=alert.entity_id,
+                event_id=alert.event_id,
+                suggestion="Review the signals behind the gradual decline before it compounds",
+                reason=f"Alert: {alert.reason} - Probability has fallen steadily to {prob_pct}",
+                as_of=alert.as_of,
+            )
+        )
+        suggestions.append(
+            DecisionSuggestion(
+                entity_id=alert.entity_id,
+                event_id=alert.event_id,
+                suggestion="Schedule a check-in with the founders on runway and fundraising plans",
+                reason=f"Alert: {alert.reason} - Multi-step decline detected",
+                as_of=alert.as_of,
+            )
+        )
+    
     elif alert.change_type == "significant_rise":
         suggestions.append(
             DecisionSuggestion(
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
 
 
 @dataclass
@@ -10,4 +11,6 @@ class DecisionSuggestion:
     suggestion: str
     reason: str
     as_of: datetime
+    belief_id: Optional[str] = None  # belief the suggestion was derived from
+    change_type: Optional[str] = None  # change_type of the originating alert
 
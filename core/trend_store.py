@@ -0,0 +1,189 @@
+import json
+import uuid
+from itertools import groupby
+from typing import Dict, List, Optional
+
+from psycopg2.extras import execute_values
+
+from core.beliefs import BeliefSnapshot
+from core.db import get_connection, get_read_connection
+from core.trends import BeliefTrend, compute_trends, update_trend
+
+_TREND_COLUMNS = """
+    event_id, entity_id, belief_id, probability, ewma, ewm_variance, slope,
+    recent_probabilities, snapshot_count, as_of
+"""
+
+DEFAULT_BACKFILL_CHUNK_ENTITIES = 1000
+_BACKFILL_FETCH_SIZE = 10000
+
+
+def get_trends(event_id: str) -> Dict[str, BeliefTrend]:
+    """Get trend state for every entity of an event.
+    
+    Args:
+        event_id: The event identifier
+        
+    Returns:
+        Dict mapping entity_id to BeliefTrend
+    """
+    conn = get_read_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                SELECT {_TREND_COLUMNS}
+                FROM belief_trends
+                WHERE event_id = %s
+                """,
+                (event_id,),
+            )
+            return {row[1]: _row_to_trend(row) for row in cur.fetchall()}
+    finally:
+        conn.close()
+
+
+def apply_belief_to_trend(cur, belief: BeliefSnapshot) -> Optional[BeliefTrend]:
+    """Fold a newly inserted belief into its trend row inside the caller's transaction.
+    
+    Beliefs older than the stored state are ignored; backfill_trends repairs
+    state after out-of-order or historical inserts.
+    
+    Args:
+        cur: Open cursor of the transaction that inserted the belief
+        belief: The inserted BeliefSnapshot
+        
+    Returns:
+        The updated BeliefTrend, or None if the belief was older than the state
+    """
+    cur.execute(
+        f"""
+        SELECT {_TREND_COLUMNS}
+        FROM belief_trends
+        WHERE event_id = %s AND entity_id = %s
+        FOR UPDATE
+        """,
+        (belief.event_id, belief.entity_id),
+    )
+    row = cur.fetchone()
+    current = _row_to_trend(row) if row is not None else None
+    if current is not None and belief.as_of < current.as_of:
+        return None
+    
+    trend = update_trend(current, belief)
+    _upsert_trend(cur, trend)
+    return trend
+
+
+def backfill_trends(event_id: Optional[str] = None, chunk_entities: int = DEFAULT_BACKFILL_CHUNK_ENTITIES) -> int:
+    """Recompute trend state from the full snapshot history.
+    
+    Snapshots are streamed in (event, entity, as_of) order through a
+    server-side cursor. Every chunk_entities histories are folded with
+    compute_trends and written in one batch and transaction, so memory use
+    is bounded by the chunk, not the table.
+    
+    Args:
+        event_id: Restrict the backfill to one event (default: all events)
+        chunk_entities: (event, entity) histories per write batch
+    
+    Returns:
+        Number of trend rows written
+    """
+    read_conn = get_connection()
+    write_conn = get_connection()
+    written = 0
+    try:
+        # Named cursor = server-side cursor, fetched in batches
+        with read_conn.cursor(name=f"backfill_trends_{uuid.uuid4().hex}") as cur:
+            cur.itersize = _BACKFILL_FETCH_SIZE
+            cur.execute(
+                """
+                SELECT event_id, entity_id, belief_id, probability, as_of
+                FROM belief_snapshots
+                WHERE %s::text IS NULL OR event_id = %s
+                ORDER BY event_id, entity_id, as_of
+                """,
+                (event_id, event_id),
+            )
+            chunk: List[tuple] = []
+            entities = 0
+            for _, history in groupby(cur, key=lambda row: (row[0], row[1])):
+                chunk.extend(history)
+                entities += 1
+                if entities >= chunk_entities:
+                    written += _write_backfill_chunk(write_conn, chunk)
+                    chunk, entities = [], 0
+            written += _write_backfill_chunk(write_conn, chunk)
+        return written
+    finally:
+        read_conn.close()
+        write_conn.close()
+
+
+def _write_backfill_chunk(conn, rows: List[tuple]) -> int:
+    import pandas as pd
+
+    if not rows:
+        return 0
+    trends = compute_trends(pd.DataFrame(rows, columns=["event_id", "entity_id", "belief_id", "probability", "as_of"]))
+    with conn.cursor() as cur:
+        _upsert_trends(cur, trends)
+    conn.commit()
+    return len(trends)
+
+
+def _upsert_trend(cur, trend: BeliefTrend):
+    _upsert_trends(cur, [trend])
+
+
+def _upsert_trends(cur, trends: List[BeliefTrend]):
+    execute_values(
+        cur,
+        f"""
+        INSERT INTO belief_trends ({_TREND_COLUMNS})
+        VALUES %s
+        ON CONFLICT (event_id, entity_id) DO UPDATE SET
+            belief_id = EXCLUDED.belief_id,
+            probability = EXCLUDED.probability,
+            ewma = EXCLUDED.ewma,
+            ewm_variance = EXCLUDED.ewm_variance,
+            slope = EXCLUDED.slope,
+            recent_probabilities = EXCLUDED.recent_probabilities,
+            snapshot_count = EXCLUDED.snapshot_count,
+            as_of = EXCLUDED.as_of,
+            updated_at = now()
+        """,
+        [
+            (
+                trend.event_id,
+                trend.entity_id,
+                trend.belief_id,
+                trend.probability,
+                trend.ewma,
+                trend.ewm_variance,
+                trend.slope,
+                json.dumps(trend.recent_probabilities),
+                trend.snapshot_count,
+                trend.as_of,
+            )
+            for trend in trends
+        ],
+        template="(%s, %s, %s, %s, %s, %s, %s, %s::jsonb, %s, %s)",
+        page_size=len(trends) or 1,
+    )
+
+
+def _row_to_trend(row) -> BeliefTrend:
+    return BeliefTrend(
+        event_id=row[0],
+        entity_id=row[1],
+        belief_id=row[2],
+        probability=row[3],
+        ewma=row[4],
+        ewm_variance=row[5],
+        slope=row[6],
+        recent_probabilities=row[7],
+        snapshot_count=row[8],
+        as_of=row[9],
+    )
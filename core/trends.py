@@ -0,0 +1,172 @@
+import math
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from core.beliefs import BeliefSnapshot
+
+TREND_ALPHA = 0.3
+TREND_WINDOW = 5
+SUSTAINED_DECLINE_THRESHOLD = 0.1
+HIGH_VOLATILITY_THRESHOLD = 0.1
+
+
+class BeliefTrend(BaseModel):
+    event_id: str
+    entity_id: str
+    belief_id: str  # latest belief folded into this state
+    probability: float = Field(ge=0, le=1)
+    ewma: float
+    ewm_variance: float = Field(ge=0)
+    slope: float  # least-squares probability change per snapshot over the window
+    recent_probabilities: List[float]  # oldest first, at most TREND_WINDOW values
+    snapshot_count: int
+    as_of: datetime
+
+    @property
+    def volatility(self) -> float:
+        return math.sqrt(self.ewm_variance)
+
+
+def update_trend(trend: Optional[BeliefTrend], belief: BeliefSnapshot) -> BeliefTrend:
+    """Fold one new belief into the trend state in O(1).
+    
+    Args:
+        trend: Current trend state, or None for the first belief of an entity
+        belief: The newly written BeliefSnapshot
+        
+    Returns:
+        The updated BeliefTrend
+    """
+    if trend is None:
+        return BeliefTrend(
+            event_id=belief.event_id,
+            entity_id=belief.entity_id,
+            belief_id=belief.belief_id,
+            probability=belief.probability,
+            ewma=belief.probability,
+            ewm_variance=0.0,
+            slope=0.0,
+            recent_probabilities=[belief.probability],
+            snapshot_count=1,
+            as_of=belief.as_of,
+        )
+    
+    # Exponentially weighted mean and (biased) variance, matching
+    # pandas ewm(alpha=TREND_ALPHA, adjust=False).mean() / .var(bias=True)
+    diff = belief.probability - trend.ewma
+    ewma = trend.ewma + TREND_ALPHA * diff
+    ewm_variance = (1 - TREND_ALPHA) * (trend.ewm_variance + TREND_ALPHA * diff * diff)
+    
+    recent_probabilities = (trend.recent_probabilities + [belief.probability])[-TREND_WINDOW:]
+    
+    return BeliefTrend(
+        event_id=belief.event_id,
+        entity_id=belief.entity_id,
+        belief_id=belief.belief_id,
+        probability=belief.probability,
+        ewma=ewma,
+        ewm_variance=ewm_variance,
+        slope=window_slope(recent_probabilities),
+        recent_probabilities=recent_probabilities,
+        snapshot_count=trend.snapshot_count + 1,
+        as_of=belief.as_of,
+    )
+
+
+def window_slope(probabilities: List[float]) -> float:
+    """Least-squares slope of probabilities against snapshot index."""
+    n = len(probabilities)
+    if n < 2:
+        return 0.0
+    sum_x = n * (n - 1) / 2
+    sum_xx = (n - 1) * n * (2 * n - 1) / 6
+    sum_y = sum(probabilities)
+    sum_xy = sum(i * p for i, p in enumerate(probabilities))
+    return (n * sum_xy - sum_x * sum_y) / (n * sum_xx - sum_x * sum_x)
+
+
+def is_sustained_decline(trend: BeliefTrend) -> bool:
+    """A full window that keeps falling and has lost at least the threshold overall."""
+    window = trend.recent_probabilities
+    return (
+        len(window) == TREND_WINDOW
+        and trend.slope < 0
+        and window[0] - window[-1] >= SUSTAINED_DECLINE_THRESHOLD
+    )
+
+
+def compute_trends(snapshots) -> List[BeliefTrend]:
+    """Compute trend state for every (event, entity) from full snapshot history.
+    
+    Vectorized equivalent of folding update_trend over each history in as_of order.
+    
+    Args:
+        snapshots: pandas DataFrame with event_id, entity_id, belief_id, probability, as_of
+        
+    Returns:
+        List of BeliefTrend objects, one per (event_id, entity_id)
+    """
+    import pandas as pd
+    
+    if snapshots.empty:
+        return []
+    
+    keys = ["event_id", "entity_id"]
+    frame = snapshots.sort_values(keys + ["as_of"], kind="mergesort").reset_index(drop=True)
+    grouped = frame.groupby(keys, sort=False)
+    
+    ewm = grouped["probability"].ewm(alpha=TREND_ALPHA, adjust=False)
+    ewma = ewm.mean().groupby(level=[0, 1], sort=False).last()
+    ewm_variance = ewm.var(bias=True).fillna(0.0).groupby(level=[0, 1], sort=False).last()
+    
+    last = grouped[["belief_id", "probability", "as_of"]].last()
+    counts = grouped.size()
+    
+    # Least-squares slope over the trailing window, from per-group sums
+    window = grouped.tail(TREND_WINDOW).copy()
+    window["x"] = window.groupby(keys, sort=False).cumcount()
+    window["xy"] = window["x"] * window["probability"]
+    window["xx"] = window["x"] * window["x"]
+    sums = window.groupby(keys, sort=False).agg(
+        n=("x", "size"),
+        sum_x=("x", "sum"),
+        sum_y=("probability", "sum"),
+        sum_xy=("xy", "sum"),
+        sum_xx=("xx", "sum"),
+    )
+    denominator = sums["n"] * sums["sum_xx"] - sums["sum_x"] ** 2
+    slope = ((sums["n"] * sums["sum_xy"] - sums["sum_x"] * sums["sum_y"]) / denominator).where(
+        denominator != 0, 0.0
+    )
+    recent = window.groupby(keys, sort=False)["probability"].agg(list)
+    
+    result = pd.DataFrame(
+        {
+            "belief_id": last["belief_id"],
+            "probability": last["probability"],
+            "as_of": last["as_of"],
+            "snapshot_count": counts,
+            "ewma": ewma,
+            "ewm_variance": ewm_variance.clip(lower=0.0),
+            "slope": slope,
+            "recent_probabilities": recent,
+        }
+    )
+    
+    return [
+        BeliefTrend(
+            event_id=event_id,
+            entity_id=entity_id,
+            belief_id=row.belief_id,
+            probability=row.probability,
+            ewma=row.ewma,
+            ewm_variance=row.ewm_variance,
+            slope=row.slope,
+            recent_probabilities=row.recent_probabilities,
+            snapshot_count=row.snapshot_count,
+            as_of=row.as_of.to_pydatetime() if hasattr(row.as_of, "to_pydatetime") else row.as_of,
+        )
+        for (event_id, entity_id), row in result.iterrows()
+    ]
@@ -0,0 +1,98 @@
+-- Range-partition belief_snapshots and forecast_proposals by month.
+--
+-- Partitioned tables need the partition key in every unique constraint, so the
+-- primary keys become (belief_id, as_of) and (proposal_id, created_at).
+-- Monthly partitions are created for the existing data range plus three months
+-- ahead; core.retention.ensure_partitions keeps creating them going forward.
+-- A DEFAULT partition catches rows that arrive before their month exists.
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION ensure_monthly_partition(parent TEXT, month_start DATE)
+RETURNS TEXT AS $$
+DECLARE
+    start_date DATE := date_trunc('month', month_start)::date;
+    end_date DATE := (date_trunc('month', month_start) + interval '1 month')::date;
+    partition_name TEXT := format('%s_%s', parent, to_char(start_date, 'YYYY_MM'));
+BEGIN
+    IF to_regclass(partition_name) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+            partition_name, parent, start_date, end_date
+        );
+    END IF;
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- belief_snapshots
+
+ALTER TABLE belief_snapshots RENAME TO belief_snapshots_unpartitioned;
+ALTER TABLE belief_snapshots_unpartitioned RENAME CONSTRAINT belief_snapshots_pkey TO belief_snapshots_unpartitioned_pkey;
+ALTER INDEX idx_belief_snapshots_event_entity_as_of RENAME TO idx_belief_snapshots_unpartitioned_event_entity_as_of;
+
+CREATE TABLE belief_snapshots (
+    belief_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    probability FLOAT NOT NULL,
+    confidence TEXT NOT NULL,
+    confidence_interval JSONB,
+    as_of TIMESTAMP NOT NULL,
+    previous_belief_id TEXT NULL,
+    created_at TIMESTAMP DEFAULT now(),
+    PRIMARY KEY (belief_id, as_of)
+) PARTITION BY RANGE (as_of);
+
+CREATE TABLE belief_snapshots_default PARTITION OF belief_snapshots DEFAULT;
+
+SELECT ensure_monthly_partition('belief_snapshots', m::date)
+FROM generate_series(
+    date_trunc('month', LEAST(now(), COALESCE((SELECT min(as_of) FROM belief_snapshots_unpartitioned), now()))),
+    date_trunc('month', GREATEST(now(), COALESCE((SELECT max(as_of) FROM belief_snapshots_unpartitioned), now()))) + interval '3 months',
+    interval '1 month'
+) AS m;
+
+INSERT INTO belief_snapshots (belief_id, event_id, entity_id, probability, confidence, confidence_interval, as_of, previous_belief_id, created_at)
+SELECT belief_id, event_id, entity_id, probability, confidence, confidence_interval, as_of, previous_belief_id, created_at
+FROM belief_snapshots_unpartitioned;
+
+CREATE INDEX idx_belief_snapshots_event_entity_as_of ON belief_snapshots (event_id, entity_id, as_of);
+
+DROP TABLE belief_snapshots_unpartitioned;
+
+-- forecast_proposals
+
+ALTER TABLE forecast_proposals RENAME TO forecast_proposals_unpartitioned;
+ALTER TABLE forecast_proposals_unpartitioned RENAME CONSTRAINT forecast_proposals_pkey TO forecast_proposals_unpartitioned_pkey;
+ALTER INDEX idx_forecast_proposals_event_entity RENAME TO idx_forecast_proposals_unpartitioned_event_entity;
+
+CREATE TABLE forecast_proposals (
+    proposal_id TEXT NOT NULL,
+    agent_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    proposed_probability FLOAT NOT NULL,
+    rationale TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (proposal_id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE forecast_proposals_default PARTITION OF forecast_proposals DEFAULT;
+
+SELECT ensure_monthly_partition('forecast_proposals', m::date)
+FROM generate_series(
+    date_trunc('month', LEAST(now(), COALESCE((SELECT min(created_at) FROM forecast_proposals_unpartitioned), now()))),
+    date_trunc('month', GREATEST(now(), COALESCE((SELECT max(created_at) FROM forecast_proposals_unpartitioned), now()))) + interval '3 months',
+    interval '1 month'
+) AS m;
+
+INSERT INTO forecast_proposals (proposal_id, agent_id, event_id, entity_id, proposed_probability, rationale, created_at)
+SELECT proposal_id, agent_id, event_id, entity_id, proposed_probability, rationale, COALESCE(created_at, now())
+FROM forecast_proposals_unpartitioned;
+
+CREATE INDEX idx_forecast_proposals_event_entity ON forecast_proposals (event_id, entity_id, created_at);
+
+DROP TABLE forecast_proposals_unpartitioned;
+
+COMMIT;
@@ -0,0 +1,18 @@
+-- Incremental per-(event, entity) trend state, updated on every belief write.
+
+CREATE TABLE belief_trends (
+    event_id TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    belief_id TEXT NOT NULL,
+    probability FLOAT NOT NULL,
+    ewma FLOAT NOT NULL,
+    ewm_variance FLOAT NOT NULL,
+    slope FLOAT NOT NULL,
+    recent_probabilities JSONB NOT NULL,
+    snapshot_count INTEGER NOT NULL,
+    as_of TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP DEFAULT now(),
+    PRIMARY KEY (event_id, entity_id)
+);
+
+CREATE INDEX idx_belief_trends_event_slope ON belief_trends (event_id, slope);
@@ -0,0 +1,32 @@
+-- Shadow belief history produced by replaying signals under a given agent version.
+-- Kept apart from belief_snapshots so replays never touch production beliefs.
+
+CREATE TABLE replay_runs (
+    replay_id TEXT PRIMARY KEY,
+    agent_version TEXT NOT NULL,
+    since TIMESTAMP NULL,
+    until TIMESTAMP NULL,
+    entity_count INTEGER,
+    snapshot_count INTEGER,
+    started_at TIMESTAMP DEFAULT now(),
+    finished_at TIMESTAMP NULL
+);
+
+CREATE TABLE shadow_belief_snapshots (
+    replay_id TEXT NOT NULL REFERENCES replay_runs (replay_id) ON DELETE CASCADE,
+    agent_version TEXT NOT NULL,
+    belief_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    probability FLOAT NOT NULL,
+    confidence TEXT NOT NULL,
+    as_of TIMESTAMP NOT NULL,
+    previous_belief_id TEXT NULL,
+    created_at TIMESTAMP DEFAULT now(),
+    PRIMARY KEY (replay_id, belief_id)
+);
+
+CREATE INDEX idx_shadow_belief_snapshots_replay_event_entity_as_of
+    ON shadow_belief_snapshots (replay_id, event_id, entity_id, as_of);
+
+CREATE INDEX idx_signals_entity_timestamp ON signals (entity_id, timestamp);
@@ -0,0 +1,13 @@
+-- Shard leases for the distributed refresh scheduler (core.refresh_scheduler).
+-- Workers claim expired shards with FOR UPDATE SKIP LOCKED, so each shard of
+-- the portfolio has at most one live owner at a time.
+
+CREATE TABLE refresh_leases (
+    event_id TEXT NOT NULL,
+    shard_id INTEGER NOT NULL,
+    shard_count INTEGER NOT NULL,
+    owner TEXT NULL,
+    leased_until TIMESTAMP NULL,
+    last_refreshed_at TIMESTAMP NULL,
+    PRIMARY KEY (event_id, shard_id)
+);
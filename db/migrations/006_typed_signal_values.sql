@@ -0,0 +1,60 @@
+-- Typed signal value columns.
+--
+-- Scalar JSONB values are split into value_num / value_bool / value_text on
+-- insert and the JSONB copy is dropped; only composite values (objects,
+-- arrays, JSON null) stay in value. Existing rows are converted by
+-- core.signal_store.backfill_typed_values in chunks after this migration.
+
+BEGIN;
+
+ALTER TABLE signals
+    ADD COLUMN value_num DOUBLE PRECISION,
+    ADD COLUMN value_bool BOOLEAN,
+    ADD COLUMN value_text TEXT,
+    ALTER COLUMN value DROP NOT NULL;
+
+CREATE OR REPLACE FUNCTION signals_split_typed_value()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.value IS NOT NULL THEN
+        -- An update may change the value's type; only one column may stay set
+        NEW.value_num := NULL;
+        NEW.value_bool := NULL;
+        NEW.value_text := NULL;
+        CASE jsonb_typeof(NEW.value)
+            WHEN 'number' THEN
+                NEW.value_num := (NEW.value #>> '{}')::double precision;
+                NEW.value := NULL;
+            WHEN 'boolean' THEN
+                NEW.value_bool := (NEW.value #>> '{}')::boolean;
+                NEW.value := NULL;
+            WHEN 'string' THEN
+                NEW.value_text := NEW.value #>> '{}';
+                NEW.value := NULL;
+            ELSE
+                NULL;
+        END CASE;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_signals_split_typed_value
+    BEFORE INSERT OR UPDATE OF value ON signals
+    FOR EACH ROW EXECUTE FUNCTION signals_split_typed_value();
+
+ALTER TABLE signals
+    ADD CONSTRAINT signals_single_value CHECK (num_nonnulls(value, value_num, value_bool, value_text) = 1);
+
+-- Latest-per-type lookups and "no newer signal" checks; replaces the
+-- (entity_id, signal_type) index, which is its prefix
+CREATE INDEX idx_signals_entity_signal_type_timestamp ON signals (entity_id, signal_type, timestamp);
+DROP INDEX idx_signals_entity_signal_type;
+
+-- Per-signal-type partial indexes for portfolio-wide range and flag queries
+CREATE INDEX idx_signals_runway_months_value ON signals (value_num, entity_id) WHERE signal_type = 'runway_months';
+CREATE INDEX idx_signals_burn_rate_true ON signals (entity_id, timestamp) WHERE signal_type = 'burn_rate' AND value_bool;
+CREATE INDEX idx_signals_hiring_signal_true ON signals (entity_id, timestamp) WHERE signal_type = 'hiring_signal' AND value_bool;
+CREATE INDEX idx_signals_type_value_num ON signals (signal_type, value_num) WHERE value_num IS NOT NULL;
+
+COMMIT;
@@ -0,0 +1,18 @@
+-- Pre-aggregated portfolio rollups, maintained on every belief write.
+--
+-- Each entity's current (latest) belief contributes to exactly one row:
+-- its risk level, confidence and the day of its as_of. delta_sum and the
+-- drop / rise counts use the current belief's change against its predecessor.
+
+CREATE TABLE portfolio_rollups (
+    event_id TEXT NOT NULL,
+    risk_level TEXT NOT NULL,
+    confidence TEXT NOT NULL,
+    day DATE NOT NULL,
+    entity_count INTEGER NOT NULL DEFAULT 0,
+    probability_sum FLOAT NOT NULL DEFAULT 0,
+    delta_sum FLOAT NOT NULL DEFAULT 0,
+    drop_count INTEGER NOT NULL DEFAULT 0,
+    rise_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (event_id, risk_level, confidence, day)
+);
@@ -0,0 +1,24 @@
+-- Append-only log of what partners did with decision suggestions.
+-- belief_as_of is stored with belief_id so joins to the partitioned
+-- belief_snapshots table use its full primary key and prune to one partition.
+
+CREATE TABLE decisions (
+    decision_id TEXT PRIMARY KEY,
+    belief_id TEXT NOT NULL,
+    belief_as_of TIMESTAMP NOT NULL,
+    event_id TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    change_type TEXT NULL,
+    suggestion TEXT NOT NULL,
+    reason TEXT,
+    action TEXT NOT NULL,
+    decided_by TEXT NULL,
+    notes TEXT NULL,
+    decided_at TIMESTAMP NOT NULL,
+    created_at TIMESTAMP DEFAULT now()
+);
+
+CREATE INDEX idx_decisions_event_change_type_decided_at ON decisions (event_id, change_type, decided_at);
+CREATE INDEX idx_decisions_event_entity_decided_at ON decisions (event_id, entity_id, decided_at);
+CREATE INDEX idx_decisions_belief ON decisions (belief_id, belief_as_of);
+CREATE INDEX idx_decisions_decided_at_brin ON decisions USING brin (decided_at);
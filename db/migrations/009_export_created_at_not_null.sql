@@ -0,0 +1,14 @@
+-- created_at is the incremental export watermark (core.export). Rows with a
+-- NULL created_at never pass "created_at > watermark", so backfill them with
+-- the migration time (the next incremental export picks them up once) and
+-- forbid NULLs from now on. forecast_proposals.created_at is already NOT NULL.
+
+BEGIN;
+
+UPDATE belief_snapshots SET created_at = now() WHERE created_at IS NULL;
+ALTER TABLE belief_snapshots ALTER COLUMN created_at SET NOT NULL;
+
+UPDATE signals SET created_at = now() WHERE created_at IS NULL;
+ALTER TABLE signals ALTER COLUMN created_at SET NOT NULL;
+
+COMMIT;
@@ -0,0 +1,38 @@
+-- One row per entity with signals, kept by a statement trigger on signals.
+-- The refresh scheduler (core.refresh_scheduler) reads shard membership
+-- from it instead of a DISTINCT over every signal on each shard claim.
+
+BEGIN;
+
+CREATE TABLE signal_entities (
+    entity_id TEXT PRIMARY KEY,
+    -- Refresh shard of the entity is mod(shard_hash, shard_count)
+    shard_hash BIGINT GENERATED ALWAYS AS (hashtext(entity_id)::bigint + 2147483648) STORED,
+    first_signal_at TIMESTAMP NOT NULL
+);
+
+CREATE FUNCTION signals_track_entities() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO signal_entities (entity_id, first_signal_at)
+    SELECT entity_id, min(timestamp)
+    FROM new_signals
+    GROUP BY entity_id
+    ON CONFLICT (entity_id) DO UPDATE
+        SET first_signal_at = EXCLUDED.first_signal_at
+        WHERE EXCLUDED.first_signal_at < signal_entities.first_signal_at;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER signals_track_entities
+    AFTER INSERT ON signals
+    REFERENCING NEW TABLE AS new_signals
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION signals_track_entities();
+
+INSERT INTO signal_entities (entity_id, first_signal_at)
+SELECT entity_id, min(timestamp)
+FROM signals
+GROUP BY entity_id;
+
+COMMIT;
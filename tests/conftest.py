@@ -0,0 +1,14 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def postgres():
+    """Skip unless DII_TEST_POSTGRES is set.
+
+    Tests using this write to the database the DB_* variables point at, which
+    must be a scratch database with db/migrations applied.
+    """
+    if not os.environ.get("DII_TEST_POSTGRES"):
+        pytest.skip("set DII_TEST_POSTGRES=1 and DB_* to a scratch database to run Postgres tests")
@@ -0,0 +1,59 @@
+import pytest
+
+from core import db
+from core.db import PRIMARY, ReplicaPool, pin_replica
+
+
+class _FakePool:
+    def __init__(self, dsn, opened):
+        self.dsn = dsn
+        self.opened = opened
+
+    def get(self):
+        self.opened.append(self.dsn)
+        return self
+
+
+@pytest.fixture
+def replicas(monkeypatch):
+    opened = []
+    pool = ReplicaPool(["replica_a", "replica_b", "replica_c"])
+    pool._pools = {dsn: _FakePool(dsn, opened) for dsn in pool.dsns}
+    healthy = set(pool.dsns)
+    monkeypatch.setattr(pool, "is_healthy", lambda dsn: dsn in healthy)
+    monkeypatch.setattr(db, "get_replica_pool", lambda: pool)
+    monkeypatch.setattr(db, "get_connection", lambda: PRIMARY)
+    return pool, opened, healthy
+
+
+def test_reads_rotate_without_pin(replicas):
+    _, opened, _ = replicas
+    for _ in range(3):
+        db.get_read_connection()
+    assert opened == ["replica_a", "replica_b", "replica_c"]
+
+
+def test_pin_keeps_one_replica_per_context(replicas):
+    _, opened, healthy = replicas
+    with pin_replica():
+        for _ in range(3):
+            db.get_read_connection()
+    assert opened == ["replica_a"] * 3
+
+    with pin_replica():
+        db.get_read_connection()
+        healthy.discard("replica_b")
+        db.get_read_connection()
+        db.get_read_connection()
+    # Failover pins the next healthy replica
+    assert opened[3:] == ["replica_b", "replica_c", "replica_c"]
+
+
+def test_pin_stays_on_primary_after_fallback(replicas):
+    _, opened, healthy = replicas
+    with pin_replica():
+        healthy.clear()
+        assert db.get_read_connection() == PRIMARY
+        healthy.update(["replica_a", "replica_b", "replica_c"])
+        assert db.get_read_connection() == PRIMARY
+    assert opened == []
@@ -0,0 +1,143 @@
+import queue
+from datetime import datetime
+
+import psycopg2
+import pytest
+
+from core import decision_store
+from core.decision_store import DecisionLogWriter
+from core.decisions import Decision
+
+T0 = datetime(2024, 1, 1)
+
+
+def _decision(decision_id):
+    return Decision(
+        decision_id=decision_id,
+        belief_id="bel_1",
+        belief_as_of=T0,
+        event_id="evt_1",
+        entity_id="ent_1",
+        suggestion="Review runway",
+        action="accepted",
+        decided_at=T0,
+    )
+
+
+@pytest.fixture
+def writer():
+    # Never a full batch queued, so only the test's flush() calls write
+    writer = DecisionLogWriter(batch_size=100, flush_interval_seconds=3600, max_attempts=2)
+    yield writer
+    writer.close()
+
+
+def test_bad_row_is_isolated_and_set_aside(monkeypatch, writer):
+    written = []
+
+    def insert(decisions):
+        if any(d.decision_id == "bad" for d in decisions):
+            raise psycopg2.IntegrityError("bad row")
+        written.extend(d.decision_id for d in decisions)
+
+    monkeypatch.setattr(decision_store, "_insert_decisions", insert)
+    for decision_id in ["d1", "d2", "bad", "d3", "d4"]:
+        writer.append(_decision(decision_id))
+
+    assert writer.flush() == 4
+    assert sorted(written) == ["d1", "d2", "d3", "d4"]
+    assert writer.failed == []
+
+    # Retried once more, then set aside without blocking new decisions
+    writer.append(_decision("d5"))
+    assert writer.flush() == 1
+    assert [d.decision_id for d in writer.failed] == ["bad"]
+    assert writer.flush() == 0
+
+
+def _unavailable(decisions):
+    raise psycopg2.OperationalError("connection refused")
+
+
+def test_outage_keeps_rows_without_using_attempts(monkeypatch, writer):
+    monkeypatch.setattr(decision_store, "_insert_decisions", _unavailable)
+    for decision_id in ["d1", "d2", "d3", "d4", "d5"]:
+        writer.append(_decision(decision_id))
+    for _ in range(3):
+        assert writer.flush() == 0
+
+    written = []
+    monkeypatch.setattr(decision_store, "_insert_decisions", lambda ds: written.extend(d.decision_id for d in ds))
+    assert writer.flush() == 5
+    assert written == ["d1", "d2", "d3", "d4", "d5"]
+    assert writer.failed == []
+
+
+def test_outage_bounds_pending_decisions(monkeypatch):
+    writer = DecisionLogWriter(batch_size=100, flush_interval_seconds=3600, max_pending=3)
+    try:
+        monkeypatch.setattr(decision_store, "_insert_decisions", _unavailable)
+        for decision_id in ["d1", "d2", "d3"]:
+            writer.append(_decision(decision_id))
+        # Rows moved to the retry list during the outage still count
+        assert writer.flush() == 0
+        with pytest.raises(queue.Full):
+            writer.append(_decision("d4"))
+        assert writer.rejected == 1
+        assert writer.pending() == 3
+
+        written = []
+        monkeypatch.setattr(decision_store, "_insert_decisions", lambda ds: written.extend(d.decision_id for d in ds))
+        assert writer.flush() == 3
+        assert writer.pending() == 0
+        writer.append(_decision("d4"))
+        assert writer.flush() == 1
+        assert written == ["d1", "d2", "d3", "d4"]
+    finally:
+        writer.close()
+
+
+def test_outage_during_bisection_does_not_requeue_written_rows(monkeypatch, writer):
+    written = []
+
+    def insert(decisions):
+        ids = [d.decision_id for d in decisions]
+        if "bad" in ids:
+            raise psycopg2.IntegrityError("bad row")
+        if "d3" in ids:
+            raise psycopg2.OperationalError("connection lost")
+        written.extend(ids)
+
+    monkeypatch.setattr(decision_store, "_insert_decisions", insert)
+    for decision_id in ["d1", "bad", "d3", "d4"]:
+        writer.append(_decision(decision_id))
+
+    assert writer.flush() == 1
+    assert written == ["d1"]
+    assert writer.pending() == 3
+
+    monkeypatch.setattr(decision_store, "_insert_decisions", lambda ds: written.extend(d.decision_id for d in ds))
+    assert writer.flush() == 3
+    assert sorted(written) == ["bad", "d1", "d3", "d4"]
+    assert writer.pending() == 0
+
+
+def test_set_aside_decisions_are_capped(monkeypatch):
+    def reject(decisions):
+        raise psycopg2.IntegrityError("bad row")
+
+    writer = DecisionLogWriter(batch_size=100, flush_interval_seconds=3600, max_attempts=1, max_failed=2)
+    try:
+        monkeypatch.setattr(decision_store, "_insert_decisions", reject)
+        for decision_id in ["d1", "d2", "d3"]:
+            writer.append(_decision(decision_id))
+        assert writer.flush() == 0
+        assert [d.decision_id for d in writer.failed] == ["d2", "d3"]
+        assert writer.pending() == 0
+    finally:
+        writer.close()
+
+
+def test_unknown_action_is_rejected():
+    with pytest.raises(ValueError):
+        Decision(**{**_decision("d1").model_dump(), "action": "maybe"})
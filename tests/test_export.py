@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from core import export
+
+pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+T0 = datetime(2024, 1, 1, 12, 0, 0)
+
+
+class _FakeCursor:
+    """Serves proposal rows, applying the created_at lower bound of the export query."""
+
+    def __init__(self, table_rows):
+        self.table_rows = table_rows
+        self.itersize = None
+        self._rows = []
+
+    def execute(self, sql, params):
+        if params:
+            assert sql.rstrip().endswith("WHERE created_at > %s")
+            self._rows = [row for row in self.table_rows if row[6] > params[-1]]
+        else:
+            self._rows = list(self.table_rows)
+
+    def fetchmany(self, size):
+        chunk, self._rows = self._rows[:size], self._rows[size:]
+        return chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _FakeConnection:
+    def __init__(self, table_rows):
+        self.table_rows = table_rows
+
+    def cursor(self, name=None):
+        return _FakeCursor(self.table_rows)
+
+    def close(self):
+        pass
+
+
+def _proposal(proposal_id, created_at):
+    return (proposal_id, "agent", "evt", "ent", 0.5, "rationale", created_at)
+
+
+def _exported_ids(out_dir, entry):
+    return pq.read_table(out_dir / entry["file"]).column("proposal_id").to_pylist()
+
+
+def test_incremental_export_rereads_lag_window_without_duplicates(monkeypatch, tmp_path):
+    table_rows = [_proposal("p1", T0), _proposal("p2", T0 + timedelta(minutes=10))]
+    monkeypatch.setattr(export, "get_read_connection", lambda: _FakeConnection(table_rows))
+
+    def run():
+        # The first export is a full one; later ones start from the watermark
+        entry = export.export_table("forecast_proposals", str(tmp_path), incremental=True, chunk_size=1)
+        return _exported_ids(tmp_path, entry)
+
+    assert run() == ["p1", "p2"]
+
+    # p3 was created before the watermark but committed after the last export
+    table_rows.append(_proposal("p3", T0 + timedelta(minutes=8)))
+    table_rows.append(_proposal("p4", T0 + timedelta(minutes=11)))
+    assert run() == ["p3", "p4"]
+    assert run() == []
+
+    table_manifest = export.read_manifest(str(tmp_path))["tables"]["forecast_proposals"]
+    assert table_manifest["watermark"] == (T0 + timedelta(minutes=11)).isoformat()
+    # Only keys inside the lag window are kept for deduplication
+    assert sorted(table_manifest["recent_keys"]) == ["p2", "p3", "p4"]
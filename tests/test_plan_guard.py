@@ -0,0 +1,55 @@
+import json
+
+from core.plan_guard import DEFAULT_BASELINE, PLAN_MODES, SAMPLE_PARAMS, check_plans, seq_scans
+from core.queries import QUERIES
+
+
+def _load_baseline():
+    with open(DEFAULT_BASELINE) as f:
+        return json.load(f)
+
+
+def test_every_query_is_guarded():
+    assert set(SAMPLE_PARAMS) == set(QUERIES)
+    assert all(len(SAMPLE_PARAMS[name]) == len(query.param_types) for name, query in QUERIES.items())
+    assert all(query.tables for query in QUERIES.values())
+    baseline = _load_baseline()
+    assert set(baseline) == set(QUERIES)
+    assert all(set(modes) == set(PLAN_MODES) for modes in baseline.values())
+    assert all(cost is not None for modes in baseline.values() for cost in modes.values())
+
+
+def test_seq_scans_finds_guarded_partitions():
+    plan = {
+        "Node Type": "Limit",
+        "Plans": [
+            {
+                "Node Type": "Append",
+                "Plans": [
+                    {"Node Type": "Index Scan", "Relation Name": "belief_snapshots_2024_01"},
+                    {"Node Type": "Seq Scan", "Relation Name": "belief_snapshots_default"},
+                    {"Node Type": "Seq Scan", "Relation Name": "signals"},
+                ],
+            }
+        ],
+    }
+    assert seq_scans(plan, ["belief_snapshots"]) == ["belief_snapshots_default"]
+    assert seq_scans(plan, ["forecast_proposals"]) == []
+
+
+def test_registered_query_without_sample_params_fails(monkeypatch):
+    monkeypatch.delitem(SAMPLE_PARAMS, "latest_belief")
+    result = check_plans()
+    assert result["failures"] == ["No sample parameters for registered queries: latest_belief"]
+
+
+def test_plans_against_baseline(postgres):
+    result = check_plans(_load_baseline())
+    assert result["failures"] == []
+
+
+def test_missing_baseline_cost_fails(postgres):
+    baseline = _load_baseline()
+    baseline["latest_belief"]["generic"] = None
+    result = check_plans(baseline)
+    assert result["failures"] == ["latest_belief (generic plan): no baseline cost; record it with --write-baseline"]
@@ -0,0 +1,180 @@
+import multiprocessing
+import time
+import uuid
+from datetime import datetime
+
+import pytest
+
+from core import refresh_scheduler
+from core.agents.capital_markets import CapitalMarketsAgent
+from core.agents.rules import RuleAgent, rule_spec_from_dict
+from core.db import get_connection
+from core.refresh_scheduler import (
+    LeaseLost,
+    check_lease,
+    claim_shards,
+    ensure_shards,
+    make_owner_id,
+    refresh_entities,
+    refresh_entity,
+    renew_lease,
+    reshard,
+    run_refresh_cycle,
+)
+from core.signals import Signal
+from core.storage import create_storage
+
+T0 = datetime(2024, 1, 1)
+EVENT_ID = CapitalMarketsAgent().supported_events[0]
+
+
+def _signal(signal_id, entity_id, signal_type, value):
+    return Signal(signal_id=signal_id, entity_id=entity_id, signal_type=signal_type, value=value, timestamp=T0)
+
+
+def test_refresh_entities_on_memory_storage():
+    storage = create_storage("memory")
+    storage.insert_signal(_signal("s1", "ent_1", "runway_months", 4))
+    storage.insert_signal(_signal("s2", "ent_2", "burn_rate", True))
+    agents = [CapitalMarketsAgent()]
+
+    assert refresh_entities(EVENT_ID, agents, storage=storage) == {"entity_count": 2, "beliefs_written": 2}
+    assert refresh_entities(EVENT_ID, agents, storage=storage)["beliefs_written"] == 2
+
+    assert storage.get_entities_with_beliefs(EVENT_ID) == ["ent_1", "ent_2"]
+    latest = storage.get_latest_belief(EVENT_ID, "ent_1")
+    assert round(latest.probability, 2) == 0.45
+    previous = storage.get_previous_belief(EVENT_ID, "ent_1", latest.belief_id, latest.as_of)
+    assert latest.previous_belief_id == previous.belief_id
+    assert len(storage.get_proposals(EVENT_ID, "ent_1")) == 2
+
+
+def _rule_agent(event_id, signal_type):
+    return RuleAgent(
+        rule_spec_from_dict(
+            {
+                "agent_id": "refresh_test_agent",
+                "event_id": event_id,
+                "base_probability": 0.5,
+                "adjustments": [{"signal_type": signal_type, "op": "lt", "value": 6, "delta": -0.2, "reason": "low"}],
+            }
+        )
+    )
+
+
+@pytest.fixture
+def portfolio(postgres):
+    """A fresh event and 40 entities with a signal type no other test uses."""
+    event_id, signal_type = f"refresh_evt_{uuid.uuid4().hex[:8]}", f"refresh_sig_{uuid.uuid4().hex[:8]}"
+    storage = create_storage("postgres")
+    entity_ids = [f"refresh_ent_{uuid.uuid4().hex[:8]}_{i:02d}" for i in range(40)]
+    for i, entity_id in enumerate(entity_ids):
+        storage.insert_signal(_signal(f"{entity_id}_s", entity_id, signal_type, i % 10))
+    return event_id, _rule_agent(event_id, signal_type), entity_ids
+
+
+def _work(event_id, agent, shard_count):
+    owner = make_owner_id()
+    while True:
+        result = run_refresh_cycle(event_id, [agent], owner, shard_count=shard_count)
+        if not result["refreshed_shards"] and not result["lost_shards"]:
+            return
+
+
+def _run_workers(event_id, agent, shard_count, processes=3):
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_work, args=(event_id, agent, shard_count)) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=120)
+        assert worker.exitcode == 0
+
+
+def _beliefs(event_id):
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT entity_id, belief_id, previous_belief_id
+                FROM belief_snapshots
+                WHERE event_id = %s
+                ORDER BY entity_id, as_of
+                """,
+                (event_id,),
+            )
+            beliefs = {}
+            for entity_id, belief_id, previous_belief_id in cur.fetchall():
+                beliefs.setdefault(entity_id, []).append((belief_id, previous_belief_id))
+            return beliefs
+    finally:
+        conn.close()
+
+
+def _make_due(event_id):
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("UPDATE refresh_leases SET last_refreshed_at = NULL WHERE event_id = %s", (event_id,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_worker_processes_write_one_belief_per_entity_per_cycle(portfolio):
+    event_id, agent, entity_ids = portfolio
+    for cycle in range(1, 3):
+        if cycle > 1:
+            _make_due(event_id)
+        _run_workers(event_id, agent, shard_count=8)
+
+        beliefs = _beliefs(event_id)
+        assert sorted(beliefs) == sorted(entity_ids)
+        assert all(len(chain) == cycle for chain in beliefs.values())
+
+    # Each belief points at the one written before it
+    for chain in beliefs.values():
+        assert [previous for _, previous in chain] == [None] + [belief_id for belief_id, _ in chain[:-1]]
+
+
+def test_expired_lease_is_taken_over(portfolio):
+    event_id, agent, entity_ids = portfolio
+    ensure_shards(event_id, 2)
+    first, second = make_owner_id(), make_owner_id()
+
+    [(shard_id, shard_count)] = claim_shards(event_id, first, max_shards=1, lease_seconds=1)
+    # Live lease: the other owner only gets the other shard
+    assert [shard for shard, _ in claim_shards(event_id, second, max_shards=2, lease_seconds=60)] == [1 - shard_id]
+
+    time.sleep(1.5)
+    assert claim_shards(event_id, second, max_shards=2, lease_seconds=60) == [(shard_id, shard_count)]
+    with pytest.raises(LeaseLost):
+        renew_lease(event_id, shard_id, first)
+    check_lease(event_id, shard_id, second)
+
+    # The previous owner's writes are fenced off
+    entity_id = next(e for e in entity_ids if e in refresh_scheduler.get_shard_entity_ids(shard_id, shard_count))
+    storage = create_storage("postgres")
+    with pytest.raises(LeaseLost):
+        refresh_entity(event_id, entity_id, [agent], storage, lambda: check_lease(event_id, shard_id, first))
+    assert storage.get_latest_belief(event_id, entity_id) is None
+    refresh_entity(event_id, entity_id, [agent], storage, lambda: check_lease(event_id, shard_id, second))
+    assert storage.get_latest_belief(event_id, entity_id) is not None
+
+
+def test_shard_count_change_needs_reshard(portfolio):
+    event_id, agent, _ = portfolio
+    ensure_shards(event_id, 4)
+    with pytest.raises(ValueError):
+        ensure_shards(event_id, 8)
+
+    owner = make_owner_id()
+    [(shard_id, _)] = claim_shards(event_id, owner, max_shards=1)
+    with pytest.raises(ValueError):
+        reshard(event_id, 8)
+    refresh_scheduler.release_lease(event_id, shard_id, owner, refreshed=False)
+
+    reshard(event_id, 8)
+    ensure_shards(event_id, 8)
+    assert sorted(shard for shard, count in claim_shards(event_id, owner, max_shards=10) if count == 8) == list(range(8))
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+from core.agents.capital_markets import CapitalMarketsAgent
+from core.beliefs import BeliefSnapshot
+from core.replay import _replay_entity, diff_replay, replay
+from core.signals import Signal
+from core.storage import create_storage
+
+T0 = datetime(2024, 1, 1)
+
+
+def _signal(signal_id, signal_type, hours, value, source="crm", entity_id="ent_1"):
+    return Signal(
+        signal_id=signal_id,
+        entity_id=entity_id,
+        signal_type=signal_type,
+        value=value,
+        timestamp=T0 + timedelta(hours=hours),
+        source=source,
+    )
+
+
+def test_replay_entity_accepts_signals_without_source():
+    signals = [
+        _signal("s1", "runway_months", 0, 12.0, source=None),
+        _signal("s2", "burn_rate", 1, True, source=None),
+        _signal("s3", "runway_months", 2, 4.0),
+    ]
+
+    beliefs = list(_replay_entity([CapitalMarketsAgent()], signals, since=None))
+
+    assert [b.as_of for b in beliefs] == [T0, T0 + timedelta(hours=1), T0 + timedelta(hours=2)]
+    assert [round(b.probability, 2) for b in beliefs] == [0.6, 0.5, 0.35]
+    # Each belief points at the previous one for the same event
+    assert beliefs[0].previous_belief_id is None
+    assert [b.previous_belief_id for b in beliefs[1:]] == [b.belief_id for b in beliefs[:-1]]
+
+
+def test_replay_entity_skips_beliefs_before_since_but_keeps_state():
+    signals = [
+        _signal("s1", "burn_rate", 0, True),
+        _signal("s2", "runway_months", 2, 12.0),
+    ]
+
+    beliefs = list(_replay_entity([CapitalMarketsAgent()], signals, since=T0 + timedelta(hours=1)))
+
+    assert len(beliefs) == 1
+    assert round(beliefs[0].probability, 2) == 0.5
+
+
+def test_replay_on_memory_storage():
+    storage = create_storage("memory")
+    for signal in [
+        _signal("s1", "runway_months", 0, 12.0),
+        _signal("s2", "runway_months", 1, 4.0),
+        _signal("s3", "runway_months", 0, 12.0, entity_id="ent_2"),
+        _signal("s4", "runway_months", 5, 4.0, entity_id="ent_2"),
+    ]:
+        storage.insert_signal(signal)
+    event_id = CapitalMarketsAgent().supported_events[0]
+    storage.insert_belief_snapshot(
+        BeliefSnapshot(belief_id="bel_1", event_id=event_id, entity_id="ent_1", probability=0.6, confidence="medium", as_of=T0)
+    )
+
+    result = replay([CapitalMarketsAgent()], until=T0 + timedelta(hours=3), workers=4, chunk_size=1, storage=storage)
+
+    assert (result["entity_count"], result["snapshot_count"]) == (2, 3)
+    diff = diff_replay(result["replay_id"], event_id, storage=storage)
+    # ent_2 has no production belief to compare with
+    assert [(row["entity_id"], row["shadow_snapshots"], row["compared_snapshots"]) for row in diff] == [
+        ("ent_1", 2, 2),
+        ("ent_2", 1, 0),
+    ]
+    assert round(diff[0]["max_abs_delta"], 6) == 0.15
+    assert round(diff[0]["shadow_probability"], 6) == 0.45
+    assert diff[0]["production_probability"] == 0.6
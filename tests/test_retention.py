@@ -0,0 +1,151 @@
+import uuid
+from datetime import datetime, timedelta
+
+from core.belief_store import insert_belief_snapshot
+from core.beliefs import BeliefSnapshot
+from core.db import get_connection
+from core.retention import PARTITIONED_TABLES, compact_belief_snapshots, ensure_partitions
+
+DAY0 = datetime(2023, 3, 1)
+HOURS = [6, 12, 18]
+DAYS = 3
+
+
+def _query(sql, params=()):
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall() if cur.description else None
+        conn.commit()
+        return rows
+    finally:
+        conn.close()
+
+
+def _seed(event_id, entity_id):
+    """Three snapshots a day for DAYS days, chained through previous_belief_id."""
+    beliefs = []
+    previous_belief_id = None
+    for day in range(DAYS):
+        for hour in HOURS:
+            belief = BeliefSnapshot(
+                belief_id=f"{event_id}_{entity_id}_{day}_{hour}",
+                event_id=event_id,
+                entity_id=entity_id,
+                probability=0.5,
+                confidence="medium",
+                as_of=DAY0 + timedelta(days=day, hours=hour),
+                previous_belief_id=previous_belief_id,
+            )
+            insert_belief_snapshot(belief)
+            beliefs.append(belief)
+            previous_belief_id = belief.belief_id
+    return beliefs
+
+
+def _log_decision(belief):
+    _query(
+        """
+        INSERT INTO decisions (
+            decision_id, belief_id, belief_as_of, event_id, entity_id,
+            suggestion, action, decided_at
+        )
+        VALUES (%s, %s, %s, %s, %s, 'review', 'accepted', %s)
+        """,
+        (
+            f"dec_{uuid.uuid4().hex[:8]}",
+            belief.belief_id,
+            belief.as_of,
+            belief.event_id,
+            belief.entity_id,
+            belief.as_of,
+        ),
+    )
+
+
+def _stored(event_id):
+    rows = _query(
+        """
+        SELECT entity_id, belief_id, previous_belief_id
+        FROM belief_snapshots
+        WHERE event_id = %s
+        ORDER BY entity_id, as_of
+        """,
+        (event_id,),
+    )
+    chains = {}
+    for entity_id, belief_id, previous_belief_id in rows:
+        chains.setdefault(entity_id, []).append((belief_id, previous_belief_id))
+    return chains
+
+
+def test_compaction_keeps_last_of_day_and_decisions_and_relinks(postgres):
+    event_id = f"EVENT_{uuid.uuid4().hex[:8]}"
+    seeded = {entity_id: _seed(event_id, entity_id) for entity_id in ["ent_a", "ent_b"]}
+    decided = seeded["ent_a"][1]  # day 0, 12:00 - not the last of its day
+    _log_decision(decided)
+    total = sum(len(beliefs) for beliefs in seeded.values())
+    # Per entity and day only the last snapshot survives, plus the decided one
+    expected_doomed = total - len(seeded) * DAYS - 1
+
+    dry_run = compact_belief_snapshots(older_than_days=90, event_id=event_id, dry_run=True)
+    assert dry_run["rows"] == expected_doomed
+    assert dry_run["relinked"] == 0
+    assert dry_run["estimated_bytes"] > 0
+    assert sum(p["rows"] for p in dry_run["partitions"]) == expected_doomed
+    assert all(p["tuple_bytes"] > 0 for p in dry_run["partitions"])
+    assert sum(len(chain) for chain in _stored(event_id).values()) == total
+
+    executed = compact_belief_snapshots(older_than_days=90, event_id=event_id, dry_run=False)
+    assert executed["rows"] == expected_doomed
+    # Every survivor except ent_a's 18:00 of day 0, whose parent was decided on
+    assert executed["relinked"] == len(seeded) * DAYS
+
+    chains = _stored(event_id)
+    for entity_id, beliefs in seeded.items():
+        expected = [beliefs[day * len(HOURS) + len(HOURS) - 1].belief_id for day in range(DAYS)]
+        if entity_id == decided.entity_id:
+            expected.insert(0, decided.belief_id)
+        assert [belief_id for belief_id, _ in chains[entity_id]] == expected
+
+        # Every survivor points at the nearest surviving ancestor
+        assert [previous for _, previous in chains[entity_id]] == [None] + expected[:-1]
+
+    dangling = _query(
+        """
+        SELECT b.belief_id
+        FROM belief_snapshots b
+        WHERE b.event_id = %s
+          AND b.previous_belief_id IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM belief_snapshots p WHERE p.belief_id = b.previous_belief_id)
+        """,
+        (event_id,),
+    )
+    assert dangling == []
+
+    # A second run finds nothing left to remove
+    assert compact_belief_snapshots(older_than_days=90, event_id=event_id, dry_run=False)["rows"] == 0
+
+
+def test_ensure_partitions_is_idempotent(postgres):
+    def partition_count():
+        return _query(
+            """
+            SELECT count(*)
+            FROM pg_inherits
+            WHERE inhparent::regclass::text = ANY(%s)
+            """,
+            (PARTITIONED_TABLES,),
+        )[0][0]
+
+    first = ensure_partitions(months_ahead=2)
+    count = partition_count()
+    second = ensure_partitions(months_ahead=2)
+
+    assert second == first
+    assert partition_count() == count
+    # The current month plus two ahead, for every partitioned table
+    assert len(first) == len(PARTITIONED_TABLES) * 3
+    exists = _query("SELECT to_regclass(name) IS NOT NULL FROM unnest(%s::text[]) AS name", (first,))
+    assert all(row[0] for row in exists)
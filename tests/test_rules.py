@@ -0,0 +1,153 @@
+import itertools
+import math
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from core.agents.base import BaseAgent
+from core.agents.capital_markets import CapitalMarketsAgent
+from core.agents.rules import Condition, RuleAgent, rule_spec_from_dict
+from core.signals import Signal, flag_column
+
+T0 = datetime(2024, 1, 1)
+MISSING = object()
+SIGNAL_TYPES = ["runway_months", "burn_rate", "hiring_signal"]
+# Booleans, numbers that equal them, thresholds, text and null
+VALUES = [MISSING, True, False, 1, 0, 1.0, 5, 5.99, 6, 12.5, "yes", None]
+
+
+def _hand_written_capital_markets(signal_map):
+    """The rules of CapitalMarketsAgent before it became a RuleAgent."""
+    probability = 0.6
+    adjustments = []
+    if "runway_months" in signal_map:
+        runway_value = signal_map["runway_months"].value
+        if isinstance(runway_value, (int, float)) and runway_value < 6:
+            probability -= 0.15
+            adjustments.append(f"runway below 6 months ({runway_value})")
+    if "burn_rate" in signal_map and signal_map["burn_rate"].value is True:
+        probability -= 0.1
+        adjustments.append("high burn rate detected")
+    if "hiring_signal" in signal_map and signal_map["hiring_signal"].value is True:
+        probability -= 0.05
+        adjustments.append("active hiring detected")
+    probability = max(0.0, min(1.0, probability))
+    if adjustments:
+        rationale = f"Base probability 0.6 adjusted by: {', '.join(adjustments)}. Final probability: {probability:.2f}"
+    else:
+        rationale = f"Base probability 0.6 with no negative adjustments. Final probability: {probability:.2f}"
+    return probability, rationale
+
+
+def _signals(values):
+    return [
+        Signal(signal_id=f"sig_{i}", entity_id="ent_1", signal_type=signal_type, value=value, timestamp=T0)
+        for i, (signal_type, value) in enumerate(zip(SIGNAL_TYPES, values))
+        if value is not MISSING
+    ]
+
+
+def _frame(rows):
+    """Signal frame with the encoding of core.signal_store.get_signal_frame."""
+    columns = SIGNAL_TYPES + [flag_column(signal_type) for signal_type in SIGNAL_TYPES]
+    frame = {column: np.full(len(rows), np.nan) for column in columns}
+    for row, values in enumerate(rows):
+        for signal_type, value in zip(SIGNAL_TYPES, values):
+            if isinstance(value, bool):
+                frame[signal_type][row] = frame[flag_column(signal_type)][row] = float(value)
+            elif isinstance(value, (int, float)):
+                frame[signal_type][row] = value
+    return frame
+
+
+def test_capital_markets_matches_hand_written_agent():
+    agent = CapitalMarketsAgent()
+    combinations = list(itertools.product(VALUES, repeat=len(SIGNAL_TYPES)))
+    scores = agent.score_frame(_frame(combinations))
+
+    for values, score in zip(combinations, scores):
+        signals = _signals(values)
+        expected_probability, expected_rationale = _hand_written_capital_markets(
+            {signal.signal_type: signal for signal in signals}
+        )
+        proposal = agent.generate_proposals(signals)[0]
+        assert proposal.proposed_probability == expected_probability, values
+        assert proposal.rationale == expected_rationale, values
+        # Vectorized and scalar paths agree, including on 1 / 1.0 for flags
+        assert math.isclose(score, expected_probability, abs_tol=1e-12), values
+
+
+def test_rule_spec_from_dict():
+    agent = RuleAgent(
+        rule_spec_from_dict(
+            {
+                "agent_id": "test_agent",
+                "event_id": "TEST_EVENT",
+                "base_probability": 0.5,
+                "adjustments": [
+                    {"signal_type": "runway_months", "op": "ge", "value": 18, "delta": 0.3, "reason": "runway {value}"},
+                    {"signal_type": "burn_rate", "op": "is_false", "delta": 0.3, "reason": "low burn"},
+                ],
+                "clamp": [0.1, 0.9],
+            }
+        )
+    )
+    assert agent.supported_events == ["TEST_EVENT"]
+    assert agent.required_signals == ["runway_months", "burn_rate"]
+
+    proposal = agent.generate_proposals(_signals([24, False]))[0]
+    assert proposal.proposed_probability == 0.9
+    assert proposal.rationale == "Base probability 0.5 adjusted by: runway 24, low burn. Final probability: 0.90"
+    # 0 is not False for a flag rule
+    assert agent.generate_proposals(_signals([24, 0]))[0].proposed_probability == 0.8
+
+
+def test_condition_validation():
+    with pytest.raises(ValueError):
+        Condition("runway_months", "between", 6)
+    with pytest.raises(ValueError):
+        Condition("runway_months", "lt")
+
+
+def _spec_data(**overrides):
+    data = {
+        "agent_id": "test_agent",
+        "event_id": "TEST_EVENT",
+        "base_probability": 0.5,
+        "adjustments": [{"signal_type": "burn_rate", "op": "is_true", "delta": -0.1, "reason": "high burn"}],
+    }
+    data.update(overrides)
+    return data
+
+
+def test_rule_spec_from_dict_reads_required_signals():
+    spec = rule_spec_from_dict(_spec_data(required_signals=["burn_rate", "headcount"]))
+    assert RuleAgent(spec).required_signals == ["burn_rate", "headcount"]
+
+    with pytest.raises(ValueError, match="lacks adjusted signals: burn_rate"):
+        rule_spec_from_dict(_spec_data(required_signals=["headcount"]))
+    with pytest.raises(ValueError, match="list of signal types"):
+        rule_spec_from_dict(_spec_data(required_signals="burn_rate"))
+
+
+def test_rule_spec_from_dict_rejects_unknown_keys():
+    with pytest.raises(ValueError, match="Unknown rule spec keys: required_signal"):
+        rule_spec_from_dict(_spec_data(required_signal=["burn_rate"]))
+    with pytest.raises(ValueError, match="Unknown adjustment keys: threshold"):
+        rule_spec_from_dict(
+            _spec_data(adjustments=[{"signal_type": "runway_months", "op": "lt", "threshold": 6, "delta": -0.1, "reason": "r"}])
+        )
+
+
+def test_agents_must_implement_score_frame():
+    class ScalarOnlyAgent(BaseAgent):
+        agent_id = "scalar_only"
+        supported_events = ["TEST_EVENT"]
+        required_signals = []
+
+        def generate_proposals(self, signals):
+            return []
+
+    with pytest.raises(TypeError, match="score_frame"):
+        ScalarOnlyAgent()
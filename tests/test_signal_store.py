@@ -0,0 +1,104 @@
+import uuid
+from datetime import datetime, timedelta
+
+from core.db import get_connection
+from core.signal_store import backfill_typed_values, find_entities_by_numeric_signal, insert_signal
+from core.signals import Signal
+
+T0 = datetime(2024, 1, 1)
+
+
+def _id(prefix):
+    return f"{prefix}_{uuid.uuid4().hex[:8]}"
+
+
+def _query(sql, params=()):
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall() if cur.description else None
+        conn.commit()
+        return rows
+    finally:
+        conn.close()
+
+
+def _typed(signal_id):
+    return _query("SELECT value_num, value_bool, value_text, value FROM signals WHERE signal_id = %s", (signal_id,))[0]
+
+
+def test_trigger_keeps_one_typed_column(postgres):
+    signal_id = _id("sig")
+    insert_signal(Signal(signal_id=signal_id, entity_id=_id("ent"), signal_type="runway_months", value=12, timestamp=T0))
+    assert _typed(signal_id) == (12.0, None, None, None)
+
+    # Changing the value's type clears the previous typed column
+    _query("UPDATE signals SET value = %s::jsonb WHERE signal_id = %s", ('"twelve"', signal_id))
+    assert _typed(signal_id) == (None, None, "twelve", None)
+    _query("UPDATE signals SET value = 'true'::jsonb WHERE signal_id = %s", (signal_id,))
+    assert _typed(signal_id) == (None, True, None, None)
+    _query("""UPDATE signals SET value = '{"months": 12}'::jsonb WHERE signal_id = %s""", (signal_id,))
+    assert _typed(signal_id) == (None, None, None, {"months": 12})
+
+
+def test_backfill_converts_every_legacy_row(postgres):
+    entity_id = _id("ent")
+    # Mixed case and punctuation, so the chunk cursor depends on the collation
+    signal_ids = [f"{entity_id}_{suffix}" for suffix in ["b", "B", "a_1", "A-2", "c", "_z", "Z"]]
+    values = ["1", "true", '"text"', "2.5", "false", "3", '"x"']
+    _query("ALTER TABLE signals DISABLE TRIGGER trg_signals_split_typed_value")
+    try:
+        for signal_id, value in zip(signal_ids, values):
+            _query(
+                """
+                INSERT INTO signals (signal_id, entity_id, signal_type, value, timestamp)
+                VALUES (%s, %s, 'legacy', %s::jsonb, %s)
+                """,
+                (signal_id, entity_id, value, T0),
+            )
+    finally:
+        _query("ALTER TABLE signals ENABLE TRIGGER trg_signals_split_typed_value")
+
+    assert backfill_typed_values(chunk_size=2) >= len(signal_ids)
+    rows = _query(
+        "SELECT signal_id, value_num, value_bool, value_text, value FROM signals WHERE entity_id = %s",
+        (entity_id,),
+    )
+    converted = {row[0]: row[1:] for row in rows}
+    assert converted == {
+        signal_ids[0]: (1.0, None, None, None),
+        signal_ids[1]: (None, True, None, None),
+        signal_ids[2]: (None, None, "text", None),
+        signal_ids[3]: (2.5, None, None, None),
+        signal_ids[4]: (None, False, None, None),
+        signal_ids[5]: (3.0, None, None, None),
+        signal_ids[6]: (None, None, "x", None),
+    }
+    assert backfill_typed_values(chunk_size=2) == 0
+
+
+def test_find_entities_by_numeric_signal(postgres):
+    signal_type = _id("metric")
+    renewed, low, mid, high = (_id("ent") for _ in range(4))
+    for entity_id, hours, value in [
+        (renewed, 0, 4),
+        (renewed, 1, 12),  # latest value is out of range
+        (low, 0, 3),
+        (mid, 0, 5.5),
+        (high, 0, 9),
+    ]:
+        insert_signal(
+            Signal(
+                signal_id=_id("sig"),
+                entity_id=entity_id,
+                signal_type=signal_type,
+                value=value,
+                timestamp=T0 + timedelta(hours=hours),
+            )
+        )
+
+    assert [row["entity_id"] for row in find_entities_by_numeric_signal(signal_type, lt=6)] == [low, mid]
+    in_range = find_entities_by_numeric_signal(signal_type, lt=10, gte=5.5)
+    assert [(row["entity_id"], row["value"]) for row in in_range] == [(mid, 5.5), (high, 9.0)]
+    assert in_range[0]["timestamp"] == T0
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from core.signals import flag_column
+from core.simulation import Perturbation, simulate_what_if
+
+
+def _frame(runway_months, burn_rate_flag, burn_rate_number):
+    nan = np.array([np.nan])
+    return {
+        "runway_months": np.array([runway_months]),
+        "burn_rate": np.array([burn_rate_number]),
+        "hiring_signal": nan,
+        flag_column("runway_months"): nan,
+        flag_column("burn_rate"): np.array([burn_rate_flag]),
+        flag_column("hiring_signal"): nan,
+    }
+
+
+def test_bernoulli_draws_are_flags():
+    [result] = simulate_what_if(
+        "NEXT_ROUND_RAISED",
+        ["ent_1"],
+        _frame(12.0, 0.0, 0.0),
+        [Perturbation(signal_type="burn_rate", distribution="bernoulli", p=1.0)],
+        n_samples=100,
+    )
+    assert result["baseline_probability"] == pytest.approx(0.6)
+    assert result["mean"] == pytest.approx(0.5)
+
+
+def test_numeric_perturbation_of_a_flag_signal_is_not_a_flag():
+    [result] = simulate_what_if(
+        "NEXT_ROUND_RAISED",
+        ["ent_1"],
+        _frame(12.0, 1.0, 1.0),
+        [Perturbation(signal_type="burn_rate", distribution="uniform", mode="absolute", low=1.0, high=1.0)],
+        n_samples=100,
+    )
+    assert result["baseline_probability"] == pytest.approx(0.5)
+    assert result["mean"] == pytest.approx(0.6)
+
+
+def test_missing_flag_columns_are_rejected():
+    frame = _frame(12.0, 0.0, 0.0)
+    del frame[flag_column("burn_rate")]
+    with pytest.raises(ValueError, match="burn_rate:flag"):
+        simulate_what_if("NEXT_ROUND_RAISED", ["ent_1"], frame, [], n_samples=100)
+
+
+@pytest.mark.parametrize(
+    "burn_rate_flag, hiring_flag, expected_bin",
+    [
+        (0.0, 0.0, 6),  # 0.6: the lower edge of 0.6-0.7, not inside 0.5-0.6
+        (1.0, 0.0, 5),  # 0.6 - 0.1
+        (1.0, 1.0, 4),  # 0.6 - 0.1 - 0.05 = 0.44999999999999996
+    ],
+)
+def test_histogram_bins_include_their_lower_edge(burn_rate_flag, hiring_flag, expected_bin):
+    frame = _frame(12.0, burn_rate_flag, np.nan)
+    frame[flag_column("hiring_signal")] = np.array([hiring_flag])
+    [result] = simulate_what_if("NEXT_ROUND_RAISED", ["ent_1"], frame, [], n_samples=100)
+
+    histogram = result["histogram"]
+    assert histogram["bin_edges"] == [i / 10 for i in range(11)]
+    assert histogram["frequencies"][expected_bin] == 1.0
+
+
+def test_batching_does_not_change_results(monkeypatch):
+    entity_ids = [f"ent_{i}" for i in range(5)]
+    frame = {column: np.repeat(values, len(entity_ids)) for column, values in _frame(8.0, 0.0, 0.0).items()}
+    perturbations = [
+        Perturbation(signal_type="runway_months", distribution="normal", std=3.0),
+        Perturbation(signal_type="burn_rate", distribution="bernoulli", p=0.3),
+    ]
+    whole = simulate_what_if("NEXT_ROUND_RAISED", entity_ids, frame, perturbations, n_samples=1000)
+
+    monkeypatch.setattr("core.simulation.MAX_BATCH_SCENARIOS", 2000)
+    batched = simulate_what_if("NEXT_ROUND_RAISED", entity_ids, frame, perturbations, n_samples=1000)
+
+    assert batched == whole
+    # Each entity has its own sample stream
+    assert whole[0]["mean"] != whole[1]["mean"]
+
+
+def test_too_many_scenarios_are_rejected(monkeypatch):
+    monkeypatch.setattr("core.simulation.MAX_SCENARIOS", 1000)
+    frame = {column: np.repeat(values, 2) for column, values in _frame(12.0, 0.0, 0.0).items()}
+    with pytest.raises(ValueError, match="exceeds 1000 scenarios"):
+        simulate_what_if("NEXT_ROUND_RAISED", ["ent_1", "ent_2"], frame, [], n_samples=600)
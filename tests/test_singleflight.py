@@ -0,0 +1,171 @@
+import asyncio
+import threading
+import time
+
+from apps.api.singleflight import SingleFlight
+
+N = 8
+
+
+def _wait_for_calls(flight, calls, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while flight.stats()["total"]["calls"] < calls:
+        assert time.monotonic() < deadline, "callers never joined the flight"
+        time.sleep(0.001)
+
+
+def _run_threads(flight, fn):
+    results = [None] * N
+    errors = [None] * N
+
+    def caller(i):
+        try:
+            results[i] = flight.do("overview", "key", fn)
+        except Exception as exc:
+            errors[i] = exc
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(N)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_concurrent_sync_calls_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    executions = []
+
+    def compute():
+        executions.append(1)
+        release.wait(5)
+        return {"value": 42}
+
+    threads, results, errors = _run_threads(flight, compute)
+    _wait_for_calls(flight, N)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(executions) == 1
+    assert errors == [None] * N
+    assert results == [{"value": 42}] * N
+    # Every caller gets the same object, not a copy
+    assert all(result is results[0] for result in results)
+
+
+def test_concurrent_sync_calls_share_the_exception():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def compute():
+        release.wait(5)
+        raise ValueError("boom")
+
+    threads, results, errors = _run_threads(flight, compute)
+    _wait_for_calls(flight, N)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert results == [None] * N
+
+
+def test_sync_results_are_not_cached():
+    flight = SingleFlight()
+    values = iter([1, 2])
+
+    assert flight.do("overview", "key", lambda: next(values)) == 1
+    assert flight.do("overview", "key", lambda: next(values)) == 2
+    assert flight.stats()["endpoints"]["overview"] == {"calls": 2, "executions": 2, "coalesced": 0}
+
+
+async def _gather(flight, fn, calls=N):
+    return await asyncio.gather(
+        *(flight.do_async("alerts", "key", fn) for _ in range(calls)),
+        return_exceptions=True,
+    )
+
+
+async def _release_when_joined(flight, release, calls=N):
+    while flight.stats()["total"]["calls"] < calls:
+        await asyncio.sleep(0)
+    release.set()
+
+
+def test_concurrent_async_calls_share_one_execution():
+    flight = SingleFlight()
+    executions = []
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def compute():
+            executions.append(1)
+            await release.wait()
+            return {"value": 42}
+
+        results, _ = await asyncio.gather(_gather(flight, compute), _release_when_joined(flight, release))
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert len(executions) == 1
+    assert results == [{"value": 42}] * N
+
+
+def test_concurrent_async_calls_share_the_exception():
+    flight = SingleFlight()
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            raise ValueError("boom")
+
+        results, _ = await asyncio.gather(_gather(flight, compute), _release_when_joined(flight, release))
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_async_results_are_not_cached():
+    flight = SingleFlight()
+    values = iter([1, 2])
+
+    async def compute():
+        return next(values)
+
+    async def scenario():
+        return [await flight.do_async("alerts", "key", compute) for _ in range(2)]
+
+    assert asyncio.run(scenario()) == [1, 2]
+    assert flight.stats()["endpoints"]["alerts"] == {"calls": 2, "executions": 2, "coalesced": 0}
+
+
+def test_stats_count_per_endpoint_and_total():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def compute():
+        release.wait(5)
+        return 1
+
+    threads, _, _ = _run_threads(flight, compute)
+    _wait_for_calls(flight, N)
+    release.set()
+    for thread in threads:
+        thread.join()
+    # An endpoint named "total" must not clash with the totals
+    flight.do("total", "other-key", lambda: 2)
+
+    stats = flight.stats()
+    assert stats["endpoints"] == {
+        "overview": {"calls": N, "executions": 1, "coalesced": N - 1},
+        "total": {"calls": 1, "executions": 1, "coalesced": 0},
+    }
+    assert stats["total"] == {"calls": N + 1, "executions": 2, "coalesced": N - 1}
+
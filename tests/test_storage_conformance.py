@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+import pytest
+
+from core.storage import STORAGE_BACKENDS, create_storage
+from core.storage.conformance import CHECKS, T0, bench_portfolio_reads
+
+
+@pytest.fixture(params=STORAGE_BACKENDS)
+def storage(request):
+    if request.param == "postgres":
+        request.getfixturevalue("postgres")
+    return create_storage(request.param)
+
+
+@pytest.mark.parametrize("check", CHECKS, ids=lambda check: check.__name__)
+def test_conformance(storage, check):
+    check(storage)
+
+
+def test_memory_portfolio_reads():
+    storage = create_storage("memory")
+    bench = bench_portfolio_reads(storage, entities=50, beliefs_per_entity=3)
+    event_id = bench["event_id"]
+
+    assert bench["entity_count"] == 50
+    assert storage.get_entities_with_beliefs(event_id) == [f"ent_{e:05d}" for e in range(50)]
+    current = storage.get_latest_belief(event_id, "ent_00007")
+    assert current.as_of == T0 + timedelta(hours=2)
+    previous = storage.get_previous_belief(event_id, "ent_00007", current.belief_id, current.as_of)
+    assert previous.as_of == T0 + timedelta(hours=1)
+    assert storage.get_portfolio_summary(event_id)["entity_count"] == 50
+    # In-process reads, no round trips
+    assert 0 < bench["seconds_per_entity"] < 1e-3
+
+
+def test_memory_snapshot_round_trip(tmp_path):
+    storage = create_storage("memory")
+    for check in CHECKS:
+        check(storage)
+    path = tmp_path / "snapshot.jsonl"
+    storage.save(str(path))
+
+    loaded = create_storage("memory", memory_snapshot=str(path))
+    loaded.save(str(tmp_path / "again.jsonl"))
+    assert sorted(path.read_text().splitlines()) == sorted((tmp_path / "again.jsonl").read_text().splitlines())
+    for (event_id, entity_id), history in storage._beliefs.items():
+        assert loaded.get_latest_belief(event_id, entity_id) == history[-1]
+        assert loaded.get_trends(event_id)[entity_id].belief_id == history[-1].belief_id
+
+
+def test_unknown_snapshot_record_is_rejected(tmp_path):
+    path = tmp_path / "snapshot.jsonl"
+    path.write_text('{"kind": "decision"}\n')
+    with pytest.raises(ValueError):
+        create_storage("memory", memory_snapshot=str(path))
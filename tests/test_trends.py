@@ -0,0 +1,131 @@
+import random
+import uuid
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from core.alert_builder import build_alerts
+from core.belief_store import insert_belief_snapshot
+from core.beliefs import BeliefSnapshot
+from core.trend_store import backfill_trends, get_trends
+from core.trends import TREND_WINDOW, compute_trends, update_trend
+
+T0 = datetime(2024, 1, 1)
+
+
+def _beliefs(event_id, entity_id, probabilities):
+    return [
+        BeliefSnapshot(
+            belief_id=f"{event_id}_{entity_id}_{i}",
+            event_id=event_id,
+            entity_id=entity_id,
+            probability=probability,
+            confidence="medium",
+            as_of=T0 + timedelta(days=i),
+        )
+        for i, probability in enumerate(probabilities)
+    ]
+
+
+def _fold(beliefs):
+    trend = None
+    for belief in beliefs:
+        trend = update_trend(trend, belief)
+    return trend
+
+
+def _assert_same_trend(actual, expected):
+    assert actual.belief_id == expected.belief_id
+    assert actual.as_of == expected.as_of
+    assert actual.snapshot_count == expected.snapshot_count
+    for field in ["probability", "ewma", "ewm_variance", "slope"]:
+        assert getattr(actual, field) == pytest.approx(getattr(expected, field), abs=1e-12), field
+    assert actual.recent_probabilities == pytest.approx(expected.recent_probabilities, abs=1e-12)
+
+
+def test_update_trend_matches_compute_trends():
+    rng = random.Random(7)
+    histories = {}
+    for event_id in ["EVENT_A", "EVENT_B"]:
+        # Shorter than, equal to and longer than the slope window
+        for length in [1, 2, TREND_WINDOW - 1, TREND_WINDOW, TREND_WINDOW + 1, 40]:
+            entity_id = f"ent_{length}"
+            histories[(event_id, entity_id)] = _beliefs(
+                event_id, entity_id, [round(rng.random(), 4) for _ in range(length)]
+            )
+
+    rows = [belief.model_dump() for beliefs in histories.values() for belief in beliefs]
+    rng.shuffle(rows)  # compute_trends sorts by as_of itself
+    computed = {(trend.event_id, trend.entity_id): trend for trend in compute_trends(pd.DataFrame(rows))}
+
+    assert computed.keys() == histories.keys()
+    for key, beliefs in histories.items():
+        _assert_same_trend(computed[key], _fold(beliefs))
+
+
+def _change(entity_id, change_type, probability, delta):
+    return {
+        "entity_id": entity_id,
+        "probability": probability,
+        "delta": delta,
+        "change_type": change_type,
+        "as_of": T0,
+        "belief_id": f"{entity_id}_latest",
+    }
+
+
+def test_build_alerts_raises_sustained_decline():
+    declining = _fold(_beliefs("EVENT", "ent_declining", [0.8, 0.77, 0.74, 0.71, 0.68]))
+    flat = _fold(_beliefs("EVENT", "ent_flat", [0.5, 0.51, 0.5, 0.51, 0.5]))
+    changed = _fold(_beliefs("EVENT", "ent_changed", [0.8, 0.77, 0.74, 0.71, 0.5]))
+    trends = {trend.entity_id: trend for trend in [declining, flat, changed]}
+
+    alerts = build_alerts([_change("ent_changed", "significant_drop", 0.5, -0.21)], [], trends)
+
+    by_entity = {alert.entity_id: alert for alert in alerts}
+    assert set(by_entity) == {"ent_declining", "ent_changed"}
+    # An entity with a material change keeps that change type
+    assert by_entity["ent_changed"].change_type == "significant_drop"
+    sustained = by_entity["ent_declining"]
+    assert sustained.change_type == "sustained_decline"
+    assert sustained.delta == pytest.approx(0.68 - 0.8)
+    assert sustained.belief_id == declining.belief_id
+
+
+def test_build_alerts_breaks_ties_on_slope():
+    # Same end probability and confidence, so the same priority rank
+    gentle = _fold(_beliefs("EVENT", "ent_gentle", [0.55, 0.54, 0.53, 0.52, 0.51, 0.5]))
+    steep = _fold(_beliefs("EVENT", "ent_steep", [0.7, 0.65, 0.6, 0.55, 0.5]))
+    no_trend = "ent_no_trend"
+    changes = [
+        _change("ent_gentle", "significant_drop", 0.5, -0.2),
+        _change(no_trend, "significant_drop", 0.5, -0.2),
+        _change("ent_steep", "significant_drop", 0.5, -0.2),
+    ]
+
+    alerts = build_alerts(changes, [], {"ent_gentle": gentle, "ent_steep": steep})
+
+    assert len({alert.priority_rank for alert in alerts}) == 1
+    assert [alert.entity_id for alert in alerts] == ["ent_steep", "ent_gentle", no_trend]
+
+
+def test_backfill_repairs_out_of_order_inserts(postgres):
+    event_id = f"EVENT_{uuid.uuid4().hex[:8]}"
+    rng = random.Random(11)
+    histories = {
+        f"ent_{i}": _beliefs(event_id, f"ent_{i}", [round(rng.random(), 4) for _ in range(3 + i)])
+        for i in range(5)
+    }
+    for beliefs in histories.values():
+        # Newest first: the live fold ignores every older belief
+        for belief in reversed(beliefs):
+            insert_belief_snapshot(belief)
+
+    # Chunks smaller than the entity count exercise the chunk boundaries
+    assert backfill_trends(event_id, chunk_entities=2) == len(histories)
+
+    trends = get_trends(event_id)
+    assert trends.keys() == histories.keys()
+    for entity_id, beliefs in histories.items():
+        _assert_same_trend(trends[entity_id], _fold(beliefs))